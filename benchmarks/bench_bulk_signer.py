@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Signed transactions per second of one by one signing and bulk signing in worker processes
+
+usage: python -m benchmarks.bench_bulk_signer [count] [workers]
+"""
+import sys
+import time
+
+from secp256k1 import PrivateKey
+
+from tbears.libs.bulk_signer import sign_transactions
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.icx_signer import IcxSigner
+
+
+def make_params(count: int):
+    for i in range(count):
+        yield {
+            "version": "0x3",
+            "to": "hx0000000000000000000000000000000000000001",
+            "value": "0x1",
+            "stepLimit": "0x3000000",
+            "timestamp": hex(int(time.time() * 10 ** 6)),
+            "nid": "0x3",
+            "nonce": hex(i)
+        }
+
+
+def run(name: str, sign: callable, count: int):
+    start = time.perf_counter()
+    signed = sum(1 for _ in sign(make_params(count)))
+    elapsed = time.perf_counter() - start
+    print(f'{name:<24} {signed / elapsed:10.1f} tx/s')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    signer = IcxSigner(PrivateKey().private_key)
+    sender = IconJsonrpc(signer)
+
+    run('sendTransaction', lambda params: (sender.sendTransaction(**{'to': p['to'], 'value': p['value'],
+                                                                     'nonce': p['nonce']}) for p in params), count)
+    run('sign_transactions', lambda params: sign_transactions(signer, params, workers=workers), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Peak memory of signing and sending a deploy request with hex string content and with streamed HexContent
+
+usage: python -m benchmarks.bench_deploy_memory [zip size in MB]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from tbears.libs.icon_jsonrpc import IconClient, IconJsonrpc
+from tbears.libs.icx_signer import IcxSigner
+
+
+class _DiscardHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        remaining = int(self.headers['Content-Length'])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+        body = json.dumps({'jsonrpc': '2.0', 'result': '0x1', 'id': 1}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def max_rss_mb() -> float:
+    # kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def deploy(mode: str, path: str, uri: str):
+    signer = IcxSigner(bytes(range(1, 33)))
+    before = max_rss_mb()
+    if mode == 'hex string':
+        content = IconJsonrpc.gen_deploy_data_content(path)
+    else:
+        content = IconJsonrpc.gen_deploy_hex_content(path)
+    request = IconJsonrpc(signer).sendTransaction(to=f'cx{"0" * 40}', data_type='deploy',
+                                                  data=IconJsonrpc.gen_deploy_data(content=content))
+    with IconClient(uri) as client:
+        client.send(request)
+    print(f'{mode:<12} peak RSS growth: {max_rss_mb() - before:8.1f} MB')
+
+
+def main():
+    if len(sys.argv) > 3:
+        deploy(*sys.argv[1:4])
+        return
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    server = HTTPServer(('127.0.0.1', 0), _DiscardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    uri = f'http://127.0.0.1:{server.server_address[1]}/api/v3'
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'score.zip')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+            # random data doesn't compress. zip is as large as data
+            zf.writestr('score/data.bin', os.urandom(size * 1024 * 1024))
+        print(f'zip size: {os.path.getsize(path) / 1024 / 1024:.1f} MB')
+
+        # fresh process for each mode as peak RSS doesn't go down
+        for mode in ('hex string', 'stream'):
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_deploy_memory', mode, path, uri], check=True)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
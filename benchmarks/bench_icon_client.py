@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Requests per second of IconClient against a local stand-in JSON-RPC server
+
+usage: python -m benchmarks.bench_icon_client [count]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import requests
+
+from tbears.libs.icon_jsonrpc import IconClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive needs HTTP/1.1
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately. avoid delayed ACK stall on kept-alive connection
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        body = json.dumps({'jsonrpc': '2.0', 'result': '0x1', 'id': request.get('id')}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_server() -> 'HTTPServer':
+    server = _Server(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(name: str, send: callable, count: int):
+    request = {'jsonrpc': '2.0', 'method': 'icx_getTotalSupply', 'id': 1}
+    start = time.perf_counter()
+    for _ in range(count):
+        send(request)
+    elapsed = time.perf_counter() - start
+    print(f'{name:<24} {count / elapsed:10.1f} req/s')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    server = start_server()
+    uri = f'http://127.0.0.1:{server.server_address[1]}/api/v3'
+
+    run('requests.post', lambda request: requests.post(url=uri, json=request).json(), count)
+    with IconClient(uri) as client:
+        run('IconClient (pooled)', client.send, count)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
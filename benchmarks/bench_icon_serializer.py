@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Transaction hash origin serializer and hashing against the previous implementation
+
+usage: python -m benchmarks.bench_icon_serializer [count]
+"""
+import copy
+import hashlib
+import sys
+import time
+import tracemalloc
+
+from tbears.libs.icon_serializer import generate_origin_for_icx_send_tx_hash, generate_hash_for_icx_send_tx, translator
+
+
+def legacy_generate_origin_for_icx_send_tx_hash(icx_origin_data):
+    """Previous implementation. deepcopy, recursive generators and translate on every leaf"""
+    def encode(data):
+        if isinstance(data, dict):
+            return "{" + ".".join(encode_dict(data)) + "}"
+        elif isinstance(data, list):
+            return "[" + ".".join(encode(item) for item in data) + "]"
+        elif data is None:
+            return "\\0"
+        return str(data).translate(translator)
+
+    def encode_dict(data: dict):
+        for key in sorted(data.keys()):
+            yield key
+            yield encode(data[key])
+
+    copy_tx = copy.deepcopy(icx_origin_data)
+    tx_hash_key = "txHash" if copy_tx.get('version') == hex(3) else "tx_hash"
+    for key in (tx_hash_key, 'method', 'signature'):
+        if key in copy_tx:
+            del copy_tx[key]
+
+    return f"icx_sendTransaction.{'.'.join(encode_dict(copy_tx))}"
+
+
+TRANSFER = {
+    "version": "0x3",
+    "from": "hxbe258ceb872e08851f1f59694dac2558708ece11",
+    "to": "hx5bfdb090f43a808005ffc27c25b213145e80b7cd",
+    "value": "0xde0b6b3a7640000",
+    "stepLimit": "0x12345",
+    "timestamp": "0x563a6cf330136",
+    "nid": "0x3",
+    "nonce": "0x1",
+    "signature": "VAia7YZ2Ji6igKWzjR2YsGa2m53nKPrfK7uXYW78QLE+ATehAVZPC40szvAiA6NEU5gCYB4c4qaQzqDh2ugcHgA="
+}
+
+CALL = dict(TRANSFER, dataType="call", data={
+    "method": "transfer",
+    "params": {
+        "to": "hxab2d8215eab14bc6bdd8bfb2c8151257032ecd8b",
+        "value": "0x1",
+        "memo": "a.b{c}[d]",
+        "list": [{"hash": f"0x{i:064x}", "value": hex(i)} for i in range(20)]
+    }
+})
+
+# 1MB zip content in hex
+DEPLOY = dict(TRANSFER, to=f'cx{"0" * 40}', dataType="deploy", data={
+    "contentType": "application/zip",
+    "content": f"0x{bytes(range(256)).hex() * 4096}",
+    "params": {"name": "token", "initialSupply": "0x3e8"}
+})
+
+
+def run(name: str, serialize: callable, params: dict, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        serialize(params)
+    elapsed = (time.perf_counter() - start) / count
+    print(f'{name:<20} {elapsed * 1e6:12.1f} us/tx')
+    return elapsed
+
+
+def legacy_hash(params: dict) -> bytes:
+    return hashlib.sha3_256(legacy_generate_origin_for_icx_send_tx_hash(params).encode()).digest()
+
+
+def peak_memory(func: callable, params: dict) -> int:
+    tracemalloc.start()
+    try:
+        func(params)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for name, params, repeat in (('transfer', TRANSFER, count), ('call', CALL, count),
+                                 ('deploy 1MB', DEPLOY, max(count // 1000, 10))):
+        assert legacy_generate_origin_for_icx_send_tx_hash(params) == generate_origin_for_icx_send_tx_hash(params)
+        print(f'[{name}]')
+        legacy = run('legacy', legacy_generate_origin_for_icx_send_tx_hash, params, repeat)
+        current = run('current', generate_origin_for_icx_send_tx_hash, params, repeat)
+        print(f'{"speedup":<20} {legacy / current:12.2f} x')
+
+    print('[hash deploy 1MB]')
+    assert legacy_hash(DEPLOY) == generate_hash_for_icx_send_tx(DEPLOY)
+    for name, func in (('legacy', legacy_hash), ('current', generate_hash_for_icx_send_tx)):
+        run(name, func, DEPLOY, max(count // 1000, 10))
+        print(f'{"peak memory":<20} {peak_memory(func, DEPLOY) / 1024:12.1f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Encoding and decoding time of JSON codecs on block and transaction payloads
+
+usage: python -m benchmarks.bench_json_codec [count]
+"""
+import os
+import sys
+import time
+
+from tbears.util import json_codec
+from tbears.util.json_codec import get_codec
+
+
+def make_transaction(i: int) -> dict:
+    return {
+        "version": "0x3",
+        "from": "hxe7af5fcfd8dfc67530a01a0e403882687528dfcb",
+        "to": "hx0000000000000000000000000000000000000001",
+        "value": hex(i),
+        "stepLimit": "0x3000000",
+        "timestamp": "0x5733b5c4ebb40",
+        "nid": "0x3",
+        "nonce": hex(i),
+        "signature": "VAia7YZ2Ji6igKWzjR2YsGa2m53nKPrfK7uXYW78QLE+ATehAVZPC40szvAiA6NEU5gCYB4c4qaQzqDh2ugcHgA=",
+        "txHash": f'{i:064x}'
+    }
+
+
+def make_payloads() -> dict:
+    transaction = make_transaction(1)
+    deploy = dict(transaction, dataType='deploy',
+                  data={'contentType': 'application/zip', 'content': f'0x{os.urandom(64 * 1024).hex()}'})
+    tx_result = {
+        "txHash": f'{1:064x}', "blockHeight": "0x1", "blockHash": f'{2:064x}', "txIndex": "0x0",
+        "to": "cx0000000000000000000000000000000000000001", "stepUsed": "0x1d4c0", "stepPrice": "0x0",
+        "cumulativeStepUsed": "0x1d4c0", "status": "0x1", "scoreAddress": None,
+        "eventLogs": [{"scoreAddress": "cx0000000000000000000000000000000000000001",
+                       "indexed": ["Transfer(Address,Address,int)", "hx1", "hx2", "0x1"], "data": []}],
+        "logsBloom": f'0x{"0" * 512}'
+    }
+    block = {
+        "prev_block_hash": f'{1:064x}', "merkle_tree_root_hash": f'{2:064x}', "time_stamp": 1540000000000000,
+        "confirmed_transaction_list": [make_transaction(i) for i in range(500)], "block_hash": f'{3:064x}',
+        "height": 100, "peer_id": "hx0000000000000000000000000000000000000000", "signature": "", "commit_state": {}
+    }
+    return {'transaction': transaction, 'transaction result': tx_result, 'deploy (64KB)': deploy,
+            'block (500 txs)': block}
+
+
+def measure(func, arg, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func(arg)
+    return (time.perf_counter() - start) / count * 10 ** 6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    codecs = [get_codec('json')] + ([get_codec('orjson')] if json_codec.orjson is not None else [])
+    if len(codecs) == 1:
+        print('orjson is not installed. only the standard library is measured')
+
+    print(f'{"payload":<20} {"codec":<8} {"dumps(us)":>12} {"loads(us)":>12}')
+    for name, payload in make_payloads().items():
+        # fewer rounds for large payloads
+        rounds = max(count // 100, 10) if name.startswith(('block', 'deploy')) else count
+        for codec in codecs:
+            data = codec.dumps(payload)
+            print(f'{name:<20} {codec.name:<8} {measure(codec.dumps, payload, rounds):12.1f} '
+                  f'{measure(codec.loads, data, rounds):12.1f}')
+
+
+if __name__ == '__main__':
+    main()
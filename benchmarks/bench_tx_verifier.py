@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Verified transactions per second of verification in the calling process and in worker processes
+
+usage: python -m benchmarks.bench_tx_verifier [count] [workers]
+"""
+import json
+import os
+import sys
+
+from secp256k1 import PrivateKey
+
+from tbears.libs.bulk_signer import sign_transactions
+from tbears.libs.icx_signer import IcxSigner
+from tbears.libs.tx_verifier import verify_transactions
+
+
+def make_rows(count: int) -> list:
+    params = ({"version": "0x3", "to": "hx0000000000000000000000000000000000000001", "value": "0x1",
+               "stepLimit": "0x3000000", "timestamp": "0x5733b5c4ebb40", "nid": "0x3", "nonce": hex(i)}
+              for i in range(count))
+    signer = IcxSigner(PrivateKey().private_key)
+    # same format as transactions stored by tbears block manager
+    return [(i.to_bytes(32, 'big'), json.dumps({'transaction': request['params'], 'tx_index': '0x0',
+                                                 'block_height': '0x1', 'block_hash': '0x00'}).encode())
+            for i, request in enumerate(sign_transactions(signer, params, workers=1))]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    rows = make_rows(count)
+
+    for name, workers_ in (('1 process', 1), (f'{workers} workers', workers)):
+        report = verify_transactions(rows, workers=workers_)
+        assert report['valid'] == count
+        print(f'{name:<24} {report["txPerSec"]:10.1f} tx/s')
+
+
+if __name__ == '__main__':
+    main()
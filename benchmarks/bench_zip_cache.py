@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Time to make deploy content of SCORE project with and without zip cache
+
+usage: python -m benchmarks.bench_zip_cache [files] [file size in KB]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.zip_cache import ZipCache
+
+
+def make_project(path: str, files: int, size: int):
+    os.makedirs(os.path.join(path, 'lib'))
+    old = time.time() - 60
+    for i in range(files):
+        file_path = os.path.join(path, 'lib' if i % 2 else '', f'module_{i}.py')
+        with open(file_path, mode='w') as file:
+            # source code like content compresses as real projects do
+            file.write(''.join(f'value_{j} = {j * i}\n' for j in range(size * 1024 // 16))[:size * 1024])
+        os.utime(file_path, (old, old))
+
+
+def measure(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        project = os.path.join(tmp_dir, 'project')
+        make_project(project, files, size)
+        cache = ZipCache(os.path.join(tmp_dir, 'cache'))
+        cache.zip(project)
+
+        print(f'project: {files} files of {size}KB')
+        print(f'no cache:    {measure(lambda: IconJsonrpc.gen_deploy_data_content(project), 10):10.2f} ms')
+        print(f'cache hit:   {measure(lambda: IconJsonrpc.gen_deploy_data_content(project, cache), 10):10.2f} ms')
+        print(f'fingerprint: {measure(lambda: cache.fingerprint(project), 10):10.2f} ms')
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
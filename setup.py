@@ -25,6 +25,10 @@ setup_options = {
     'py_modules': ['tbears'],
     'license': "Apache License 2.0",
     'install_requires': requires,
+    'extras_require': {
+        'fast-json': ['orjson'],
+        'async': ['aiohttp']
+    },
     'test_suite': 'tests',
     'entry_points': {
         'console_scripts': [
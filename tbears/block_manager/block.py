@@ -11,7 +11,6 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import json
 import uuid
 from typing import Union, Optional
 
@@ -20,6 +19,7 @@ from iconcommons.logger import Logger
 from iconservice.icon_constant import DATA_BYTE_ORDER, DEFAULT_BYTE_SIZE
 
 from tbears.block_manager.tbears_db import TbearsDB
+from tbears.util.json_codec import dumps, loads
 
 LOG_BLOCK = 'BLOCK'
 
@@ -126,7 +126,7 @@ class Block(object):
             'block_hash': f'0x{block_hash}'
         }
 
-        return key, json.dumps(value).encode()
+        return key, dumps(value)
 
     def save_txresult(self, tx_hash: str, tx_result):
         """
@@ -135,7 +135,7 @@ class Block(object):
         :param tx_result: transaction result
         :return:
         """
-        self.db.put(DbPrefix.TXRESULT + bytes.fromhex(tx_hash), json.dumps(tx_result).encode())
+        self.db.put(DbPrefix.TXRESULT + bytes.fromhex(tx_hash), dumps(tx_result))
 
     def save_txresults(self, tx_list: list, results: dict):
         """
@@ -158,7 +158,7 @@ class Block(object):
                 # get value from transaction result dict by tx hash
                 tx_result = results.get(tx_hash, "")
                 tx_result['txHash'] = f'0x{tx_hash}'
-                value = json.dumps(tx_result).encode()
+                value = dumps(tx_result)
 
                 self.db.write_batch(write_batch=wb, key=key, value=value)
 
@@ -192,7 +192,7 @@ class Block(object):
         }
 
         # save block
-        self.db.put(DbPrefix.BLOCK + bytes.fromhex(block_hash), json.dumps(block).encode())
+        self.db.put(DbPrefix.BLOCK + bytes.fromhex(block_hash), dumps(block))
 
         # save block height/hash for block query request
         self.db.put(DbPrefix.BLOCK_INDEX + block_height.to_bytes(DEFAULT_BYTE_SIZE, DATA_BYTE_ORDER),
@@ -248,7 +248,7 @@ class Block(object):
             block: bytes = self.db.get(DbPrefix.BLOCK + block_hash)
             if block is None:
                 return None
-            block_json = json.loads(block)
+            block_json = loads(block)
         except Exception as e:
             Logger.debug(f'_get_block_by_hash: exception with ({e})', LOG_BLOCK)
             return None
@@ -266,7 +266,7 @@ class Block(object):
         if tx_payload is None:
             return None
 
-        return json.loads(tx_payload)
+        return loads(tx_payload)
 
     def get_txresult(self, tx_hash: str) -> Optional[bytes]:
         """
@@ -11,10 +11,17 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+import re
 import sys
+import signal
 import argparse
 import time
+import asyncio
+from contextlib import suppress
+from collections import OrderedDict
 from copy import deepcopy
+from typing import Optional
 from asyncio import get_event_loop
 
 import setproctitle
@@ -25,22 +32,41 @@ from iconservice.icon_constant import DATA_BYTE_ORDER, DEFAULT_BYTE_SIZE
 
 from tbears.config.tbears_config import ConfigKey, tbears_server_config
 from tbears.block_manager.channel_service import ChannelService
+from tbears.block_manager.commit_notifier import CommitNotifier, resolve_commit_notify_path
 from tbears.block_manager.block import Block
-from tbears.block_manager.icon_service import IconStub
+from tbears.block_manager.icon_service import IconStub, EmbeddedIconStub
+from tbears.block_manager.mq_connection import MQ_CHANNEL, MQ_ICON, Backoff
+from tbears.block_manager.mq_metrics import MqMetrics, InstrumentedStub
 from tbears.block_manager.periodic import Periodic
+from tbears.block_manager.query_proxy import QueryProxy
+from tbears.block_manager.tx_log import TxWriteAheadLog
+from tbears.block_manager.tx_status import TxStatusTracker
 from tbears.util import create_hash, get_tbears_version
 
 
 TBEARS_BLOCK_MANAGER = 'tbears_block_manager'
+# additional channel names are used in message queue names and directory names
+CHANNEL_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_\-]+$')
 
 
+# transactions arriving within this time(seconds) are sealed in the same block in instant seal mode
+INSTANT_SEAL_COALESCE_TIME = 0.005
+
+TX_LOG_FILE_NAME = 'tbears_tx_queue.log'
+
+# delays(seconds) between message queue reconnection attempts
+RECONNECT_INITIAL_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+
 CHANNEL_QUEUE_NAME_FORMAT = "Channel.{channel_name}.{amqp_key}"
 ICON_SCORE_QUEUE_NAME_FORMAT = "IconScore.{channel_name}.{amqp_key}"
 
 
 class BlockManager(object):
-    def __init__(self, conf: 'IconConfig'):
+    def __init__(self, conf: 'IconConfig', host: 'BlockManagerHost' = None):
         self._conf = conf
+        self._host = host
+        self._closed = False
         self._channel_mq_name = None
         self._icon_mq_name = None
         self._amqp_target = None
@@ -48,25 +74,95 @@ class BlockManager(object):
         self._icon_stub = None
         self._block: 'Block' = Block(f'{conf["stateDbRootPath"]}/tbears')
         self._tx_queue = []
-        
+        # transaction hash -> transaction log group of transactions which may not be written to the log yet
+        self._tx_log_groups = {}
+        self._tx_status = TxStatusTracker()
+        self._tx_log = TxWriteAheadLog(f'{conf["stateDbRootPath"]}/{TX_LOG_FILE_NAME}')
+        self._shutting_down = False
+        self._metrics = MqMetrics(slow_call_threshold=conf.get(ConfigKey.MQ_SLOW_CALL_THRESHOLD, 0))
+        self.periodic = None
+        self._commit_notifier = None
+        self._block_lock: Optional[asyncio.Lock] = None
+        self._instant_seal_task: Optional[asyncio.Future] = None
+        # cache of queries from iconrpcserver. queries reach block manager only in embedded mode
+        self._query_proxy: Optional['QueryProxy'] = None
+        # message queue connections being reconnected. block production is paused until all are reconnected
+        self._lost_connections = set()
+        self._icon_lost: Optional[asyncio.Event] = None
+        self._reconnect_task: Optional[asyncio.Future] = None
+        # block sealed but not invoked because iconservice was unreachable. it's resubmitted after reconnection
+        self._pending_block: Optional[dict] = None
+        # write_precommit_state request and commit event of the block committed while iconservice was unreachable
+        self._unsent_precommit: Optional[tuple] = None
+        # resource accounting
+        self._block_count = 0
+        self._committed_tx_count = 0
+        self._block_time = 0.0
+
     @property
     def block(self) -> 'Block':
         return self._block
 
-    def serve(self):
-        async def _serve():
-            try:
-                await self.init()
-            except RuntimeError as e:
-                msg = f'Failed to connect to MQ. Check rabbitMQ service. ({e})'
-                Logger.error(msg, TBEARS_BLOCK_MANAGER)
-                print(msg)
-                self.close()
-                # TODO how to notify process status to parent process or system
-                return
+    @property
+    def channel(self) -> str:
+        return self._conf[ConfigKey.CHANNEL]
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def icon_stub(self) -> 'IconStub':
+        return self._icon_stub
+
+    @property
+    def query_proxy(self) -> Optional['QueryProxy']:
+        return self._query_proxy
 
-            Logger.info(f'tbears block_manager service started!', TBEARS_BLOCK_MANAGER)
+    @property
+    def tx_status(self) -> 'TxStatusTracker':
+        return self._tx_status
+
+    @property
+    def metrics(self) -> 'MqMetrics':
+        return self._metrics
+
+    @property
+    def tx_log(self) -> 'TxWriteAheadLog':
+        return self._tx_log
 
+    @property
+    def instant_seal(self) -> bool:
+        return bool(self._conf.get(ConfigKey.BLOCK_INSTANT_SEAL, False))
+
+    @property
+    def embedded(self) -> bool:
+        return bool(self._conf.get(ConfigKey.EMBEDDED_ENGINE, False))
+
+    def get_metrics(self) -> dict:
+        """
+        Get block manager metrics with message queue round trip metrics
+        :return: metrics
+        """
+        query_proxy = self._query_proxy
+        return {
+            'blockHeight': self.block.block_height,
+            'txQueue': len(self._tx_queue),
+            'txTracked': len(self._tx_status),
+            'queryCache': {'hit': query_proxy.hit_count, 'miss': query_proxy.miss_count} if query_proxy else None,
+            'commitSubscribers': self._commit_notifier.subscriber_count if self._commit_notifier else 0,
+            'blocks': self._block_count,
+            'txCommitted': self._committed_tx_count,
+            'blockTimeMs': round(self._block_time * 1000, 3),
+            'dbSize': _get_directory_size(f'{self._conf["stateDbRootPath"]}/tbears'),
+            'mq': self._metrics.to_dict()
+        }
+
+    async def start(self):
+        """
+        Start tbears block_manager
+        :return:
+        """
         channel = self._conf[ConfigKey.CHANNEL]
         amqp_key = self._conf[ConfigKey.AMQP_KEY]
         amqp_target = self._conf[ConfigKey.AMQP_TARGET]
@@ -80,12 +176,20 @@ class BlockManager(object):
         Logger.info(f'amqp_key  :  {amqp_key}', TBEARS_BLOCK_MANAGER)
         Logger.info(f'queue_name  : {self._channel_mq_name}', TBEARS_BLOCK_MANAGER)
         Logger.info(f'            : {self._icon_mq_name}', TBEARS_BLOCK_MANAGER)
+        Logger.info(f'embedded engine  : {self.embedded}', TBEARS_BLOCK_MANAGER)
         Logger.info(f'==========tbears block_manager params==========', TBEARS_BLOCK_MANAGER)
 
-        # start message queue service
-        loop = MessageQueueService.loop
-        loop.create_task(_serve())
-        loop.run_forever()
+        try:
+            await self.init()
+        except RuntimeError as e:
+            msg = f'Failed to connect to MQ. Check rabbitMQ service. ({e})'
+            Logger.error(msg, TBEARS_BLOCK_MANAGER)
+            print(msg)
+            await self.close()
+            # TODO how to notify process status to parent process or system
+            return
+
+        Logger.info(f'tbears block_manager service started! channel: {channel}', TBEARS_BLOCK_MANAGER)
 
     async def init(self):
         """
@@ -94,14 +198,42 @@ class BlockManager(object):
         """
         Logger.debug(f'Initialize started!!', TBEARS_BLOCK_MANAGER)
 
+        # block confirmation by periodic task and instant seal must not run concurrently
+        self._block_lock = asyncio.Lock()
+        self._icon_lost = asyncio.Event()
+
+        self._init_tx_log()
+
         await self._init_channel()
 
         await self._init_icon()
 
+        await self._init_notifier()
+
         await self._init_periodic()
 
         Logger.debug(f'Initialize done!!', TBEARS_BLOCK_MANAGER)
 
+    def _init_tx_log(self):
+        """
+        Restore transactions which were accepted but not sealed before last exit
+        :return:
+        """
+        Logger.debug(f'Initialize transaction log started!!', TBEARS_BLOCK_MANAGER)
+
+        for tx in self._tx_log.replay():
+            tx_hash = tx['txHash']
+            # transactions committed before exit are in DB already
+            if self._tx_status.get(tx_hash) is not None or self.block.get_transaction(tx_hash=tx_hash):
+                continue
+            self._tx_queue.append(tx)
+            self._tx_status.enqueue(tx_hash, tx)
+
+        self._tx_log.open(self._tx_queue)
+
+        Logger.debug(f'Initialize transaction log done!! restored {len(self._tx_queue)} transactions',
+                     TBEARS_BLOCK_MANAGER)
+
     async def _init_channel(self):
         """
         Initialize 'channel' message queue
@@ -124,8 +256,14 @@ class BlockManager(object):
         """
         Logger.debug(f'Initialize ICON started!!', TBEARS_BLOCK_MANAGER)
 
-        # make MQ stub
-        self._icon_stub = IconStub(amqp_target=self._amqp_target, route_key=self._icon_mq_name)
+        # make MQ stub. In embedded mode, ICON service engine runs in this process
+        if self.embedded:
+            icon_stub = EmbeddedIconStub(amqp_target=self._amqp_target, route_key=self._icon_mq_name,
+                                         conf=self._conf, block_manager=self)
+            self._query_proxy = icon_stub.query_proxy
+        else:
+            icon_stub = IconStub(amqp_target=self._amqp_target, route_key=self._icon_mq_name, block_manager=self)
+        self._icon_stub = InstrumentedStub(icon_stub, self._metrics, 'IconStub')
 
         await self._icon_stub.connect()
         await self._icon_stub.async_task().hello()
@@ -182,10 +320,33 @@ class BlockManager(object):
 
         # update block information
         self.block.commit_block(prev_block_hash=block_hash)
+        if self._query_proxy is not None:
+            self._query_proxy.invalidate(block_height=self.block.block_height)
 
         Logger.debug(f'Initialize ICON done!! Load genesis block. block_height: {self.block.block_height}',
                      TBEARS_BLOCK_MANAGER)
 
+    async def _init_notifier(self):
+        """
+        Initialize commit notifier which publishes block commit events to local subscribers
+        :return:
+        """
+        path = resolve_commit_notify_path(self._conf)
+        if path is None:
+            return
+
+        Logger.debug(f'Initialize commit notifier started!!', TBEARS_BLOCK_MANAGER)
+
+        self._commit_notifier = CommitNotifier(path=path)
+        try:
+            await self._commit_notifier.start()
+        except OSError as e:
+            # block manager works without notifier. clients fall back to polling
+            Logger.error(f'Failed to start commit notifier. ({e})', TBEARS_BLOCK_MANAGER)
+            self._commit_notifier = None
+
+        Logger.debug(f'Initialize commit notifier done!!', TBEARS_BLOCK_MANAGER)
+
     async def _init_periodic(self):
         """
         Initialize periodic task.
@@ -199,9 +360,136 @@ class BlockManager(object):
 
         Logger.debug(f'Initialize periodic task done!!', TBEARS_BLOCK_MANAGER)
 
-    def close(self):
+    async def shutdown(self):
+        """
+        Confirm block with transactions left in queue and close block manager
+        :return:
+        """
+        if self._shutting_down:
+            return
+        self._shutting_down = True
+
+        Logger.info(f'shutdown {TBEARS_BLOCK_MANAGER}. transactions in queue: {len(self._tx_queue)}',
+                    TBEARS_BLOCK_MANAGER)
+
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._reconnect_task
+
+        if self.periodic is not None:
+            # don't cancel the block being confirmed
+            async with self._block_lock:
+                await self.periodic.stop()
+
+        unfinished = self._tx_queue or self._pending_block is not None or self._unsent_precommit is not None
+        if unfinished and self._icon_stub is not None and MQ_ICON not in self._lost_connections:
+            try:
+                await self.process_block_data()
+            except Exception as e:
+                # transactions are kept in transaction log and restored on next start
+                Logger.error(f'Failed to confirm block on shutdown. ({e})', TBEARS_BLOCK_MANAGER)
+
+        if self.embedded and self._icon_stub is not None:
+            await self._icon_stub.disconnect()
+
+        Logger.info(f'metrics: {self.get_metrics()}', TBEARS_BLOCK_MANAGER)
+        await self.close()
+
+    def on_connection_lost(self, name: str):
+        """
+        Called when message queue connection is lost. Reconnect with exponential backoff.
+        Block production is paused until reconnected. Transaction queue is kept
+        :param name: connection name. MQ_CHANNEL or MQ_ICON
+        :return:
+        """
+        if self._shutting_down:
+            return
+
+        self._lost_connections.add(name)
+        # embedded engine doesn't need message queue for block confirmation
+        if name == MQ_ICON and not self.embedded:
+            self._icon_lost.set()
+
+        if self._reconnect_task is None:
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        backoff = Backoff(initial=RECONNECT_INITIAL_DELAY, maximum=RECONNECT_MAX_DELAY)
+
+        # wait for the block being confirmed to stop and pause block production
+        async with self._block_lock:
+            while self._lost_connections:
+                await asyncio.sleep(backoff.next())
+                for name in sorted(self._lost_connections):
+                    try:
+                        await self._reconnect_mq(name)
+                    except Exception as e:
+                        Logger.warning(f'Failed to reconnect {name} message queue. ({e})', TBEARS_BLOCK_MANAGER)
+                        continue
+
+                    Logger.info(f'Reconnected {name} message queue', TBEARS_BLOCK_MANAGER)
+                    self._lost_connections.discard(name)
+                    if name == MQ_ICON:
+                        self._icon_lost.clear()
+
+            # connection lost from now on starts another reconnection
+            self._reconnect_task = None
+
+            # resubmit the block which was half-finished when the connection was lost
+            await self._resume_block()
+
+    async def _reconnect_mq(self, name: str):
+        if name == MQ_CHANNEL:
+            await self._channel_service.reconnect()
+        else:
+            await self._icon_stub.reconnect()
+            await self._icon_stub.async_task().hello()
+
+    async def _call_icon(self, method: str, request: dict) -> dict:
+        """
+        Send message to iconservice. Stop waiting response when the connection is lost
+        :param method: message name
+        :param request: request
+        :return: response
+        """
+        if self._icon_lost.is_set():
+            raise ConnectionError('iconservice is unreachable')
+
+        call = asyncio.ensure_future(getattr(self._icon_stub.async_task(), method)(request))
+        lost = asyncio.ensure_future(self._icon_lost.wait())
+        try:
+            await asyncio.wait([call, lost], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            lost.cancel()
+
+        if not call.done():
+            call.cancel()
+            raise ConnectionError(f'Lost connection to iconservice while waiting {method} response')
+
+        try:
+            return call.result()
+        except Exception as e:
+            if self._icon_lost.is_set():
+                raise ConnectionError(f'Lost connection to iconservice while waiting {method} response') from e
+            raise
+
+    async def close(self):
         Logger.debug(f'close {TBEARS_BLOCK_MANAGER}', TBEARS_BLOCK_MANAGER)
-        get_event_loop().stop()
+        await self._tx_log.close()
+        if self._commit_notifier is not None:
+            self._commit_notifier.close()
+        if self.embedded and self._icon_stub is not None:
+            self._icon_stub.close()
+        # release the DB lock, so the DB can be opened again in this process
+        self._block.db.close()
+        self._closed = True
+
+        # other channels in the process keep running
+        if self._host is not None:
+            self._host.on_closed(self)
+        else:
+            get_event_loop().stop()
 
     def add_tx(self, tx_hash: str, tx: dict):
         """
@@ -216,8 +504,20 @@ class BlockManager(object):
         tx_copy['txHash'] = tx_hash
 
         self._tx_queue.append(tx_copy)
+        self._tx_status.enqueue(tx_hash, tx_copy)
+        self._tx_log_groups[tx_hash] = self._tx_log.append(tx_copy)
         Logger.debug(f'Append tx to tx_queue: {self._tx_queue}', TBEARS_BLOCK_MANAGER)
 
+    def remove_tx(self, tx_hash: str):
+        """
+        Remove transaction from queue. Called when the transaction is not written to transaction log
+        :param tx_hash: transaction hash
+        :return:
+        """
+        self._tx_queue = [tx for tx in self._tx_queue if tx['txHash'] != tx_hash]
+        self._tx_status.remove([tx_hash])
+        self._tx_log_groups.pop(tx_hash, None)
+
     @property
     def tx_queue(self) -> list:
         """
@@ -228,23 +528,68 @@ class BlockManager(object):
 
     def clear_tx(self) -> list:
         """
-        return transaction queue and clear
-        :return: transaction queue
+        return transactions written to transaction log and remove them from queue.
+        Transactions being written are left in queue and transactions failed to be written are dropped
+        :return: transactions to seal
         """
-        tx_queue: list = self._tx_queue
-        self._tx_queue = []
+        tx_list = []
+        tx_queue = []
+        for tx in self._tx_queue:
+            tx_hash = tx['txHash']
+            group = self._tx_log_groups.get(tx_hash)
+            if group is not None:
+                if not group.done():
+                    tx_queue.append(tx)
+                    continue
+                del self._tx_log_groups[tx_hash]
+                if group.exception() is not None:
+                    self._tx_status.remove([tx_hash])
+                    continue
+            tx_list.append(tx)
+        self._tx_queue = tx_queue
+
+        return tx_list
+
+    async def confirm_instantly(self):
+        """
+        Seal a block with pending transactions right away and wait until the block is confirmed.
+        Transactions arriving within INSTANT_SEAL_COALESCE_TIME join the same block
+        :return:
+        """
+        if self._instant_seal_task is None:
+            self._instant_seal_task = asyncio.ensure_future(self._instant_seal())
 
-        return tx_queue
+        # other waiters of the same block must not be cancelled with a cancelled request
+        await asyncio.shield(self._instant_seal_task)
+
+    async def _instant_seal(self):
+        await asyncio.sleep(INSTANT_SEAL_COALESCE_TIME)
+
+        async with self._block_lock:
+            # transactions arriving from now on are sealed in next block
+            self._instant_seal_task = None
+            await self._process_block_data()
 
     async def process_block_data(self):
         """
         Process block data. Invoke block and save transactions, transaction results and block. Update block height and previous block hash.
         :return:
         """
+        async with self._block_lock:
+            await self._process_block_data()
+
+    async def _process_block_data(self):
         Logger.debug(f'process_block_data started!!', TBEARS_BLOCK_MANAGER)
 
+        # block production is paused while iconservice is unreachable
+        if self._icon_lost.is_set() or not await self._resume_block():
+            Logger.debug(f'iconservice is unreachable. Skip block confirm', TBEARS_BLOCK_MANAGER)
+            return
+
         # clear tx_queue
         tx_list = self.clear_tx()
+        tx_hashes = [tx['txHash'] for tx in tx_list]
+        self._tx_status.seal(tx_hashes)
 
         if len(tx_list) == 0:
             if self._conf[ConfigKey.BLOCK_CONFIRM_EMPTY]:
@@ -257,15 +602,59 @@ class BlockManager(object):
         block_timestamp_us = int(time.time() * 10 ** 6)
         block_hash = create_hash(block_timestamp_us.to_bytes(DEFAULT_BYTE_SIZE, DATA_BYTE_ORDER))
 
+        self._pending_block = {'txList': tx_list, 'blockHash': block_hash, 'timestamp': block_timestamp_us}
+        try:
+            await self._submit_block()
+        except ConnectionError as e:
+            Logger.warning(f'Block confirm is suspended. ({e})', TBEARS_BLOCK_MANAGER)
+            return
+
+        Logger.debug(f'process_block_data done!!', TBEARS_BLOCK_MANAGER)
+
+    async def _resume_block(self) -> bool:
+        """
+        Finish the block which was half-finished when iconservice became unreachable.
+        The block is resubmitted with the same height, hash and timestamp, so it's idempotent
+        :return: True if there is no unfinished block any more
+        """
+        try:
+            if self._unsent_precommit is not None:
+                await self._send_precommit()
+            if self._pending_block is not None:
+                Logger.info(f'Resubmit block {self._pending_block["blockHash"]}', TBEARS_BLOCK_MANAGER)
+                await self._submit_block()
+        except ConnectionError as e:
+            Logger.warning(f'Failed to resume block confirm. ({e})', TBEARS_BLOCK_MANAGER)
+            return False
+
+        return True
+
+    async def _submit_block(self):
+        """
+        Invoke and confirm pending block. Pending block is kept if iconservice is unreachable
+        :return:
+        """
+        block = self._pending_block
+        tx_list = block['txList']
+
+        start = time.monotonic()
+
         # send invoke message to ICON
-        response = await self._invoke_block(tx_list=tx_list, block_hash=block_hash, block_timestamp=block_timestamp_us)
+        response = await self._invoke_block(tx_list=tx_list, block_hash=block['blockHash'],
+                                            block_timestamp=block['timestamp'])
+        self._pending_block = None
         if response is None:
             Logger.debug(f'iconservice response None for invoke request.', TBEARS_BLOCK_MANAGER)
+            self._tx_status.remove([tx['txHash'] for tx in tx_list])
             return
 
         # send write precommit message and confirm block
-        await self._confirm_block(tx_list= tx_list, tx_result= response, block_hash=block_hash, timestamp=block_timestamp_us)
-        Logger.debug(f'process_block_data done!!', TBEARS_BLOCK_MANAGER)
+        await self._confirm_block(tx_list=tx_list, tx_result=response, block_hash=block['blockHash'],
+                                  timestamp=block['timestamp'])
+
+        self._block_count += 1
+        self._committed_tx_count += len(tx_list)
+        self._block_time += time.monotonic() - start
 
     async def _invoke_block(self, tx_list: list, block_hash: str, block_timestamp) -> dict:
         """
@@ -298,7 +687,7 @@ class BlockManager(object):
         }
 
         # send invoke message to iconservice
-        response = await self._icon_stub.async_task().invoke(request)
+        response = await self._call_icon('invoke', request)
 
         if 'error' in response:
             Logger.debug(f'Get error response from iconservice: {response}!!', TBEARS_BLOCK_MANAGER)
@@ -329,16 +718,147 @@ class BlockManager(object):
 
         # update block information
         self.block.commit_block(prev_block_hash=block_hash)
+        self._tx_status.commit([tx['txHash'] for tx in tx_list], block_height=self.block.block_height)
+
+        # committed transactions don't need to be restored any more
+        await self._tx_log.rewrite(self._tx_queue)
 
         block_height = self.block.block_height + 1
         precommit_request = {'blockHeight': hex(block_height),
                              'blockHash': block_hash}
+        event = CommitNotifier.make_event(block_height=self.block.block_height, block_hash=block_hash,
+                                          timestamp=timestamp, tx_results=tx_result)
 
-        # send write_precommit_state message to iconservice
-        await self._icon_stub.async_task().write_precommit_state(precommit_request)
+        # block is committed in tbears. write_precommit_state is sent again after reconnection if it fails
+        self._unsent_precommit = (precommit_request, event)
+        await self._send_precommit()
 
         Logger.debug(f'confirm block done.', TBEARS_BLOCK_MANAGER)
 
+    async def _send_precommit(self):
+        """
+        Send write_precommit_state message of committed block and notify commit
+        :return:
+        """
+        precommit_request, event = self._unsent_precommit
+
+        # send write_precommit_state message to iconservice
+        await self._call_icon('write_precommit_state', precommit_request)
+        self._unsent_precommit = None
+
+        # state of iconservice is changed. drop cached query results
+        if self._query_proxy is not None:
+            self._query_proxy.invalidate(block_height=self.block.block_height)
+
+        # notify commit to subscribers waiting transaction results
+        if self._commit_notifier is not None:
+            self._commit_notifier.publish(event)
+
+
+class BlockManagerHost(object):
+    """
+    Serve multiple channels in one process. Each channel has its own block manager with Block DB,
+    transaction queue and block confirmation scheduler. All block managers run on the shared event loop.
+    Each channel is invoked by its own iconservice process
+    """
+    def __init__(self, conf: 'IconConfig'):
+        self._block_managers = OrderedDict()
+        for channel in get_channels(conf):
+            self._block_managers[channel] = BlockManager(conf=make_channel_conf(conf, channel), host=self)
+
+    @property
+    def block_managers(self) -> 'OrderedDict':
+        return self._block_managers
+
+    def serve(self):
+        # start message queue service
+        loop = MessageQueueService.loop
+        # seal transactions left in queue before exit. 'tbears stop' sends SIGTERM
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, lambda: asyncio.ensure_future(self.shutdown()))
+        for block_manager in self._block_managers.values():
+            loop.create_task(block_manager.start())
+        loop.run_forever()
+
+    async def shutdown(self):
+        """
+        Shutdown block managers of all channels
+        :return:
+        """
+        Logger.info(f'metrics: {self.get_metrics()}', TBEARS_BLOCK_MANAGER)
+        await asyncio.gather(*[block_manager.shutdown() for block_manager in self._block_managers.values()])
+
+    def on_closed(self, block_manager: 'BlockManager'):
+        Logger.info(f'channel {block_manager.channel} closed', TBEARS_BLOCK_MANAGER)
+        if all(block_manager.closed for block_manager in self._block_managers.values()):
+            get_event_loop().stop()
+
+    def get_metrics(self) -> dict:
+        """
+        Get metrics of all channels
+        :return: channel name -> metrics
+        """
+        return {channel: block_manager.get_metrics() for channel, block_manager in self._block_managers.items()}
+
+
+def get_channels(conf: dict) -> list:
+    """
+    Get channel names to serve. The channel of ConfigKey.CHANNEL is served first.
+    Each channel needs its own iconservice process. Embedded ICON service engine serves one channel only because
+    engines in a process share class level state of iconservice like DB and SCORE loader
+    :param conf: configuration
+    :return: channel names
+    """
+    channels = [conf[ConfigKey.CHANNEL]]
+    for channel in conf.get(ConfigKey.CHANNELS, None) or []:
+        if channel in channels:
+            continue
+        if not isinstance(channel, str) or CHANNEL_NAME_PATTERN.match(channel) is None:
+            raise ValueError(f'Invalid channel name: {channel}')
+        channels.append(channel)
+
+    if len(channels) > 1 and conf.get(ConfigKey.EMBEDDED_ENGINE, False):
+        raise ValueError(f"'{ConfigKey.CHANNELS}' can't be used with embedded ICON service engine. "
+                         f"Unset '{ConfigKey.EMBEDDED_ENGINE}'")
+
+    return channels
+
+
+def make_channel_conf(conf: 'IconConfig', channel: str) -> 'IconConfig':
+    """
+    Make configuration of a channel. Channels other than ConfigKey.CHANNEL use their own directories next to
+    the directories of ConfigKey.CHANNEL and own commit notifier path, so the default channel keeps the paths of
+    single channel mode
+    :param conf: configuration
+    :param channel: channel name
+    :return: configuration of the channel
+    """
+    channel_conf = deepcopy(conf)
+    if channel == conf[ConfigKey.CHANNEL]:
+        return channel_conf
+
+    channel_conf[ConfigKey.CHANNEL] = channel
+    # sibling directories. sub directory would collide with DBs of the default channel. e.g. 'tbears'
+    channel_conf['stateDbRootPath'] = f'{os.path.normpath(conf["stateDbRootPath"])}_{channel}'
+    channel_conf['scoreRootPath'] = f'{os.path.normpath(conf["scoreRootPath"])}_{channel}'
+    if conf.get(ConfigKey.COMMIT_NOTIFY_PATH, None):
+        channel_conf[ConfigKey.COMMIT_NOTIFY_PATH] = f'{conf[ConfigKey.COMMIT_NOTIFY_PATH]}.{channel}'
+
+    return channel_conf
+
+
+def _get_directory_size(path: str) -> int:
+    size = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    size += entry.stat().st_size
+    except OSError:
+        pass
+
+    return size
+
 
 def create_parser():
     """
@@ -355,6 +875,10 @@ def create_parser():
                         help='Block confirm interval in second')
     parser.add_argument('-be', '--block-confirm-empty', dest=ConfigKey.BLOCK_CONFIRM_EMPTY, type=bool,
                         help='Confirm empty block')
+    parser.add_argument('-is', '--instant-seal', dest=ConfigKey.BLOCK_INSTANT_SEAL, action='store_const', const=True,
+                        help='Confirm block as soon as transaction arrives')
+    parser.add_argument('-em', '--embedded', dest=ConfigKey.EMBEDDED_ENGINE, action='store_const', const=True,
+                        help='Run ICON service engine in block manager process')
     parser.add_argument('-c', '--config', help='Configuration file path')
 
     return parser
@@ -386,9 +910,13 @@ def main():
 
     setproctitle.setproctitle(f'{TBEARS_BLOCK_MANAGER}.{conf[ConfigKey.CHANNEL]}.{conf[ConfigKey.AMQP_KEY]}')
 
-    # run block_manager service
-    block_manager = BlockManager(conf=conf)
-    block_manager.serve()
+    # run block_manager service. block managers of all channels share the process
+    try:
+        host = BlockManagerHost(conf=conf)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    host.serve()
 
     Logger.info('===============tbears block_manager done================', TBEARS_BLOCK_MANAGER)
 
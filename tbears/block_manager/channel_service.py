@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 from typing import Tuple, TYPE_CHECKING, Optional
 
 from iconcommons import IconConfig
@@ -20,11 +19,16 @@ from iconcommons.logger import Logger
 from earlgrey import MessageQueueService, message_queue_task
 
 from tbears.block_manager import message_code
+from tbears.block_manager.mq_connection import MQ_CHANNEL, close_connection, is_current_connection
+from tbears.block_manager.mq_metrics import measure_task
+from tbears.block_manager.tx_status import TxState
 from tbears.util import create_hash
+from tbears.util.json_codec import dumps, dumps_canonical
 
 if TYPE_CHECKING:
     from earlgrey import RobustConnection
     from tbears.block_manager.block_manager import BlockManager
+    from tbears.block_manager.mq_metrics import MqMetrics
 
 
 class ChannelInnerTask(object):
@@ -37,7 +41,12 @@ class ChannelInnerTask(object):
         self._block_manager = block_manager
         self.confirmed_tx_list = list()
 
+    @property
+    def metrics(self) -> 'MqMetrics':
+        return self._block_manager.metrics
+
     @message_queue_task
+    @measure_task('Channel')
     async def create_icx_tx(self, kwargs: dict) -> Tuple[int, Optional[str]]:
         """
         Handler of 'create_icx_tx' message. 'create_icx_tx' is generated by 'icx_sendTransaction'
@@ -49,14 +58,14 @@ class ChannelInnerTask(object):
         block_manager = self._block_manager
 
         # generate tx hash
-        tx_hash = create_hash(json.dumps(kwargs).encode())
+        # hash must not depend on JSON codec
+        tx_hash = create_hash(dumps_canonical(kwargs))
 
-        # check duplication
+        # check duplication. transactions not committed yet are tracked by block manager
         duplicated_tx = False
-        for tx in block_manager.tx_queue:
-            if tx_hash == tx ['txHash']:
-                duplicated_tx = True
-        if duplicated_tx is False and block_manager._block.get_transaction(tx_hash=tx_hash):
+        if block_manager.tx_status.get(tx_hash) is not None:
+            duplicated_tx = True
+        elif block_manager._block.get_transaction(tx_hash=tx_hash):
             duplicated_tx = True
 
         if duplicated_tx:
@@ -65,10 +74,24 @@ class ChannelInnerTask(object):
         # append to transaction queue
         block_manager.add_tx(tx_hash=tx_hash, tx=kwargs)
 
+        # response after the transaction is written to transaction log. log is synced in group
+        try:
+            await block_manager.tx_log.sync()
+        except Exception as e:
+            # transaction which may be lost on restart is rejected
+            Logger.error(f'Reject transaction not written to transaction log. {e}', "create_icx_tx")
+            block_manager.remove_tx(tx_hash)
+            return message_code.Response.fail, None
+
+        # in instant seal mode, response after the block including the transaction is confirmed
+        if block_manager.instant_seal:
+            await block_manager.confirm_instantly()
+
         Logger.debug(f'Response create_icx_tx!!', "create_icx_tx")
         return message_code.Response.success, f"0x{tx_hash}"
 
     @message_queue_task
+    @measure_task('Channel')
     async def get_invoke_result(self, tx_hash: str) -> Tuple[int, str]:
         """
         Handler of 'get_invoke_result' message. 'get_invoke_result' is generated by 'icx_getTransactionResult'
@@ -76,15 +99,23 @@ class ChannelInnerTask(object):
         :return: message code and transaction result information
         """
         Logger.debug(f'Get getTransactionResult tx_hash: {tx_hash}')
-        block = self._block_manager._block
+        block_manager = self._block_manager
 
-        tx_data_json = block.get_txresult(tx_hash=tx_hash)
+        # answer pending transactions from memory. iconrpcserver responds 'Pending transaction' error without the
+        # status, so icx_getTransactionByHash shows it
+        tx_status = block_manager.tx_status.get(tx_hash)
+        if tx_status is not None and tx_status.state != TxState.COMMITTED:
+            return message_code.Response.fail_tx_not_invoked, tx_status.to_dict()
+
+        tx_data_json = block_manager.block.get_txresult(tx_hash=tx_hash)
         if tx_data_json is None:
-            return message_code.Response.fail_tx_not_invoked, {}
+            # unknown transaction. it's neither pending nor committed
+            return message_code.Response.fail_invalid_key_error, {}
 
         return message_code.Response.success, tx_data_json
 
     @message_queue_task
+    @measure_task('Channel')
     async def get_tx_info(self, tx_hash: str) -> Tuple[int, dict]:
         """
         Handler of 'get_tx_info' message. 'get_tx_info' is generated by 'icx_getTransactionByHash'
@@ -92,15 +123,30 @@ class ChannelInnerTask(object):
         :return: message code and transaction information
         """
         Logger.debug(f'Get getTransactionByHash tx_hash: {tx_hash}')
-        block = self._block_manager._block
+        block_manager = self._block_manager
+
+        # iconrpcserver forwards 'transaction' of the response only. lifecycle state is put in it as 'txStatus'
+        tx_status = block_manager.tx_status.get(tx_hash)
+        if tx_status is not None and tx_status.tx is not None:
+            # answer transactions not written to DB yet from memory
+            transaction = {**tx_status.tx, 'txStatus': tx_status.to_dict()}
+            return message_code.Response.success, {'transaction': transaction, 'tx_index': None,
+                                                   'block_height': None, 'block_hash': None}
 
-        tx_data_json = block.get_transaction(tx_hash=tx_hash)
+        tx_data_json = block_manager.block.get_transaction(tx_hash=tx_hash)
         if tx_data_json is None:
-            return message_code.Response.fail_tx_invalid_hash_not_match, {}
+            # unknown transaction must be an error for iconrpcserver
+            return message_code.Response.fail_invalid_key_error, {}
 
+        if tx_status is not None:
+            tx_data_json['transaction']['txStatus'] = tx_status.to_dict()
+        else:
+            tx_data_json['transaction']['txStatus'] = {'status': TxState.COMMITTED,
+                                                       'blockHeight': tx_data_json['block_height']}
         return message_code.Response.success, tx_data_json
 
     @message_queue_task
+    @measure_task('Channel')
     async def get_block(self, block_height: int, block_hash: str, block_data_filter: str, tx_data_filter: str)\
             -> Tuple[int, str, str, list]:
         """
@@ -137,17 +183,31 @@ class ChannelInnerTask(object):
             return fail_response_code, block_hash, "", []
 
         block_hash: str = block_data_json['block_hash']
-        block_data_json_str: str = json.dumps(block_data_json)
+        block_data_json_str: str = dumps(block_data_json).decode()
 
         # tbears does not support filters
 
         Logger.debug(f'Response block!!', "block")
         return message_code.Response.success, block_hash, block_data_json_str, []
 
+    @message_queue_task
+    async def get_metrics(self) -> dict:
+        """
+        Handler of 'get_metrics' message. Block manager metrics and message queue round trip metrics
+        :return: metrics
+        """
+        return self._block_manager.get_metrics()
+
 
 class ChannelService(MessageQueueService[ChannelInnerTask]):
     TaskType = ChannelInnerTask
 
+    async def reconnect(self):
+        await close_connection(self)
+        await self.connect(exclusive=True)
+
     def _callback_connection_lost_callback(self, connection: 'RobustConnection'):
+        if not is_current_connection(self, connection):
+            return
         Logger.error(f'ChannelService lost message queue connection', 'tbears_block_manager')
-        self._task._block_manager.close()
+        self._task._block_manager.on_connection_lost(MQ_CHANNEL)
@@ -0,0 +1,175 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+import socket
+import stat
+from typing import Optional
+
+from iconcommons.logger import Logger
+
+from tbears.config.tbears_config import ConfigKey
+from tbears.util.json_codec import dumps
+
+LOG_NOTIFIER = 'NOTIFIER'
+
+# subscriber which does not read events is disconnected when its buffer grows over this size
+MAX_SUBSCRIBER_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def resolve_commit_notify_path(conf: dict) -> Optional[str]:
+    """
+    Get absolute unix socket path of commit notifier. Relative path is resolved against 'stateDbRootPath',
+    so tbears services with their own state DB don't share a socket
+    :param conf: server configuration
+    :return: unix socket path. None if commit notifier is disabled
+    """
+    path = conf.get(ConfigKey.COMMIT_NOTIFY_PATH, None)
+    if not path:
+        return None
+
+    return os.path.abspath(os.path.join(conf['stateDbRootPath'], path))
+
+
+class CommitNotifier(object):
+    """
+    Publish block commit events to subscribers connected to local unix socket.
+    Each event is a JSON object in a line.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._server = None
+        self._writers = set()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._writers)
+
+    async def start(self):
+        """
+        Start listening unix socket
+        :return:
+        """
+        self._remove_stale_socket()
+
+        self._server = await asyncio.start_unix_server(self._on_connected, path=self._path)
+        # only the user running block manager can subscribe
+        os.chmod(self._path, 0o600)
+
+        Logger.debug(f'commit notifier started. path: {self._path}', LOG_NOTIFIER)
+
+    def close(self):
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+            if os.path.exists(self._path):
+                os.remove(self._path)
+
+    def _remove_stale_socket(self):
+        """
+        Remove socket file left by a service which was not shut down gracefully.
+        Socket of a running service or file which is not a socket is never removed
+        :return:
+        """
+        try:
+            mode = os.stat(self._path).st_mode
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(f'{self._path} exists and is not a socket')
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self._path)
+        except ConnectionRefusedError:
+            # nobody listens on the socket
+            os.remove(self._path)
+            return
+        finally:
+            sock.close()
+
+        raise FileExistsError(f'{self._path} is used by another running service')
+
+    async def _on_connected(self, reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter'):
+        self._writers.add(writer)
+        Logger.debug(f'commit subscriber connected. subscribers: {len(self._writers)}', LOG_NOTIFIER)
+
+        # subscribers don't send anything. wait until connection is closed
+        try:
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def publish(self, event: dict):
+        """
+        Send event to all subscribers
+        :param event: commit event
+        :return:
+        """
+        if not self._writers:
+            return
+
+        line = dumps(event) + b'\n'
+        for writer in list(self._writers):
+            transport = writer.transport
+            if transport.is_closing() or transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER_SIZE:
+                Logger.debug(f'drop commit subscriber', LOG_NOTIFIER)
+                self._writers.discard(writer)
+                writer.close()
+                continue
+
+            writer.write(line)
+
+    @staticmethod
+    def make_event(block_height: int, block_hash: str, timestamp: int, tx_results: dict) -> dict:
+        """
+        Make commit event with summary of transaction results
+        :param block_height: block height
+        :param block_hash: block hash
+        :param timestamp: block timestamp
+        :param tx_results: transaction results. txHash -> transaction result
+        :return: commit event
+        """
+        summary = {}
+        for tx_hash, tx_result in tx_results.items():
+            if not isinstance(tx_result, dict):
+                continue
+            result = {'status': tx_result.get('status')}
+            if tx_result.get('scoreAddress'):
+                result['scoreAddress'] = tx_result['scoreAddress']
+            if tx_result.get('failure'):
+                result['failure'] = tx_result['failure']
+            summary[tx_hash if tx_hash[:2] == '0x' else f'0x{tx_hash}'] = result
+
+        return {
+            'height': block_height,
+            'blockHash': f'0x{block_hash}',
+            'timestamp': timestamp,
+            'txResults': summary
+        }
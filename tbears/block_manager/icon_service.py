@@ -11,15 +11,22 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-
+import copy
 from typing import TYPE_CHECKING
 
 from earlgrey import MessageQueueStub, message_queue_task
+from iconcommons.icon_config import IconConfig
 from iconcommons.logger import Logger
+from iconservice.icon_config import default_icon_config
+from iconservice.icon_inner_service import IconScoreInnerService, IconScoreInnerTask as IconEngineTask
 
+from tbears.block_manager.mq_connection import MQ_ICON, close_connection, is_current_connection
+from tbears.block_manager.query_proxy import QueryProxy
+from tbears.config.tbears_config import ConfigKey
 
 if TYPE_CHECKING:
     from earlgrey import RobustConnection
+    from tbears.block_manager.block_manager import BlockManager
 
 
 class IconScoreInnerTask(object):
@@ -50,6 +57,112 @@ class IconScoreInnerTask(object):
 class IconStub(MessageQueueStub[IconScoreInnerTask]):
     TaskType = IconScoreInnerTask
 
+    def __init__(self, amqp_target: str, route_key: str, block_manager: 'BlockManager' = None):
+        super().__init__(amqp_target, route_key)
+        self._block_manager = block_manager
+
+    async def reconnect(self):
+        await close_connection(self)
+        await self.connect()
+
     def _callback_connection_lost_callback(self, connection: 'RobustConnection'):
+        if not is_current_connection(self, connection):
+            return
         Logger.error(f'IconStub lost message queue connection', 'tbears_block_manager')
-        self._task._block_manager.close()
+        if self._block_manager is not None:
+            self._block_manager.on_connection_lost(MQ_ICON)
+
+
+class EmbeddedIconScoreInnerTask(IconEngineTask):
+    """
+    Task of embedded ICON service engine. Queries from iconrpcserver are answered through query proxy
+    """
+    query_proxy: 'QueryProxy' = None
+
+    @message_queue_task
+    async def query(self, request: dict) -> dict:
+        if self.query_proxy is None:
+            return await self.query_engine(request)
+        return await self.query_proxy.query(request)
+
+    async def query_engine(self, request: dict) -> dict:
+        """
+        Send query request to ICON service engine without cache
+        :param request: query request
+        :return: query response
+        """
+        return await super().query(request)
+
+    @message_queue_task
+    async def close(self):
+        self.close_engine()
+
+    def close_engine(self):
+        """
+        Close ICON service engine and its threads. Unlike iconservice, the event loop is kept running
+        because it's shared with block manager
+        :return:
+        """
+        for thread_pool in self._thread_pool.values():
+            thread_pool.shutdown(wait=True)
+
+        if self._icon_service_engine is not None:
+            self._icon_service_engine.close()
+            self._icon_service_engine = None
+
+
+class EmbeddedIconService(IconScoreInnerService):
+    """
+    'iconscore' message queue service of embedded ICON service engine
+    """
+    TaskType = EmbeddedIconScoreInnerTask
+    block_manager: 'BlockManager' = None
+
+    def _callback_connection_lost_callback(self, connection: 'RobustConnection'):
+        if not is_current_connection(self, connection):
+            return
+        Logger.error(f'Embedded ICON service lost message queue connection', 'tbears_block_manager')
+        if self.block_manager is not None:
+            self.block_manager.on_connection_lost(MQ_ICON)
+
+
+class EmbeddedIconStub(object):
+    """
+    Run ICON service engine in block manager process. It has the same interface as IconStub,
+    but block manager calls the task directly without sending messages.
+    The task also serves 'iconscore' message queue for queries from iconrpcserver.
+    Results of the queries are cached until next block.
+    Only one embedded stub can run in a process because ICON service engine keeps its DB and SCORE loader
+    in class level state
+    """
+    def __init__(self, amqp_target: str, route_key: str, conf: dict, block_manager: 'BlockManager' = None):
+        icon_conf = IconConfig("", copy.deepcopy(default_icon_config))
+        icon_conf.update_conf(conf)
+
+        self._service = EmbeddedIconService(amqp_target, route_key, conf=icon_conf)
+        self._service.block_manager = block_manager
+
+        task = self._service._task
+        block_height = block_manager.block.block_height if block_manager is not None else -1
+        self.query_proxy = QueryProxy(query_func=task.query_engine, block_height=block_height,
+                                      cache_size=conf.get(ConfigKey.QUERY_CACHE_SIZE, 0))
+        task.query_proxy = self.query_proxy
+
+    async def connect(self, **kwargs):
+        await self._service.connect(exclusive=True)
+
+    async def reconnect(self):
+        # the engine is kept. only the connection serving queries is renewed
+        await close_connection(self._service)
+        await self.connect()
+
+    async def disconnect(self):
+        # stop serving queries from iconrpcserver
+        await close_connection(self._service)
+
+    def async_task(self):
+        return self._service._task
+
+    def close(self):
+        Logger.debug(f'close embedded ICON service engine', 'tbears_block_manager')
+        self.async_task().close_engine()
@@ -0,0 +1,76 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import inspect
+import random
+
+from iconcommons.logger import Logger
+
+# names of message queue connections of block manager
+MQ_CHANNEL = 'channel'
+MQ_ICON = 'icon'
+
+
+class Backoff(object):
+    """
+    Exponential backoff delays with jitter
+    """
+    def __init__(self, initial: float, maximum: float, factor: float = 2, jitter: float = 0.1):
+        self._initial = initial
+        self._maximum = maximum
+        self._factor = factor
+        self._jitter = jitter
+        self._delay = initial
+
+    def next(self) -> float:
+        """
+        Get next delay
+        :return: delay in seconds
+        """
+        delay = self._delay
+        self._delay = min(self._delay * self._factor, self._maximum)
+        return delay * (1 + random.uniform(-self._jitter, self._jitter))
+
+    def reset(self):
+        self._delay = self._initial
+
+
+def is_current_connection(mq_connection, connection) -> bool:
+    """
+    Check the connection of connection lost callback is the connection in use.
+    Callbacks of connections closed on reconnection are ignored
+    :param mq_connection: message queue service or stub
+    :param connection: connection of the callback
+    :return: True if it's the connection in use
+    """
+    current = getattr(mq_connection, '_connection', None)
+    return current is None or current is connection
+
+
+async def close_connection(mq_connection):
+    """
+    Close the connection of message queue service or stub quietly.
+    Robust connection keeps trying to reconnect by itself unless it's closed
+    :param mq_connection: message queue service or stub
+    :return:
+    """
+    connection = getattr(mq_connection, '_connection', None)
+    if connection is None:
+        return
+
+    try:
+        result = connection.close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        Logger.debug(f'Failed to close message queue connection. ({e})', 'tbears_block_manager')
@@ -0,0 +1,208 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import functools
+import time
+from bisect import bisect_left
+
+from iconcommons.logger import Logger
+
+LOG_MQ_METRICS = 'MQ_METRICS'
+
+# upper bounds of latency histogram buckets in milliseconds. the last bucket has no upper bound
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram(object):
+    """
+    Latency histogram with fixed buckets
+    """
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed_ms: float):
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total += elapsed_ms
+        if elapsed_ms > self.max:
+            self.max = elapsed_ms
+
+    def to_dict(self) -> dict:
+        bounds = [f'le{bound}ms' for bound in LATENCY_BUCKETS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'avgMs': round(self.total / self.count, 3) if self.count else 0,
+            'maxMs': round(self.max, 3),
+            'buckets': {bound: count for bound, count in zip(bounds, self.buckets) if count}
+        }
+
+
+class MethodMetrics(object):
+    """
+    Metrics of a message queue method
+    """
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def to_dict(self) -> dict:
+        metrics = self.latency.to_dict()
+        metrics.update({
+            'inFlight': self.in_flight,
+            'maxInFlight': self.max_in_flight,
+            'errors': self.errors,
+            'requestBytes': self.request_bytes,
+            'responseBytes': self.response_bytes
+        })
+        return metrics
+
+
+class MqMetrics(object):
+    """
+    Collect latency, payload size and in-flight count of message queue calls per method.
+    Payload size is the estimated size of JSON-encoded arguments and result. It is measured without serializing
+    the payload, so large payloads like SCORE deploy content do not add cost to message queue calls
+    """
+    def __init__(self, slow_call_threshold: float = 0):
+        """
+        :param slow_call_threshold: log calls taking longer than this in seconds. 0 disables the log
+        """
+        self._slow_call_threshold = slow_call_threshold
+        self._methods = {}
+
+    def get(self, name: str) -> 'MethodMetrics':
+        metrics = self._methods.get(name)
+        if metrics is None:
+            metrics = self._methods[name] = MethodMetrics()
+        return metrics
+
+    async def measure(self, name: str, func: callable, *args, **kwargs):
+        """
+        Call coroutine function and record metrics
+        :param name: method name
+        :param func: coroutine function
+        :return: result of func
+        """
+        metrics = self.get(name)
+        request_bytes = _payload_size((args, kwargs))
+        metrics.request_bytes += request_bytes
+        metrics.in_flight += 1
+        if metrics.in_flight > metrics.max_in_flight:
+            metrics.max_in_flight = metrics.in_flight
+
+        start = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException:
+            metrics.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            metrics.in_flight -= 1
+            metrics.latency.add(elapsed * 1000)
+
+        response_bytes = _payload_size(result)
+        metrics.response_bytes += response_bytes
+
+        if 0 < self._slow_call_threshold <= elapsed:
+            Logger.warning(f'Slow message queue call {name}: {elapsed:.3f}s, '
+                           f'request {request_bytes} bytes, response {response_bytes} bytes', LOG_MQ_METRICS)
+
+        return result
+
+    def to_dict(self) -> dict:
+        return {name: metrics.to_dict() for name, metrics in sorted(self._methods.items())}
+
+
+class InstrumentedTask(object):
+    """
+    Proxy of message queue stub task. Calls are measured with method name '<prefix>.<method>'
+    """
+    def __init__(self, task, metrics: 'MqMetrics', prefix: str):
+        self._task = task
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def __getattr__(self, item):
+        attr = getattr(self._task, item)
+        if not callable(attr):
+            return attr
+
+        name = f'{self._prefix}.{item}'
+
+        @functools.wraps(attr)
+        async def _measured(*args, **kwargs):
+            return await self._metrics.measure(name, attr, *args, **kwargs)
+
+        return _measured
+
+
+class InstrumentedStub(object):
+    """
+    Wrapper of message queue stub which measures calls of its async task
+    """
+    def __init__(self, stub, metrics: 'MqMetrics', prefix: str):
+        self._stub = stub
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def async_task(self) -> 'InstrumentedTask':
+        return InstrumentedTask(self._stub.async_task(), self._metrics, self._prefix)
+
+    def __getattr__(self, item):
+        return getattr(self._stub, item)
+
+
+def measure_task(prefix: str):
+    """
+    Decorator for handlers of message queue service task. Use under '@message_queue_task'.
+    The task must have 'metrics' attribute
+    :param prefix: prefix of method name
+    """
+    def _decorator(func):
+        name = f'{prefix}.{func.__name__}'
+
+        @functools.wraps(func)
+        async def _wrapper(self, *args, **kwargs):
+            return await self.metrics.measure(name, functools.partial(func, self), *args, **kwargs)
+
+        return _wrapper
+
+    return _decorator
+
+
+def _payload_size(payload) -> int:
+    """
+    Estimate size of compact JSON-encoded payload. Strings are counted by length without escaping
+    :param payload: payload of message queue call
+    :return: estimated size in bytes
+    """
+    if isinstance(payload, (str, bytes)):
+        return len(payload) + 2
+    if isinstance(payload, dict):
+        return 1 + sum(_payload_size(key) + _payload_size(value) + 2 for key, value in payload.items()) \
+            + (0 if payload else 1)
+    if isinstance(payload, (list, tuple)):
+        return 1 + sum(_payload_size(value) + 1 for value in payload) + (0 if payload else 1)
+    if payload is None or payload is True:
+        return 4
+    if payload is False:
+        return 5
+    return len(str(payload))
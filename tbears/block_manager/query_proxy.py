@@ -0,0 +1,122 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from iconcommons.logger import Logger
+
+LOG_QUERY = 'QUERY'
+
+# read-only methods whose result depends only on the committed state
+CACHEABLE_QUERY_METHODS = ('icx_call', 'icx_getBalance', 'icx_getTotalSupply', 'icx_getScoreApi')
+
+
+class QueryProxy(object):
+    """
+    Answer read-only queries through ICON service engine and cache results per block height
+    """
+
+    def __init__(self, query_func: Callable[[dict], Awaitable[Any]], block_height: int, cache_size: int):
+        """
+        :param query_func: coroutine function sending query request to ICON service engine
+        :param block_height: block height of the latest committed state
+        :param cache_size: maximum number of cached results. 0 disables the cache
+        """
+        self._query_func = query_func
+        self._cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._in_flight = {}
+        self._block_height = block_height
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @property
+    def block_height(self) -> int:
+        return self._block_height
+
+    def invalidate(self, block_height: int):
+        """
+        Drop cached results. Called after iconservice has written the state of a new block
+        :param block_height: block height of the latest committed state
+        :return:
+        """
+        self._block_height = block_height
+        self._cache.clear()
+        self._in_flight.clear()
+        Logger.debug(f'query cache invalidated. block_height: {block_height}', LOG_QUERY)
+
+    async def query(self, request: dict) -> Any:
+        """
+        Send query request to ICON service engine. Results of read-only methods are cached until block height changes
+        :param request: query request. {'method': ..., 'params': ...}
+        :return: query response of iconservice
+        """
+        if self._cache_size <= 0 or request.get('method') not in CACHEABLE_QUERY_METHODS:
+            return await self._query(request)
+
+        key = (self.normalize_request(request), self._block_height)
+        if key in self._cache:
+            self.hit_count += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        # same query is being processed. wait for the response instead of sending another one
+        future: Optional[asyncio.Future] = self._in_flight.get(key)
+        if future is not None:
+            self.hit_count += 1
+            return await asyncio.shield(future)
+
+        self.miss_count += 1
+        future = asyncio.get_event_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await self._query(request)
+        except Exception as e:
+            future.set_exception(e)
+            # retrieve the exception to suppress 'exception was never retrieved' warning
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            # block height may change while waiting the response. don't cache stale response
+            if key[1] == self._block_height and self._is_cacheable(response):
+                self._put(key, response)
+            return response
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _query(self, request: dict) -> Any:
+        return await self._query_func(request)
+
+    def _put(self, key: tuple, response: Any):
+        self._cache[key] = response
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _is_cacheable(response: Any) -> bool:
+        return not (isinstance(response, dict) and 'error' in response)
+
+    @staticmethod
+    def normalize_request(request: dict) -> str:
+        """
+        Make cache key string of query request. JSON-RPC 'id' is not a part of query
+        :param request: query request
+        :return: normalized request string
+        """
+        normalized = {k: v for k, v in request.items() if k != 'id'}
+        return json.dumps(normalized, sort_keys=True, separators=(',', ':'))
@@ -71,5 +71,12 @@ class TbearsDB:
     def commit_write_batch(write_batch):
         write_batch.write()
 
-    def iterator(self) -> iter:
-        return self._db.iterator()
+    def iterator(self, prefix: bytes = None) -> iter:
+        """Iterate rows in key order
+
+        :param prefix: iterate only the rows whose keys start with prefix
+        :return: iterator of (key, value)
+        """
+        if prefix is None:
+            return self._db.iterator()
+        return self._db.iterator(prefix=prefix)
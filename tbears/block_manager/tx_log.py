@@ -0,0 +1,180 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+from typing import Optional
+
+from iconcommons.logger import Logger
+
+from tbears.util.json_codec import dumps, loads
+
+LOG_TX_LOG = 'TX_LOG'
+
+
+class TxWriteAheadLog(object):
+    """
+    Append-only log of transactions admitted to transaction queue. A transaction is a JSON object in a line.
+    Records are written and fsync-ed in groups. While one group is being synced, next records are buffered,
+    so there is at most one fsync in progress regardless of the number of transactions.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._fd: Optional[int] = None
+        self._buffer = []
+        # future of the group which buffered records belong to
+        self._group: Optional[asyncio.Future] = None
+        self._flush_task: Optional[asyncio.Future] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def replay(self) -> list:
+        """
+        Read transactions in log. A broken record at the end of log (written partially) is ignored
+        :return: transaction list
+        """
+        tx_list = []
+        if not os.path.exists(self._path):
+            return tx_list
+
+        with open(self._path, 'rb') as f:
+            for line in f:
+                try:
+                    tx_list.append(loads(line))
+                except ValueError:
+                    Logger.warning(f'Ignore broken record in transaction log', LOG_TX_LOG)
+                    break
+
+        return tx_list
+
+    def open(self, tx_list: list = None):
+        """
+        Open log for appending. Log is rewritten with given transactions
+        :param tx_list: transactions which must remain in log
+        :return:
+        """
+        self._lock = asyncio.Lock()
+        self._replace(self._encode(tx_list or []))
+
+    def append(self, tx: dict) -> 'asyncio.Future':
+        """
+        Buffer a transaction record. Use sync() to wait until it's written to disk
+        :param tx: transaction
+        :return: future of the group the record belongs to. It fails if the record is not written
+        """
+        self._buffer.append(dumps(tx) + b'\n')
+        if self._group is None:
+            self._group = asyncio.get_event_loop().create_future()
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush())
+        return self._group
+
+    async def sync(self):
+        """
+        Wait until all buffered records are written to disk
+        :return:
+        """
+        if self._group is not None:
+            await asyncio.shield(self._group)
+
+    async def _flush(self):
+        loop = asyncio.get_event_loop()
+        try:
+            while self._buffer:
+                async with self._lock:
+                    if not self._buffer:
+                        break
+                    data = b''.join(self._buffer)
+                    group = self._group
+                    self._buffer = []
+                    self._group = None
+
+                    try:
+                        await loop.run_in_executor(None, self._write, self._fd, data)
+                    except Exception as e:
+                        Logger.error(f'Failed to write transaction log. {e}', LOG_TX_LOG)
+                        group.set_exception(e)
+                        group.exception()
+                    else:
+                        group.set_result(None)
+        finally:
+            self._flush_task = None
+
+    async def rewrite(self, tx_list: list):
+        """
+        Replace log with given transactions. Called after block commit with transactions left in queue
+        :param tx_list: transactions which are not sealed yet
+        :return:
+        """
+        async with self._lock:
+            # buffered records are in tx_list. they are written with new log
+            self._buffer = []
+            group, self._group = self._group, None
+
+            data = self._encode(tx_list)
+            await asyncio.get_event_loop().run_in_executor(None, self._replace, data)
+
+            if group is not None:
+                group.set_result(None)
+
+    async def close(self):
+        """
+        Write buffered records and close log. The group being written is finished before the file is closed
+        :return:
+        """
+        if self._fd is None:
+            return
+
+        # flush task writes buffered records and resolves their group with the result of the write
+        while self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+        async with self._lock:
+            os.close(self._fd)
+            self._fd = None
+
+    def _replace(self, data: bytes):
+        tmp_path = f'{self._path}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            self._write(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, self._path)
+
+        # make rename durable
+        dir_fd = os.open(os.path.dirname(os.path.abspath(self._path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND)
+
+    @staticmethod
+    def _write(fd: int, data: bytes):
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+
+    @staticmethod
+    def _encode(tx_list: list) -> bytes:
+        return b''.join(dumps(tx) + b'\n' for tx in tx_list)
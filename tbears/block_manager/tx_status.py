@@ -0,0 +1,106 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+from typing import Iterable, Optional
+
+
+class TxState(object):
+    PENDING = 'pending'
+    INVOKING = 'invoking'
+    COMMITTED = 'committed'
+
+
+class TxStatus(object):
+    """
+    Lifecycle information of a transaction accepted by block manager. Timestamps are in microseconds
+    """
+    __slots__ = ('state', 'enqueued', 'sealed', 'committed', 'block_height', 'tx')
+
+    def __init__(self, enqueued: int, tx: dict = None):
+        self.state: str = TxState.PENDING
+        # transaction to answer icx_getTransactionByHash until it's written to DB
+        self.tx: Optional[dict] = tx
+        self.enqueued: int = enqueued
+        self.sealed: Optional[int] = None
+        self.committed: Optional[int] = None
+        self.block_height: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        status = {
+            'status': self.state,
+            'enqueued': hex(self.enqueued)
+        }
+        if self.sealed is not None:
+            status['sealed'] = hex(self.sealed)
+        if self.committed is not None:
+            status['committed'] = hex(self.committed)
+            status['blockHeight'] = hex(self.block_height)
+
+        return status
+
+
+class TxStatusTracker(object):
+    """
+    Keep transaction hash -> lifecycle state map of transactions which are not committed yet.
+    Committed transactions are kept until next block is committed and then DB answers for them
+    """
+
+    def __init__(self):
+        self._status = {}
+        self._last_committed = []
+
+    def __len__(self):
+        return len(self._status)
+
+    def get(self, tx_hash: str) -> Optional['TxStatus']:
+        return self._status.get(tx_hash)
+
+    def enqueue(self, tx_hash: str, tx: dict = None):
+        self._status[tx_hash] = TxStatus(enqueued=_now_us(), tx=tx)
+
+    def seal(self, tx_hashes: Iterable[str]):
+        now = _now_us()
+        for tx_hash in tx_hashes:
+            status = self._status.get(tx_hash)
+            if status is not None:
+                status.state = TxState.INVOKING
+                status.sealed = now
+
+    def commit(self, tx_hashes: Iterable[str], block_height: int):
+        # forget transactions committed in the previous block
+        for tx_hash in self._last_committed:
+            status = self._status.get(tx_hash)
+            if status is not None and status.state == TxState.COMMITTED:
+                del self._status[tx_hash]
+
+        now = _now_us()
+        committed = []
+        for tx_hash in tx_hashes:
+            status = self._status.get(tx_hash)
+            if status is not None:
+                status.state = TxState.COMMITTED
+                status.committed = now
+                status.block_height = block_height
+                # DB answers for the transaction from now on
+                status.tx = None
+                committed.append(tx_hash)
+        self._last_committed = committed
+
+    def remove(self, tx_hashes: Iterable[str]):
+        for tx_hash in tx_hashes:
+            self._status.pop(tx_hash, None)
+
+
+def _now_us() -> int:
+    return int(time.time() * 10 ** 6)
@@ -19,10 +19,12 @@ from typing import Optional
 
 from iconcommons.logger import Logger
 
+from tbears.command.command_bench import CommandBench
 from tbears.command.command_wallet import CommandWallet
 from tbears.command.command_server import CommandServer
 from tbears.command.command_score import CommandScore
 from tbears.command.command_util import CommandUtil
+from tbears.command.command_verify import CommandVerify
 from tbears.config.tbears_config import tbears_server_config
 from tbears.tbears_exception import TBearsBaseException, TBearsExceptionCode
 from tbears.util import get_tbears_version
@@ -43,6 +45,8 @@ class Command(object):
         self.cmdScore = CommandScore(self.subparsers)
         self.cmdUtil = CommandUtil(self.subparsers)
         self.cmdWallet = CommandWallet(self.subparsers)
+        self.cmdBench = CommandBench(self.subparsers)
+        self.cmdVerify = CommandVerify(self.subparsers)
 
     def _create_parser(self):
         parser = TbearsParser(prog='tbears', description=f'tbears v{self.version} arguments')
@@ -74,6 +78,10 @@ class Command(object):
                 result = self.cmdUtil.run(args)
             elif self.cmdWallet.check_command(args.command):
                 result = self.cmdWallet.run(args)
+            elif self.cmdBench.check_command(args.command):
+                result = self.cmdBench.run(args)
+            elif self.cmdVerify.check_command(args.command):
+                result = self.cmdVerify.run(args)
         except TBearsBaseException as e:
             print(f"{e}")
             return e.code.value
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import getpass
+import json
+from contextlib import ExitStack
+from urllib.parse import urlparse
+
+from iconcommons import IconConfig
+from iconcommons.logger.logger import Logger
+from iconservice.base.address import is_icon_address_valid
+
+from tbears.command.command_score import check_project
+from tbears.config.tbears_config import FN_CLI_CONF, tbears_cli_config, TBEARS_CLI_TAG
+from tbears.libs.commit_waiter import CommitWaiter
+from tbears.libs.icon_jsonrpc import IconJsonrpc, IconClient
+from tbears.libs.key_agent import has_agent_key
+from tbears.libs.load_generator import LoadGenerator
+from tbears.libs.zip_cache import ZipCache
+from tbears.tbears_exception import TBearsCommandException
+from tbears.util.argparse_type import IconAddress, IconPath, non_negative_num_type
+
+BENCH_WORKLOADS = ('transfer', 'call', 'deploy')
+
+
+class CommandBench(object):
+    def __init__(self, subparsers):
+        self._add_bench_parser(subparsers)
+
+    @staticmethod
+    def _add_bench_parser(subparsers):
+        parser = subparsers.add_parser('bench', help='Measure transactions per second and commit latency of node',
+                                       description='Send transactions at target rate or with fixed number of '
+                                                   'workers and report TPS, commit latency percentiles and errors')
+        parser.add_argument('-w', '--workload', choices=BENCH_WORKLOADS,
+                            help='Kind of transactions to send (default: transfer)')
+        parser.add_argument('-r', '--rate', type=float,
+                            help='Target transactions per second. If not set, each worker waits commit of its '
+                                 'transaction before sending next one')
+        parser.add_argument('-W', '--workers', type=int, help='Number of concurrent senders (default: 4)')
+        parser.add_argument('-d', '--duration', type=float, help='Time in seconds to send transactions (default: 10)')
+        parser.add_argument('-N', '--count', type=int, help='Number of transactions to send. Overrides duration')
+        parser.add_argument('-t', '--timeout', type=float,
+                            help='Timeout in seconds for waiting commits after sending (default: 60)')
+        parser.add_argument('-o', '--to', type=IconAddress(),
+                            help='Recipient of transfer(default: sender itself) or SCORE address to call')
+        parser.add_argument('--value', type=non_negative_num_type,
+                            help='Amount of ICX coin in loop to transfer (default: 0x0)')
+        parser.add_argument('--method', help='SCORE method to call')
+        parser.add_argument('--params', type=json.loads, help='Parameters of SCORE method in JSON')
+        parser.add_argument('--project', type=IconPath(), help='SCORE project directory or zip file to deploy')
+        parser.add_argument('-f', '--from', type=IconAddress('hx'), help='From address.')
+        parser.add_argument('-k', '--key-store', type=IconPath(), dest='keyStore',
+                            help='Keystore file path. Used to generate "from" address and transaction signature')
+        parser.add_argument('-p', '--password', help='Keystore file\'s password', dest='password')
+        parser.add_argument('-n', '--nid', help='Network ID (default: 0x3)')
+        parser.add_argument('-s', '--step-limit', dest='stepLimit', type=non_negative_num_type, help='Step limit')
+        parser.add_argument('-u', '--node-uri', dest='uri', help='URI of node (default: http://127.0.0.1:9000/api/v3)')
+        parser.add_argument('-j', '--json', action='store_const', const=True,
+                            help='Print report in JSON instead of text')
+        parser.add_argument('--output', help='File path to write report in JSON')
+        parser.add_argument('-c', '--config', type=IconPath(),
+                            help=f'Configuration file path. This file defines the default values for the properties '
+                                 f'"keyStore", "uri", "from" and "stepLimit". (default: {FN_CLI_CONF})')
+
+    def check_command(self, command):
+        return hasattr(self, command)
+
+    def run(self, args):
+        if not hasattr(self, args.command):
+            raise TBearsCommandException(f"Invalid command {args.command}")
+
+        conf = self.get_icon_conf(args.command, args=vars(args))
+
+        Logger.info(f"Run '{args.command}' command with config: {conf}", TBEARS_CLI_TAG)
+
+        return getattr(self, args.command)(conf)
+
+    def bench(self, conf: dict) -> dict:
+        """Send transactions to node and report TPS, commit latencies and errors
+
+        :param conf: bench command configuration
+        :return: report dictionary
+        """
+        password = self._check_bench(conf, conf.get('password', None))
+
+        if conf.get('keyStore', None):
+            sender = IconJsonrpc.from_key_store(conf['keyStore'], password)
+        else:
+            sender = IconJsonrpc.from_string(conf['from'])
+
+        make_request = self._make_request_maker(conf, sender)
+
+        with ExitStack() as stack:
+            client = stack.enter_context(IconClient(conf['uri'], pool_size=conf['workers']))
+            # commit events of local tbears service are more precise than polling
+            waiter = stack.enter_context(CommitWaiter()) if is_local_uri(conf['uri']) else None
+            generator = LoadGenerator(client, make_request, workers=conf['workers'], rate=conf.get('rate', None),
+                                      duration=conf['duration'], count=conf.get('count', None),
+                                      timeout=conf['timeout'], waiter=waiter)
+            report = generator.run()
+
+        report = {'workload': conf['workload'], 'uri': conf['uri'], **report}
+
+        if conf.get('output', None):
+            with open(conf['output'], mode='w') as file:
+                json.dump(report, file, indent=4)
+
+        if conf.get('json', None):
+            print(json.dumps(report, indent=4))
+        else:
+            print_report(report)
+
+        return report
+
+    @staticmethod
+    def _make_request_maker(conf: dict, sender: 'IconJsonrpc'):
+        """Make function making icx_sendTransaction request of workload.
+        Sequence number is used as nonce to make hashes of transactions sent at the same time differ
+
+        :param conf: bench command configuration
+        :param sender: IconJsonrpc object of sender
+        :return: function making request with sequence number
+        """
+        workload = conf['workload']
+        kwargs = {'nid': conf['nid'], 'step_limit': conf['stepLimit']}
+
+        if workload == 'transfer':
+            to = conf['to'] if conf.get('to', '').startswith('hx') else sender.address
+            kwargs.update(to=to, value=conf['value'])
+        elif workload == 'call':
+            kwargs.update(to=conf['to'], data_type='call',
+                          data=IconJsonrpc.gen_call_data(conf['method'], conf.get('params', None) or {}))
+        else:
+            # make zip once
+            content = IconJsonrpc.gen_deploy_hex_content(conf['project'], cache=ZipCache())
+            kwargs.update(to=f'cx{"0" * 40}', data_type='deploy',
+                          data=IconJsonrpc.gen_deploy_data(content=content, params=conf.get('scoreParams', {})))
+
+        def _make_request(sequence: int) -> dict:
+            return sender.sendTransaction(nonce=hex(sequence), **kwargs)
+
+        return _make_request
+
+    @staticmethod
+    def _check_bench(conf: dict, password: str = None):
+        if conf.get('keyStore', None):
+            if not password and not has_agent_key(conf['keyStore']):
+                password = getpass.getpass("Input your keystore password: ")
+        elif not is_icon_address_valid(conf['from']):
+            raise TBearsCommandException(f"You entered invalid 'from' address '{conf['from']}'")
+
+        if conf['workers'] < 1:
+            raise TBearsCommandException(f'Number of workers must be positive')
+        if conf.get('rate', None) is not None and conf['rate'] <= 0:
+            raise TBearsCommandException(f'Target rate must be positive')
+
+        if conf['workload'] == 'call':
+            if not conf.get('to', '').startswith('cx') or not conf.get('method', None):
+                raise TBearsCommandException(f'call workload needs SCORE address(--to) and method(--method)')
+        elif conf['workload'] == 'deploy':
+            if not conf.get('project', None):
+                raise TBearsCommandException(f'deploy workload needs SCORE project(--project)')
+            check_project(conf['project'])
+
+        return password
+
+    @staticmethod
+    def get_icon_conf(command: str, args: dict = None) -> dict:
+        """Load config file using IconConfig instance
+        config file is loaded as below priority
+        system config -> default config -> user config -> user input config(higher priority)
+
+        :param command: command name (e.g. bench)
+        :param args: user input command (converted to dictionary type)
+        :return: command configuration
+        """
+        conf = IconConfig(FN_CLI_CONF, copy.deepcopy(tbears_cli_config))
+        conf.load(config_path=args.get('config', None) if args else None)
+
+        # move command config
+        if command in conf:
+            conf.update_conf(conf[command])
+            del conf[command]
+
+        if args:
+            conf.update_conf(args)
+
+        # count overrides duration
+        if conf.get('count', None) is not None:
+            conf['duration'] = None
+
+        return conf
+
+
+def is_local_uri(uri: str) -> bool:
+    return urlparse(uri).hostname in ('127.0.0.1', 'localhost')
+
+
+def print_report(report: dict):
+    """Print bench report in text
+
+    :param report: report dictionary
+    """
+    mode = f"rate {report['rate']}/s" if report['mode'] == 'rate' else f"{report['workers']} workers"
+    print(f"workload: {report['workload']} ({mode}) on {report['uri']}")
+    print(f"sent: {report['sent']}, accepted: {report['accepted']}, committed: {report['committed']}, "
+          f"failed: {report['failed']}, errors: {report['errors']} ({report['errorRate'] * 100:.2f}%)")
+    print(f"elapsed: {report['elapsed']}s, send rate: {report['sendRate']}/s, TPS: {report['tps']}")
+    for name in ('latencyMs', 'sendLatencyMs'):
+        summary = ', '.join(f'{key}: {value}' for key, value in report[name].items())
+        print(f"{'commit' if name == 'latencyMs' else 'send'} latency(ms) - {summary}")
+    for message, count in report['errorMessages'].items():
+        print(f"error '{message}': {count}")
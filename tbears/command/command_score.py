@@ -25,10 +25,17 @@ from iconservice.base.address import is_icon_address_valid
 
 from tbears.util.argparse_type import IconAddress, IconPath, non_negative_num_type
 from tbears.command.command_server import CommandServer
-from tbears.config.tbears_config import FN_CLI_CONF, tbears_cli_config, TBEARS_CLI_TAG
-from tbears.libs.icon_jsonrpc import IconJsonrpc, IconClient
+from tbears.block_manager.block_manager import make_channel_conf
+from tbears.config.tbears_config import FN_CLI_CONF, tbears_cli_config, TBEARS_CLI_TAG, ConfigKey
+from tbears.libs.icon_jsonrpc import IconJsonrpc, IconClient, get_icon_client, DEFAULT_WAIT_RESULT_TIMEOUT
+from tbears.libs.in_memory_zip import ZipOptions, get_zip_report
+from tbears.libs.key_agent import has_agent_key
+from tbears.libs.manifest_deployer import ManifestDeployer, get_deploy_waves, DEFAULT_DEPLOY_WORKERS
+from tbears.libs.zip_cache import ZipCache
 from tbears.tbears_exception import TBearsDeleteTreeException, TBearsCommandException
 
+FN_SCORE_ADDRESSES = './score_addresses.json'
+
 
 class CommandScore(object):
     def __init__(self, subparsers):
@@ -39,7 +46,11 @@ class CommandScore(object):
     @staticmethod
     def _add_deploy_parser(subparsers):
         parser = subparsers.add_parser('deploy', help='Deploy the SCORE', description='Deploy the SCORE')
-        parser.add_argument('project', type=IconPath(), help='Project directory path or zip file path')
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('project', nargs='?', type=IconPath(), help='Project directory path or zip file path')
+        group.add_argument('--manifest', type=IconPath('r'),
+                           help='Manifest file path. Deploy SCOREs of the projects in manifest concurrently and '
+                                'wait their results')
         parser.add_argument('-u', '--node-uri', dest='uri', help='URI of node (default: http://127.0.0.1:9000/api/v3)')
         parser.add_argument('-t', '--type', choices=['tbears', 'zip'], dest='contentType',
                             help='This option has been deprecated since v1.0.5. Deploy command supports zip type only')
@@ -54,6 +65,25 @@ class CommandScore(object):
         parser.add_argument('-n', '--nid', type=non_negative_num_type, help='Network ID')
         parser.add_argument('-p', '--password', help='keystore file\'s password', dest='password')
         parser.add_argument('-s', '--step-limit', dest='stepLimit', type=non_negative_num_type, help='Step limit')
+        parser.add_argument('--no-cache', action='store_const', const=True, dest='noCache',
+                            help='Zip the project directory without using the zip cache')
+        parser.add_argument('--reproducible', action='store_const', const=True,
+                            help='Make the same zip from the same files on any machine. Entries are sorted and '
+                                 'timestamps and permissions are fixed')
+        parser.add_argument('--compress-level', type=int, choices=range(10), dest='compressLevel', metavar='{0-9}',
+                            help='Compression level of zip. 0 stores files without compression')
+        parser.add_argument('-x', '--exclude', action='append', metavar='PATTERN',
+                            help='Pattern of relative path or name of files and directories not to zip. '
+                                 'Hidden files, __pycache__ and tests are excluded always. Can be repeated')
+        parser.add_argument('-W', '--workers', type=int,
+                            help=f'Number of threads zipping projects and sending transactions of manifest '
+                                 f'(default: {DEFAULT_DEPLOY_WORKERS})')
+        parser.add_argument('--timeout', type=float,
+                            help=f'Timeout in seconds for waiting results of manifest deploy '
+                                 f'(default: {DEFAULT_WAIT_RESULT_TIMEOUT})')
+        parser.add_argument('--output',
+                            help=f'File path to write SCORE addresses of manifest deploy '
+                                 f'(default: {FN_SCORE_ADDRESSES})')
         parser.add_argument('-c', '--config', type=IconPath(), help=f'deploy config path (default: {FN_CLI_CONF})')
 
     @staticmethod
@@ -88,14 +118,19 @@ class CommandScore(object):
         password = conf.get('password', None)
         password = self._check_deploy(conf, password)
 
+        if conf.get('manifest', None):
+            return self._deploy_manifest(conf, password)
+
         if conf['mode'] == 'install':
             score_address = f'cx{"0"*40}'
         else:
             score_address = conf['to']
 
         content_type = "application/zip"
-        # make zip and convert to hexadecimal string data (start with 0x) and return
-        content = IconJsonrpc.gen_deploy_data_content(conf['project'])
+        # make zip. hexadecimal string data (start with 0x) is made while signing and sending the request
+        cache = None if conf.get('noCache', None) else ZipCache()
+        content = IconJsonrpc.gen_deploy_hex_content(conf['project'], cache=cache, options=get_zip_options(conf))
+        print_zip_report(get_zip_report(content.data))
 
         # make IconJsonrpc instance which is used for making request (with signature)
         if conf['keyStore']:
@@ -114,7 +149,7 @@ class CommandScore(object):
                                              content=content))
 
         # send request to rpcserver
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
         response = icon_client.send(request)
 
         if 'error' in response:
@@ -128,6 +163,37 @@ class CommandScore(object):
 
         return response
 
+    def _deploy_manifest(self, conf: dict, password: str = None) -> dict:
+        """Deploy SCOREs of the projects in manifest and write their SCORE addresses
+
+        :param conf: deploy command configuration
+        :param password: password for keystore file
+        :return: report dictionary
+        """
+        projects = load_manifest(conf['manifest'])
+
+        if conf['keyStore']:
+            sender = IconJsonrpc.from_key_store(keystore=conf['keyStore'], password=password)
+        else:
+            sender = IconJsonrpc.from_string(from_=conf['from'])
+
+        workers = conf.get('workers', None) or DEFAULT_DEPLOY_WORKERS
+        with IconClient(conf['uri'], pool_size=workers) as client:
+            deployer = ManifestDeployer(client, sender, nid=conf['nid'], step_limit=conf['stepLimit'],
+                                        workers=workers,
+                                        timeout=conf.get('timeout', None) or DEFAULT_WAIT_RESULT_TIMEOUT,
+                                        cache=None if conf.get('noCache', None) else ZipCache(),
+                                        options=get_zip_options(conf))
+            report = deployer.run(projects)
+
+        output = conf.get('output', None) or FN_SCORE_ADDRESSES
+        with open(output, mode='w') as file:
+            json.dump(report['scoreAddresses'], file, indent=4)
+
+        print_manifest_report(report)
+        print(f"SCORE addresses are written to {output}")
+        return report
+
     @staticmethod
     def clear(_conf: dict):
         """Clear all SCORE deployed on tbears service
@@ -143,12 +209,18 @@ class CommandScore(object):
         if CommandServer.is_service_running():
             raise TBearsCommandException(f'You must stop tbears service to clear SCORE')
 
+        # directories of additional channels are next to the directories of the default channel
+        paths = [score_dir_info['scoreRootPath'], score_dir_info['stateDbRootPath']]
+        for channel in score_dir_info.get(ConfigKey.CHANNELS, None) or []:
+            if channel != score_dir_info.get(ConfigKey.CHANNEL, None):
+                channel_conf = make_channel_conf(score_dir_info, channel)
+                paths.extend([channel_conf['scoreRootPath'], channel_conf['stateDbRootPath']])
+
         # delete whole score data
         try:
-            if os.path.exists(score_dir_info['scoreRootPath']):
-                shutil.rmtree(score_dir_info['scoreRootPath'])
-            if os.path.exists(score_dir_info['stateDbRootPath']):
-                shutil.rmtree(score_dir_info['stateDbRootPath'])
+            for path in paths:
+                if os.path.exists(path):
+                    shutil.rmtree(path)
             CommandServer._delete_server_conf()
         except (PermissionError, NotADirectoryError) as e:
             raise TBearsDeleteTreeException(f"Can't delete SCORE files. {e}")
@@ -181,9 +253,19 @@ class CommandScore(object):
             if not is_icon_address_valid(conf['from']):
                 raise TBearsCommandException(f"You entered invalid 'from' address '{conf['from']}")
         else:
-            if not password:
+            if not password and not has_agent_key(conf['keyStore']):
                 password = getpass.getpass("Input your keystore password: ")
 
+        compress_level = conf.get('compressLevel', None)
+        if compress_level is not None and compress_level not in range(10):
+            raise TBearsCommandException(f'Compression level must be in 0 ~ 9')
+
+        if conf.get('manifest', None):
+            # projects of manifest are checked when loading it
+            if conf.get('workers', None) is not None and conf['workers'] < 1:
+                raise TBearsCommandException(f'Number of workers must be positive')
+            return password
+
         # in case of update mode, validate -to option
         if conf['mode'] == 'update':
             if conf.get('to', None) is None:
@@ -260,3 +342,95 @@ def check_project(project_path: str) -> int:
                 raise TBearsCommandException(f"There is no main_file '{project_path}/{package['main_file']}.py'")
 
     return 0
+
+
+def get_zip_options(conf: dict) -> 'ZipOptions':
+    """Get options for zipping project directory from deploy configuration
+
+    :param conf: deploy command configuration
+    :return: ZipOptions
+    """
+    return ZipOptions(reproducible=bool(conf.get('reproducible', None)),
+                      compress_level=conf.get('compressLevel', None),
+                      exclude=tuple(conf.get('exclude', None) or ()))
+
+
+def print_zip_report(report: dict):
+    """Print size report of zip
+
+    :param report: report made by get_zip_report
+    """
+    print(f"zip: {report['files']} files, {report['size']} bytes -> {report['zipSize']} bytes "
+          f"(deploy content {report['payloadSize']} bytes)")
+    if report['largest']:
+        print('largest files (compressed bytes, bytes, name):')
+    for entry in report['largest']:
+        print(f"    {entry['compressedSize']:>10} {entry['size']:>10}  {entry['name']}")
+
+
+def load_manifest(path: str) -> list:
+    """Load manifest of projects to deploy. Paths of projects are relative to the manifest file
+
+    {"projects": [{"name": "token", "project": "token", "params": {"initialSupply": "0x3e8"}},
+                  {"name": "crowdsale", "project": "crowdsale", "params": {"token": "${token}"}},
+                  {"project": "game", "mode": "update", "to": "cx...", "stepLimit": "0x20000000"}]}
+
+    :param path: manifest file path
+    :return: projects. name, project, params, mode, to and stepLimit
+    """
+    try:
+        with open(path, mode='r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError) as e:
+        raise TBearsCommandException(f'Failed to read manifest {path}. {e}')
+
+    entries = manifest.get('projects', None) if isinstance(manifest, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise TBearsCommandException(f"Manifest must have list of projects in 'projects'")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    projects = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get('project', None):
+            raise TBearsCommandException(f"Project {index} of manifest has no 'project'")
+        project_path = os.path.join(base_dir, entry['project'])
+        name = entry.get('name', None) or os.path.basename(os.path.normpath(project_path))
+        if not os.path.exists(project_path):
+            raise TBearsCommandException(f"Project '{name}' doesn't exist in {project_path}")
+        check_project(project_path)
+
+        mode = entry.get('mode', 'install')
+        if mode not in ('install', 'update'):
+            raise TBearsCommandException(f"Invalid mode '{mode}' of project '{name}'")
+        if mode == 'update' and not (is_icon_address_valid(entry.get('to', '')) and entry['to'].startswith('cx')):
+            raise TBearsCommandException(f"Project '{name}' needs SCORE address 'to' to update")
+        if not isinstance(entry.get('params', {}), dict):
+            raise TBearsCommandException(f"'params' of project '{name}' must be a dictionary")
+
+        projects.append({'name': name, 'project': project_path, 'params': entry.get('params', {}), 'mode': mode,
+                         'to': entry.get('to', None), 'stepLimit': entry.get('stepLimit', None)})
+
+    names = [project['name'] for project in projects]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise TBearsCommandException(f"Names of projects must be unique. {', '.join(duplicated)}")
+
+    try:
+        get_deploy_waves(projects)
+    except ValueError as e:
+        raise TBearsCommandException(f'Invalid manifest. {e}')
+
+    return projects
+
+
+def print_manifest_report(report: dict):
+    """Print report of manifest deploy
+
+    :param report: report made by ManifestDeployer
+    """
+    for name, result in report['results'].items():
+        print(f"{name}: {result['status']}")
+        for key in ('scoreAddress', 'txHash', 'message'):
+            if result[key]:
+                print(f"    {key}: {result[key]}")
+    print(f"deployed: {report['deployed']}, failed: {report['failed']}, elapsed: {report['elapsed']}s")
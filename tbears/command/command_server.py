@@ -29,11 +29,14 @@ from tbears.tbears_exception import TBearsCommandException, TBearsWriteFileExcep
 from tbears.util import write_file
 from tbears.util.argparse_type import port_type, IconPath
 from tbears.config.tbears_config import FN_SERVER_CONF, tbears_server_config, ConfigKey, TBEARS_CLI_TAG
-from tbears.block_manager.block_manager import TBEARS_BLOCK_MANAGER
+from tbears.block_manager.block_manager import TBEARS_BLOCK_MANAGER, get_channels, make_channel_conf
+from tbears.block_manager.commit_notifier import resolve_commit_notify_path
 
 
 BLOCKMANAGER_MODULE_NAME = 'tbears.block_manager'
 TBEARS_CLI_ENV = '/tmp/.tbears.env'
+# seconds to wait tbears_block_manager to confirm transactions left in queue and exit
+BLOCKMANAGER_STOP_TIMEOUT = 30
 
 
 class CommandServer(object):
@@ -47,6 +50,11 @@ class CommandServer(object):
                                        description='Start tbears service')
         parser.add_argument('-a', '--address', type=ip_address, help='Address to host on (default: 0.0.0.0)', dest='hostAddress')
         parser.add_argument('-p', '--port', type=port_type, help='Port to host on (default: 9000)')
+        parser.add_argument('-i', '--instant-seal', dest=ConfigKey.BLOCK_INSTANT_SEAL, action='store_const', const=True,
+                            help='Confirm block as soon as transaction arrives. '
+                                 'icx_sendTransaction responds after the block is confirmed')
+        parser.add_argument('-e', '--embedded', dest=ConfigKey.EMBEDDED_ENGINE, action='store_const', const=True,
+                            help='Run ICON service engine in block manager process')
         parser.add_argument('-c', '--config', type=IconPath(),
                             help=f'tbears configuration file path (default: {FN_SERVER_CONF})')
 
@@ -111,13 +119,20 @@ class CommandServer(object):
         if self.is_port_available(conf) is False:
             raise TBearsCommandException(f"port {conf['port']} already in use. use other port.")
 
+        try:
+            channels = get_channels(conf)
+        except ValueError as e:
+            raise TBearsCommandException(f"{e}")
+
         # write temporary configuration file
         temp_conf = './temp_conf.json'
         with open(temp_conf, mode='w') as file:
             file.write(json.dumps(conf))
 
-        # run iconservice
-        self._start_iconservice(conf, temp_conf)
+        # run iconservice of each channel. In embedded mode, tbears_block_manager runs ICON service engine
+        if not conf.get(ConfigKey.EMBEDDED_ENGINE, False):
+            for channel in channels:
+                self._start_iconservice(conf, temp_conf, channel)
 
         # start tbears_block_manager
         self._start_blockmanager(conf)
@@ -144,15 +159,23 @@ class CommandServer(object):
             print(f'tbears service is not running')
             return
 
+        server_conf = self.get_server_conf() or {}
+
         with open(os.devnull, 'w') as devnull:
             # stop iconrpcserver
             subprocess.run('iconrpcserver stop', shell=True, stdout=devnull)
 
-            # stop tbears_block_manager
+            # stop tbears_block_manager. it confirms a block with transactions left in queue before exit,
+            # so iconservice must be running until it exits
             subprocess.run(f'pkill -f tbears_block_manager', shell=True)
+            self._wait_blockmanager_exit()
 
-            # stop iconservice
-            subprocess.run(f'iconservice stop -c {TBEARS_CLI_ENV}', shell=True, stdout=devnull)
+            # stop iconservice of each channel. In embedded mode, it's stopped with tbears_block_manager
+            if not server_conf.get(ConfigKey.EMBEDDED_ENGINE, False):
+                channels = server_conf.get(ConfigKey.CHANNELS, None) or [server_conf.get(ConfigKey.CHANNEL, None)]
+                for channel in channels:
+                    cmd = ['iconservice', 'stop', '-c', TBEARS_CLI_ENV, *self._iconservice_args(server_conf, channel)]
+                    subprocess.run(cmd, stdout=devnull)
 
             time.sleep(2)
 
@@ -162,11 +185,25 @@ class CommandServer(object):
         return hasattr(self, command)
 
     @staticmethod
-    def _start_iconservice(conf: dict, config_path: str):
-        cmd = f"iconservice start -c {config_path}"
+    def _start_iconservice(conf: dict, config_path: str, channel: str):
+        cmd = ['iconservice', 'start', '-c', config_path, *CommandServer._iconservice_args(conf, channel)]
 
         with open(os.devnull, 'w') as devnull:
-            subprocess.run(cmd, shell=True, stdout=devnull)
+            subprocess.run(cmd, stdout=devnull)
+
+    @staticmethod
+    def _iconservice_args(conf: dict, channel: str) -> list:
+        """Make iconservice arguments of the channel. The default channel uses the configuration file as is
+
+        :param conf: configuration
+        :param channel: channel name
+        :return: iconservice arguments
+        """
+        if channel == conf.get(ConfigKey.CHANNEL, None):
+            return []
+
+        channel_conf = make_channel_conf(conf, channel)
+        return ['-ch', channel, '-sc', channel_conf['scoreRootPath'], '-st', channel_conf['stateDbRootPath']]
 
     @staticmethod
     def _start_iconrpcserver(conf: dict, config_path: str):
@@ -175,6 +212,14 @@ class CommandServer(object):
         with open(os.devnull, 'w') as devnull:
             subprocess.run(cmd, shell=True, stdout=devnull)
 
+    def _wait_blockmanager_exit(self, timeout: float = BLOCKMANAGER_STOP_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while self.is_service_running(TBEARS_BLOCK_MANAGER):
+            if time.monotonic() > deadline:
+                print(f"{TBEARS_BLOCK_MANAGER} didn't exit in {timeout} seconds")
+                return
+            time.sleep(0.1)
+
     @staticmethod
     def _start_blockmanager(conf: dict):
         # make params
@@ -190,6 +235,12 @@ class CommandServer(object):
                 custom_argv.append(k)
                 custom_argv.append(v)
 
+        if conf.get(ConfigKey.BLOCK_INSTANT_SEAL, False):
+            custom_argv.append('-is')
+
+        if conf.get(ConfigKey.EMBEDDED_ENGINE, False):
+            custom_argv.append('-em')
+
         # Run block_manager background mode
         subprocess.Popen([sys.executable, '-m', BLOCKMANAGER_MODULE_NAME, *custom_argv], close_fds=True)
 
@@ -221,8 +272,11 @@ class CommandServer(object):
             "scoreRootPath": conf['scoreRootPath'],
             "stateDbRootPath": conf['stateDbRootPath'],
             ConfigKey.CHANNEL: conf.get(ConfigKey.CHANNEL, None),           # to stop iconservice
+            ConfigKey.CHANNELS: get_channels(conf),                         # to stop iconservice of each channel
             ConfigKey.AMQP_TARGET: conf.get(ConfigKey.AMQP_TARGET, None),   # to stop iconservice
-            ConfigKey.AMQP_KEY: conf.get(ConfigKey.AMQP_KEY, None)          # to stop iconservice
+            ConfigKey.AMQP_KEY: conf.get(ConfigKey.AMQP_KEY, None),         # to stop iconservice
+            ConfigKey.COMMIT_NOTIFY_PATH: resolve_commit_notify_path(conf),  # to wait commit
+            ConfigKey.EMBEDDED_ENGINE: conf.get(ConfigKey.EMBEDDED_ENGINE, False)     # to stop iconservice
         }
         Logger.debug(f"Write server Info.({conf}) to {TBEARS_CLI_ENV}", TBEARS_CLI_TAG)
         file_path = TBEARS_CLI_ENV
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import json
+import os
+
+import plyvel
+from iconcommons import IconConfig
+from iconcommons.logger.logger import Logger
+
+from tbears.block_manager.block import DbPrefix
+from tbears.block_manager.block_manager import make_channel_conf
+from tbears.block_manager.tbears_db import TbearsDB
+from tbears.config.tbears_config import FN_SERVER_CONF, tbears_server_config, ConfigKey, TBEARS_CLI_TAG
+from tbears.libs.tx_verifier import verify_transactions
+from tbears.tbears_exception import TBearsCommandException
+from tbears.util.argparse_type import IconPath
+
+
+class CommandVerify(object):
+    def __init__(self, subparsers):
+        self._add_verify_parser(subparsers)
+
+    @staticmethod
+    def _add_verify_parser(subparsers):
+        parser = subparsers.add_parser('verify', help='Verify signatures of transactions stored in tbears service',
+                                       description='Verify that signatures of transactions stored in tbears service '
+                                                   'recover to their "from" addresses. Transactions are verified '
+                                                   'in parallel. tbears service must be stopped')
+        parser.add_argument('-W', '--workers', type=int,
+                            help='Number of processes verifying transactions (default: number of CPUs)')
+        parser.add_argument('-C', '--channel', dest='targetChannel', help='Channel of transactions (default: channel in config)')
+        parser.add_argument('-d', '--db-path', dest='dbPath', type=IconPath('d'),
+                            help='DB directory of tbears block manager (default: <stateDbRootPath>/tbears, '
+                                 '<stateDbRootPath>_<channel>/tbears for additional channels)')
+        parser.add_argument('-j', '--json', action='store_const', const=True,
+                            help='Print report in JSON instead of text')
+        parser.add_argument('-c', '--config', type=IconPath(),
+                            help=f'tbears configuration file path (default: {FN_SERVER_CONF})')
+
+    def check_command(self, command):
+        return hasattr(self, command)
+
+    def run(self, args):
+        if not hasattr(self, args.command):
+            raise TBearsCommandException(f"Invalid command {args.command}")
+
+        conf = self.get_icon_conf(args.command, args=vars(args))
+
+        Logger.info(f"Run '{args.command}' command with config: {conf}", TBEARS_CLI_TAG)
+
+        return getattr(self, args.command)(conf)
+
+    def verify(self, conf: dict) -> dict:
+        """Verify signatures of stored transactions and report invalid transactions and throughput
+
+        :param conf: verify command configuration
+        :return: report dictionary
+        """
+        path = self._check_verify(conf)
+
+        try:
+            db = TbearsDB(plyvel.DB(path, create_if_missing=False))
+        except plyvel.Error as e:
+            raise TBearsCommandException(f"Can't open DB {path}. Stop tbears service before verify. {e}")
+
+        try:
+            # keys of transactions are prefix and transaction hash
+            rows = ((key[len(DbPrefix.TX):], value) for key, value in db.iterator(prefix=DbPrefix.TX))
+            report = verify_transactions(rows, workers=conf.get('workers', None))
+        finally:
+            db.close()
+
+        report = {'dbPath': path, **report}
+        if conf.get('json', None):
+            print(json.dumps(report, indent=4))
+        else:
+            print_report(report)
+
+        return report
+
+    @staticmethod
+    def _check_verify(conf: dict) -> str:
+        if conf.get('workers', None) is not None and conf['workers'] < 1:
+            raise TBearsCommandException(f'Number of workers must be positive')
+
+        path = conf.get('dbPath', None)
+        if path is None:
+            channel_conf = make_channel_conf(conf, conf.get('targetChannel', None) or conf[ConfigKey.CHANNEL])
+            path = os.path.join(channel_conf['stateDbRootPath'], 'tbears')
+        if not os.path.isdir(path):
+            raise TBearsCommandException(f'There is no DB of tbears service {path}')
+
+        return path
+
+    @staticmethod
+    def get_icon_conf(command: str, args: dict = None) -> dict:
+        """Load config file using IconConfig instance
+        config file is loaded as below priority
+        system config -> default config -> user config -> user input config(higher priority)
+
+        :param command: command name (e.g. verify)
+        :param args: user input command (converted to dictionary type)
+        :return: command configuration
+        """
+        conf = IconConfig(FN_SERVER_CONF, copy.deepcopy(tbears_server_config))
+        conf.load(config_path=args.get('config', None) if args else None)
+
+        if args:
+            conf.update_conf(args)
+
+        return conf
+
+
+def print_report(report: dict):
+    """Print verify report in text
+
+    :param report: report dictionary
+    """
+    print(f"verified {report['total']} transactions in {report['dbPath']} with {report['workers']} workers")
+    print(f"valid: {report['valid']}, unsigned: {report['unsigned']}, invalid: {report['invalid']}")
+    print(f"elapsed: {report['elapsed']}s, {report['txPerSec']} tx/s")
+    for tx in report['invalidTransactions']:
+        print(f"invalid {tx['txHash']} (block {tx.get('blockHeight')}): {tx['error']}")
@@ -16,17 +16,24 @@ import copy
 import getpass
 import json
 import os
+from typing import List
 
 from iconservice.base.address import is_icon_address_valid
 from iconcommons import IconConfig
 from iconcommons.logger.logger import Logger
 
 from tbears.config.tbears_config import FN_CLI_CONF, tbears_cli_config, keystore_test1, TBEARS_CLI_TAG
-from tbears.libs.icon_jsonrpc import IconClient, IconJsonrpc
+from tbears.libs.icon_jsonrpc import IconJsonrpc, get_icon_client
+from tbears.libs.key_agent import has_agent_key, start_key_agent, KeyAgentClient, DEFAULT_KEY_TTL
 from tbears.tbears_exception import TBearsCommandException
 from tbears.util import jsonrpc_params_to_pep_style
 from tbears.util.argparse_type import IconAddress, IconPath, hash_type, non_negative_num_type
-from tbears.util.keystore_manager import validate_password, make_key_store_content
+from tbears.util.keystore_manager import (validate_password, make_key_store_content, make_key_store_contents,
+                                          make_genesis_accounts)
+
+# balance of accounts in genesis accounts fragment of bulk keystore generation. 1,000,000 ICX
+DEFAULT_GENESIS_BALANCE = hex(1_000_000 * 10 ** 18)
+FN_GENESIS_ACCOUNTS = 'genesis_accounts.json'
 
 
 class CommandWallet:
@@ -34,6 +41,7 @@ class CommandWallet:
         self._add_txresult_parser(subparsers)
         self._add_transfer_parser(subparsers)
         self._add_keystore_parser(subparsers)
+        self._add_agent_parser(subparsers)
         self._add_balance_parser(subparsers)
         self._add_totalsupply_parser(subparsers)
         self._add_scoreapi_parser(subparsers)
@@ -102,9 +110,41 @@ class CommandWallet:
         parser = subparsers.add_parser('keystore',
                                        help='Create a keystore file in the specified path',
                                        description='Create keystore file in the specified path. Generate privatekey, '
-                                                   'publickey pair using secp256k1 library.')
-        parser.add_argument('path', type=IconPath('w'), help='Path of keystore file.')
+                                                   'publickey pair using secp256k1 library. With --out-dir, create '
+                                                   'keystore files of --count accounts in parallel and genesis '
+                                                   'accounts fragment of them.')
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('path', nargs='?', type=IconPath('w'), help='Path of keystore file.')
+        group.add_argument('-o', '--out-dir', dest='outDir',
+                           help=f'Directory to create keystore files(keystore_<index>) and genesis accounts '
+                                f'fragment({FN_GENESIS_ACCOUNTS}) in')
         parser.add_argument('-p', '--password', help='Keystore file\'s password', dest='password')
+        parser.add_argument('-N', '--count', type=int, help='Number of keystore files to create in --out-dir '
+                                                            '(default: 1)')
+        parser.add_argument('-W', '--workers', type=int,
+                            help='Number of processes encrypting keystores (default: number of CPUs)')
+        parser.add_argument('--unencrypted', action='store_const', const=True,
+                            help='Write private keys without encryption in --out-dir. Fast, but only for throwaway '
+                                 'test accounts')
+        parser.add_argument('--balance', type=non_negative_num_type,
+                            help=f'Balance of accounts in genesis accounts fragment (default: {DEFAULT_GENESIS_BALANCE})')
+
+    @staticmethod
+    def _add_agent_parser(subparsers):
+        parser = subparsers.add_parser('agent', help='Manage key agent keeping decrypted keystores',
+                                       description='Manage key agent keeping decrypted keystores for a while. '
+                                                   'Commands using keystore in key agent don\'t ask password and '
+                                                   'don\'t decrypt keystore again.')
+        parser.add_argument('action', choices=('add', 'remove', 'list', 'stop'),
+                            help='add: decrypt keystore in key agent. remove: remove keystore from key agent(all '
+                                 'keystores if not given). list: list keystores in key agent. stop: stop key agent')
+        parser.add_argument('-k', '--key-store', type=IconPath(), dest='keyStore', help='Keystore file path')
+        parser.add_argument('-p', '--password', help='Keystore file\'s password', dest='password')
+        parser.add_argument('-t', '--ttl', type=int,
+                            help=f'Seconds the decrypted keystore is kept in key agent (default: {DEFAULT_KEY_TTL})')
+        parser.add_argument('-c', '--config', type=IconPath(),
+                            help=f'Configuration file path. This file defines the default value for '
+                                 f'the "keyStore" (default: {FN_CLI_CONF})')
 
     @staticmethod
     def _add_balance_parser(subparsers):
@@ -190,7 +230,7 @@ class CommandWallet:
             raise TBearsCommandException(f'You entered invalid value {conf["value"]}')
 
         if conf.get('keyStore', None):
-            if not password:
+            if not password and not has_agent_key(conf['keyStore']):
                 password = getpass.getpass("Input your keystore password: ")
 
         return password
@@ -209,12 +249,45 @@ class CommandWallet:
                                          "and special character.")
         return password
 
+    @staticmethod
+    def _check_keystores(conf: dict, password: str = None):
+        count = conf.get('count', None) or 1
+        if count < 1:
+            raise TBearsCommandException(f'Number of keystores must be positive')
+        if conf.get('workers', None) is not None and conf['workers'] < 1:
+            raise TBearsCommandException(f'Number of workers must be positive')
+
+        out_dir = conf['outDir']
+        if os.path.exists(out_dir) and not os.path.isdir(out_dir):
+            raise TBearsCommandException(f"'{out_dir}' is not a directory")
+        for path in [os.path.join(out_dir, FN_GENESIS_ACCOUNTS)] + get_keystore_paths(out_dir, count):
+            if os.path.exists(path):
+                raise TBearsCommandException(f"'{path}' must be empty")
+
+        if conf.get('unencrypted', None):
+            return None
+        return CommandWallet._check_keystore(password)
+
+    @staticmethod
+    def _check_agent(conf: dict, password: str = None):
+        if conf['action'] == 'add':
+            if not conf.get('keyStore', None):
+                raise TBearsCommandException(f'Set keystore file to add with --key-store option')
+            if not os.path.exists(conf['keyStore']):
+                raise TBearsCommandException(f'There is no keystore file {conf["keyStore"]}')
+            if not password:
+                password = getpass.getpass("Input your keystore password: ")
+        if conf.get('ttl', None) is not None and conf['ttl'] <= 0:
+            raise TBearsCommandException(f'TTL must be positive')
+
+        return password
+
     @staticmethod
     def _check_sendtx(conf: dict, password: str = None):
         if conf.get('keyStore', None):
             if not os.path.exists(conf['keyStore']):
                 raise TBearsCommandException(f'There is no keystore file {conf["keyStore"]}')
-            if not password:
+            if not password and not has_agent_key(conf['keyStore']):
                 password = getpass.getpass("Input your keystore password: ")
         else:
             if not is_icon_address_valid(conf['from']):
@@ -228,7 +301,7 @@ class CommandWallet:
         :param conf: lastblock command configuration
         :return: result of query
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getLastBlock())
 
@@ -245,7 +318,7 @@ class CommandWallet:
         :param conf: blockbyheight command configuration
         :return: result of query
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getBlockByHeight(conf['height']))
 
@@ -263,7 +336,7 @@ class CommandWallet:
         :param conf: blockbyhash command configuration
         :return: result of query
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getBlockByHash(conf['hash']))
 
@@ -281,7 +354,7 @@ class CommandWallet:
         :param conf: txbyhash command configuration.
         :return: result of query.
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getTransactionByHash(conf['hash']))
 
@@ -299,7 +372,7 @@ class CommandWallet:
         :param conf: txresult command configuration.
         :return: result of query.
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getTransactionResult(conf['hash']))
 
@@ -322,7 +395,7 @@ class CommandWallet:
         password = conf.get('password', None)
         password = self._check_transfer(conf, password)
 
-        if password:
+        if conf.get('keyStore', None):
             transfer = IconJsonrpc.from_key_store(conf['keyStore'], password)
         else:
             transfer = IconJsonrpc.from_string(conf['from'])
@@ -334,7 +407,7 @@ class CommandWallet:
                                            step_limit=conf['stepLimit'])
 
         # request to rpcserver
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
         response = icon_client.send(request=request)
 
         if 'result' in response:
@@ -352,6 +425,9 @@ class CommandWallet:
 
         :param conf: keystore command configuration
         """
+        if conf.get('outDir', None):
+            return self._make_keystores(conf)
+
         # check if the given keystore file already exists, and if user input is a valid password
         password = conf.get('password', None)
         password = self._check_keystore(password)
@@ -363,12 +439,74 @@ class CommandWallet:
 
         print(f"Made keystore file successfully")
 
+    def _make_keystores(self, conf: dict) -> List[str]:
+        """Create keystore files and genesis accounts fragment in out directory.
+
+        :param conf: keystore command configuration
+        :return: addresses of keystores
+        """
+        password = self._check_keystores(conf, conf.get('password', None))
+
+        count = conf.get('count', None) or 1
+        out_dir = conf['outDir']
+        os.makedirs(out_dir, exist_ok=True)
+
+        addresses = []
+        contents = make_key_store_contents(count, password, conf.get('workers', None))
+        for path, content in zip(get_keystore_paths(out_dir, count), contents):
+            write_key_file(path, content)
+            addresses.append(content['address'])
+
+        accounts = make_genesis_accounts(addresses, conf.get('balance', None) or DEFAULT_GENESIS_BALANCE)
+        with open(os.path.join(out_dir, FN_GENESIS_ACCOUNTS), mode='w') as file:
+            json.dump({'accounts': accounts}, file, indent=4)
+
+        print(f"Made {count} {'unencrypted key' if password is None else 'keystore'} files in {out_dir} successfully")
+        print(f"Add accounts in {os.path.join(out_dir, FN_GENESIS_ACCOUNTS)} to genesis accounts of "
+              f"tbears_server_config.json to fund them")
+        return addresses
+
+    def agent(self, conf: dict):
+        """Manage key agent.
+
+        :param conf: agent command configuration
+        :return: result of key agent
+        """
+        password = conf.get('password', None)
+        password = self._check_agent(conf, password)
+
+        action = conf['action']
+        if action == 'add':
+            client = start_key_agent()
+            ttl = conf.get('ttl', None) or DEFAULT_KEY_TTL
+            result = client.add(conf['keyStore'], password, ttl)
+            print(f"Added keystore of {result} to key agent for {ttl} seconds")
+            return result
+
+        client = KeyAgentClient()
+        if not client.ping():
+            print('Key agent is not running')
+            return None
+
+        if action == 'list':
+            result = client.list()
+            for key in result:
+                print(f"{key['address']} {key['keystore']} (expires in {key['ttl']} seconds)")
+        elif action == 'remove':
+            result = client.remove(conf.get('keyStore', None))
+            print(f"Removed {result} keystore(s) from key agent")
+        else:
+            result = client.stop()
+            print('Stopped key agent')
+
+        return result
+
     def balance(self, conf: dict):
         """Query icx balance of given address
 
         :param conf: balance command configuration.
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getBalance(conf['address']))
 
@@ -386,7 +524,7 @@ class CommandWallet:
 
         :param conf: totalsupply command configuration
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
 
         response = icon_client.send(IconJsonrpc.getTotalSupply())
 
@@ -405,7 +543,7 @@ class CommandWallet:
         :param conf: scoreapi command configuration.
         :return: result of query.
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
         response = icon_client.send(IconJsonrpc.getScoreApi(conf['address']))
 
         if "error" in response:
@@ -428,14 +566,14 @@ class CommandWallet:
         password = conf.get('password', None)
         password = self._check_sendtx(conf, password)
 
-        if password:
+        if conf.get('keyStore', None):
             sendtx = IconJsonrpc.from_key_store(conf['keyStore'], password)
             params = payload['params']
             params['from'] = None
             jsonrpc_params_to_pep_style(params)
             payload = sendtx.sendTransaction(**params)
 
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
         response = icon_client.send(request=payload)
 
         if 'result' in response:
@@ -455,7 +593,7 @@ class CommandWallet:
         :param conf: call command configuration.
         :return: response of icx_call
         """
-        icon_client = IconClient(conf['uri'])
+        icon_client = get_icon_client(conf['uri'])
         with open(conf['json_file'], 'r') as jf:
             payload = json.load(jf)
 
@@ -508,3 +646,18 @@ class CommandWallet:
             conf.update_conf(args)
 
         return conf
+
+
+def get_keystore_paths(out_dir: str, count: int) -> List[str]:
+    return [os.path.join(out_dir, f'keystore_{i}') for i in range(count)]
+
+
+def write_key_file(path: str, content: dict):
+    """Write key file readable only by the owner. Existing file is not overwritten
+
+    :param path: file path
+    :param content: keystore content
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with open(fd, mode='wb') as file:
+        file.write(json.dumps(content).encode())
@@ -23,10 +23,16 @@ TBEARS_CLI_TAG = 'tbears_cli'
 
 class ConfigKey:
     CHANNEL = 'channel'
+    CHANNELS = 'channels'
     AMQP_KEY = 'amqpKey'
     AMQP_TARGET = 'amqpTarget'
     BLOCK_CONFIRM_INTERVAL = 'blockConfirmInterval'
     BLOCK_CONFIRM_EMPTY = 'blockConfirmEmpty'
+    BLOCK_INSTANT_SEAL = 'blockInstantSeal'
+    EMBEDDED_ENGINE = 'embeddedEngine'
+    QUERY_CACHE_SIZE = 'queryCacheSize'
+    COMMIT_NOTIFY_PATH = 'commitNotifyPath'
+    MQ_SLOW_CALL_THRESHOLD = 'mqSlowCallThreshold'
 
 
 tbears_server_config = {
@@ -72,10 +78,16 @@ tbears_server_config = {
         ]
     },
     ConfigKey.CHANNEL: "loopchain_default",
+    ConfigKey.CHANNELS: [],
     ConfigKey.AMQP_KEY: "7100",
     ConfigKey.AMQP_TARGET: "127.0.0.1",
     ConfigKey.BLOCK_CONFIRM_INTERVAL: 10,
-    ConfigKey.BLOCK_CONFIRM_EMPTY: True
+    ConfigKey.BLOCK_CONFIRM_EMPTY: True,
+    ConfigKey.BLOCK_INSTANT_SEAL: False,
+    ConfigKey.EMBEDDED_ENGINE: False,
+    ConfigKey.QUERY_CACHE_SIZE: 1024,
+    ConfigKey.COMMIT_NOTIFY_PATH: ".commit.sock",
+    ConfigKey.MQ_SLOW_CALL_THRESHOLD: 1
 }
 
 
@@ -102,6 +114,14 @@ tbears_cli_config = {
     "txresult": {},
     "transfer": {
         "stepLimit": "0xf4240",
+    },
+    "bench": {
+        "workload": "transfer",
+        "workers": 4,
+        "duration": 10,
+        "timeout": 60,
+        "value": "0x0",
+        "stepLimit": "0x3000000"
     }
 }
 
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from tbears.libs.icon_jsonrpc import IconJsonrpc, put_signature_to_params
+from tbears.libs.icx_signer import IcxSigner
+
+# number of transactions signed by a task of worker process
+DEFAULT_CHUNK_SIZE = 256
+# chunks submitted to workers ahead of the consumer, per worker
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# signer of worker process. private key is sent with each chunk as initializer of pool is not in python 3.6
+_worker_signer: Optional[IcxSigner] = None
+
+
+def sign_transactions(signer: 'IcxSigner', params: Iterable[dict], workers: int = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """Sign params of icx_sendTransaction in worker processes and stream icx_sendTransaction requests
+    in the order of params. Serialization, hashing and signing of a chunk of params are done in a worker process.
+    Params are consumed lazily and only a few chunks per worker are in flight, so memory doesn't grow with
+    the number of transactions.
+
+    :param signer: IcxSigner. Its private key is passed to worker processes of this machine
+    :param params: params of icx_sendTransaction without signature. 'from' is set to the address of signer if absent
+    :param workers: number of worker processes. default is the number of CPUs. 1 signs in the calling process
+    :param chunk_size: number of transactions signed by a task of worker process
+    :return: icx_sendTransaction JSON-RPC requests
+    """
+    workers = workers or os.cpu_count() or 1
+    address = f'hx{signer.address.hex()}'
+    chunks = _make_chunks(params, address, chunk_size)
+
+    private_key = signer.private_key
+    if workers == 1 or private_key is None:
+        # signer of key agent has no private key
+        for chunk in chunks:
+            for params_ in chunk:
+                put_signature_to_params(signer, params_)
+                yield _make_request(params_)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in islice(chunks, workers * CHUNKS_IN_FLIGHT_PER_WORKER):
+            in_flight.append((chunk, executor.submit(_sign_chunk, private_key, chunk)))
+
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            signatures = future.result()
+
+            # keep workers busy while the consumer handles this chunk
+            for next_chunk in islice(chunks, 1):
+                in_flight.append((next_chunk, executor.submit(_sign_chunk, private_key, next_chunk)))
+
+            for params_, signature in zip(chunk, signatures):
+                params_['signature'] = signature
+                yield _make_request(params_)
+
+
+def _make_chunks(params: Iterable[dict], address: str, chunk_size: int) -> Iterator[List[dict]]:
+    iterator = iter(params)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        for params_ in chunk:
+            if 'from' not in params_:
+                params_['from'] = address
+        yield chunk
+
+
+def _make_request(params: dict) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "method": "icx_sendTransaction",
+        "params": params,
+        "id": next(IconJsonrpc.request_id)
+    }
+
+
+def _sign_chunk(private_key: bytes, chunk: List[dict]) -> List[str]:
+    """Sign chunk in worker process
+
+    :param private_key: private key of signer
+    :param chunk: params of icx_sendTransaction
+    :return: signatures in the order of chunk
+    """
+    global _worker_signer
+    if _worker_signer is None or _worker_signer.private_key != private_key:
+        _worker_signer = IcxSigner(private_key)
+
+    signatures = []
+    for params in chunk:
+        put_signature_to_params(_worker_signer, params)
+        signatures.append(params['signature'])
+    return signatures
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import socket
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError, wait
+from typing import Optional, Iterable
+
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import ConfigKey, TBEARS_CLI_TAG
+from tbears.util.json_codec import loads
+
+# number of committed transactions remembered for hashes registered after their commit event arrived
+DEFAULT_HISTORY_SIZE = 4096
+
+
+def get_commit_notify_path() -> str:
+    """Get unix socket path of running tbears service's commit notifier
+
+    :return: unix socket path. None if tbears service is not running or does not publish commit events
+    """
+    # avoid circular import. command package imports libs
+    from tbears.command.command_server import CommandServer
+
+    server_conf = CommandServer.get_server_conf() or {}
+    return server_conf.get(ConfigKey.COMMIT_NOTIFY_PATH, None)
+
+
+class CommitWaiter(object):
+    """Subscribe block commit events of local tbears service and resolve futures of transaction hashes.
+
+    Register hashes before or right after sending transactions. Commit events received before registration are
+    remembered, so there is no race between sending a transaction and waiting for it.
+    """
+
+    def __init__(self, path: str = None, history_size: int = DEFAULT_HISTORY_SIZE):
+        """Constructor
+
+        :param path: unix socket path of commit notifier. If not set, use the path of running tbears service
+        :param history_size: number of committed transaction results to remember
+        """
+        self._path = path
+        self._history_size = history_size
+        self._history: OrderedDict = OrderedDict()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self.last_block_height = None
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self) -> bool:
+        """Connect to commit notifier and start receiving events
+
+        :return: True if connected. False if tbears service does not publish commit events
+        """
+        if self.connected:
+            return True
+
+        path = self._path or get_commit_notify_path()
+        if not path:
+            return False
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError as e:
+            Logger.debug(f"Can't connect to commit notifier({path}). {e}", TBEARS_CLI_TAG)
+            sock.close()
+            return False
+
+        self._sock = sock
+        self._thread = threading.Thread(target=self._receive, name='CommitWaiter', daemon=True)
+        self._thread.start()
+        return True
+
+    def close(self):
+        """Stop receiving events. Futures not resolved yet get ConnectionError"""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'CommitWaiter':
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def future(self, tx_hash: str) -> 'Future':
+        """Get future resolved with the result summary when the transaction is committed
+
+        :param tx_hash: transaction hash
+        :return: concurrent.futures.Future
+        """
+        tx_hash = _normalize_hash(tx_hash)
+        with self._lock:
+            future = self._futures.get(tx_hash)
+            if future is None or future.cancelled():
+                future = Future()
+                if tx_hash in self._history:
+                    future.set_result(self._history[tx_hash])
+                elif not self.connected:
+                    future.set_exception(ConnectionError('Not connected to commit notifier'))
+                else:
+                    self._futures[tx_hash] = future
+            return future
+
+    def wait(self, tx_hash: str, timeout: float = None) -> dict:
+        """Wait until the transaction is committed
+
+        :param tx_hash: transaction hash
+        :param timeout: timeout in seconds
+        :return: result summary of the transaction. {'status', 'scoreAddress', 'failure', 'blockHeight'}
+        """
+        return self.future(tx_hash).result(timeout=timeout)
+
+    def wait_all(self, tx_hashes: Iterable[str], timeout: float = None) -> dict:
+        """Wait until all transactions are committed
+
+        :param tx_hashes: transaction hashes
+        :param timeout: timeout in seconds for all transactions
+        :return: transaction hash -> result summary
+        """
+        futures = {tx_hash: self.future(tx_hash) for tx_hash in tx_hashes}
+        _, not_done = wait(futures.values(), timeout=timeout)
+        if not_done:
+            raise TimeoutError(f'{len(not_done)} transactions are not committed')
+
+        return {tx_hash: future.result() for tx_hash, future in futures.items()}
+
+    def _receive(self):
+        sock = self._sock
+        try:
+            with sock.makefile('rb') as stream:
+                for line in stream:
+                    self._on_event(loads(line))
+        except (OSError, ValueError) as e:
+            Logger.debug(f'Commit waiter stopped. {e}', TBEARS_CLI_TAG)
+        finally:
+            self._sock = None
+            with self._lock:
+                futures, self._futures = self._futures, {}
+            for future in futures.values():
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(ConnectionError('Connection to commit notifier closed'))
+
+    def _on_event(self, event: dict):
+        self.last_block_height = event['height']
+        resolved = []
+        with self._lock:
+            for tx_hash, result in event['txResults'].items():
+                result['blockHeight'] = event['height']
+                self._history[tx_hash] = result
+                future = self._futures.pop(tx_hash, None)
+                if future is not None:
+                    resolved.append((future, result))
+
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+
+        for future, result in resolved:
+            # future may be cancelled by its caller. e.g. timeout of asyncio.wait_for
+            if future.set_running_or_notify_cancel():
+                future.set_result(result)
+
+
+def _normalize_hash(tx_hash: str) -> str:
+    tx_hash = tx_hash.lower()
+    return tx_hash if tx_hash[:2] == '0x' else f'0x{tx_hash}'
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import binascii
+from typing import Iterator, Union
+
+# size of zip data encoded at once. hex string of a chunk is twice as large
+HEX_CHUNK_SIZE = 64 * 1024
+
+
+class HexContent(object):
+    """Deploy content as '0x' prefixed hexadecimal string, encoded from zip data on demand.
+
+    Zip data is referenced, not copied, and the hex string is made chunk by chunk while hashing and sending,
+    so deploying large SCOREs doesn't hold the hex string and JSON body of twice the zip size in memory.
+    str() makes the whole string for code paths which need it.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        """Constructor
+
+        :param data: zip data. memoryview of InMemoryZip.buffer is not copied
+        """
+        self._data = memoryview(data).cast('B')
+
+    def __len__(self) -> int:
+        """Length of the hex string including '0x'"""
+        return 2 + 2 * len(self._data)
+
+    def __str__(self) -> str:
+        return f'0x{self._data.hex()}'
+
+    def __repr__(self) -> str:
+        # requests are logged. don't put the whole content in logs
+        return f'<HexContent {len(self._data)} bytes>'
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, HexContent):
+            return self._data == other._data
+        if isinstance(other, str):
+            return len(self) == len(other) and str(self) == other
+        return NotImplemented
+
+    @property
+    def data(self) -> memoryview:
+        return self._data
+
+    def iter_hex(self, chunk_size: int = HEX_CHUNK_SIZE) -> Iterator[str]:
+        """Encode in chunks
+
+        :param chunk_size: size of zip data encoded at once
+        :return: '0x' and hex strings of chunks
+        """
+        yield '0x'
+        for start in range(0, len(self._data), chunk_size):
+            yield self._data[start:start + chunk_size].hex()
+
+    def iter_bytes(self, chunk_size: int = HEX_CHUNK_SIZE) -> Iterator[bytes]:
+        """Encode in chunks to ASCII bytes
+
+        :param chunk_size: size of zip data encoded at once
+        :return: b'0x' and hex bytes of chunks
+        """
+        yield b'0x'
+        for start in range(0, len(self._data), chunk_size):
+            yield binascii.hexlify(self._data[start:start + chunk_size])
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+from typing import Optional, Tuple, TYPE_CHECKING
+
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import TBEARS_CLI_TAG
+from tbears.libs.icon_jsonrpc import IconJsonrpc, DEFAULT_TIMEOUT, DEFAULT_WAIT_RESULT_TIMEOUT
+from tbears.tbears_exception import IconClientException
+from tbears.util.json_codec import dumps, loads
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+if TYPE_CHECKING:
+    from tbears.libs.commit_waiter import CommitWaiter
+
+# maximum number of requests in flight
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class AsyncIconClient(object):
+    """asyncio version of IconClient. Requests made by IconJsonrpc can be sent without change.
+
+    Requests in flight are limited by a semaphore and connections are reused. Cancelling a task waiting a response
+    closes its request and releases the semaphore.
+    """
+
+    def __init__(self, uri: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        """Constructor
+
+        :param uri: URI of destination
+        :param max_concurrency: maximum number of requests in flight
+        :param timeout: connect and read timeouts in seconds
+        """
+        if aiohttp is None:
+            raise IconClientException("AsyncIconClient needs aiohttp. Install it with 'pip install tbears[async]'")
+
+        self.__uri = uri
+        self.__max_concurrency = max_concurrency
+        self.__timeout = timeout
+        self.__session: Optional['aiohttp.ClientSession'] = None
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def uri(self) -> str:
+        return self.__uri
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        # session and semaphore must be made in the event loop which uses them
+        if self.__session is None:
+            connect_timeout, read_timeout = self.__timeout
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.__max_concurrency),
+                timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout))
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+        return self.__session
+
+    async def close(self):
+        """Close pooled connections"""
+        session, self.__session = self.__session, None
+        if session is not None:
+            await session.close()
+
+    async def __aenter__(self) -> 'AsyncIconClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def send(self, request) -> dict:
+        """Send request to URI
+
+        :param request: JSON-RPC request
+        :return: response dictionary of request.
+        """
+        Logger.debug(f"Send request to {self.__uri}. Request body: {request}", TBEARS_CLI_TAG)
+
+        session = self._get_session()
+        async with self.__semaphore:
+            try:
+                async with session.post(self.__uri, data=dumps(request),
+                                        headers={'Content-Type': 'application/json'}) as response:
+                    try:
+                        return await response.json(loads=loads, content_type=None)
+                    except ValueError:
+                        if response.status >= 400:
+                            raise IconClientException(f"Got error response. Response status_code: "
+                                                      f"[{response.status}]")
+            except asyncio.TimeoutError as e:
+                raise IconClientException(f"Request timeout. {e}")
+
+    async def send_transaction(self, request, waiter: 'CommitWaiter' = None, timeout: float = None) -> dict:
+        """Send request icx_sendTransaction to URI. If get success response, send icx_getTransactionResult request
+        and return response
+
+        :param request: JSON-RPC request
+        :param waiter: connected CommitWaiter. If set, wait commit notification before icx_getTransactionResult
+        :param timeout: timeout in seconds for waiting commit notification. default is DEFAULT_WAIT_RESULT_TIMEOUT
+        :return: response dictionary of request.
+        """
+        # check method
+        if request['method'] != 'icx_sendTransaction':
+            raise ValueError(f'invalid method {request["method"]}')
+
+        # sendTransaction
+        response = await self.send(request=request)
+
+        if 'error' in response:
+            return response
+
+        if waiter is not None:
+            timeout = DEFAULT_WAIT_RESULT_TIMEOUT if timeout is None else timeout
+            try:
+                # shield the future shared with other waiters of the hash from cancellation on timeout
+                future = asyncio.wrap_future(waiter.future(response['result']))
+                await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+            except (asyncio.TimeoutError, ConnectionError) as e:
+                Logger.debug(f"Can't get commit notification of {response['result']}. {e}", TBEARS_CLI_TAG)
+
+        # getTransactionResult
+        return await self.send(IconJsonrpc.getTransactionResult(tx_hash=response['result']))
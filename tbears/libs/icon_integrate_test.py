@@ -18,6 +18,7 @@ import hashlib
 import random
 from shutil import rmtree
 import sys
+from concurrent.futures import TimeoutError
 from time import time, sleep
 from typing import Any
 from unittest import TestCase
@@ -40,6 +41,7 @@ from iconservice.icon_inner_service import MakeResponse
 from iconservice.utils import to_camel_case
 from iconsdk.wallet.wallet import KeyWallet
 from tbears.config.tbears_config import TEST1_PRIVATE_KEY, tbears_server_config, ConfigKey as TbConf
+from tbears.libs.commit_waiter import CommitWaiter
 
 SCORE_INSTALL_ADDRESS = f"cx{'0' * 40}"
 Account = namedtuple('Account', 'name address balance')
@@ -224,9 +226,16 @@ class IconIntegrateTestBase(TestCase):
                             block_confirm_interval: int = tbears_server_config[TbConf.BLOCK_CONFIRM_INTERVAL]) -> dict:
         try:
             if network is not None:
-                # Send the transaction to network
-                tx_hash = network.send_transaction(request)
-                sleep(block_confirm_interval)
+                with CommitWaiter() as waiter:
+                    # Send the transaction to network
+                    tx_hash = network.send_transaction(request)
+                    # wait commit notification of local tbears service. if not available, wait block confirmation
+                    try:
+                        waiter.wait(tx_hash, timeout=block_confirm_interval)
+                    except ConnectionError:
+                        sleep(block_confirm_interval)
+                    except TimeoutError:
+                        pass
                 # Get transaction result
                 tx_result = network.get_transaction_result(tx_hash)
             else:
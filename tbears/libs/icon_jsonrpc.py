@@ -13,21 +13,37 @@
 # limitations under the License.
 
 import os
+import random
+import threading
 import time
+import uuid
 
 import requests
-from typing import Optional, Union
+from requests.adapters import HTTPAdapter
+from typing import Optional, Union, TYPE_CHECKING, Tuple, List, Iterator, Iterable, Dict
 import itertools
-import hashlib
+from concurrent.futures import TimeoutError
 
 from secp256k1 import PrivateKey
 from iconcommons.logger.logger import Logger
 
+from tbears.block_manager.message_code import Response, responseCodeMap
 from tbears.config.tbears_config import TBEARS_CLI_TAG
 from tbears.libs.icx_signer import key_from_key_store, IcxSigner
+from tbears.libs.key_agent import AgentSigner
+from tbears.libs.hex_content import HexContent, HEX_CHUNK_SIZE
 from tbears.libs.in_memory_zip import InMemoryZip
-from tbears.libs.icon_serializer import generate_origin_for_icx_send_tx_hash
-from tbears.tbears_exception import ZipException, DeployPayloadException, IconClientException
+from tbears.libs.icon_serializer import generate_hash_for_icx_send_tx
+from tbears.tbears_exception import ZipException, DeployPayloadException, IconClientException, KeyStoreException
+from tbears.util.json_codec import dumps, loads
+
+if TYPE_CHECKING:
+    from tbears.libs.commit_waiter import CommitWaiter
+    from tbears.libs.in_memory_zip import ZipOptions
+    from tbears.libs.zip_cache import ZipCache
+
+# signature of transactions made without keystore. tbears service doesn't validate signatures
+LOCAL_SIGNATURE = 'sig'
 
 
 class IconJsonrpc:
@@ -57,14 +73,20 @@ class IconJsonrpc:
         return IconJsonrpc(from_)
 
     @staticmethod
-    def from_key_store(keystore: str, password: str) -> 'IconJsonrpc':
-        """Create IconJsonrpc object from keystore file path and password
+    def from_key_store(keystore: str, password: str = None) -> 'IconJsonrpc':
+        """Create IconJsonrpc object from keystore file path and password.
+        If key agent has the key of keystore, sign with key agent without decrypting keystore
 
         :param keystore: keystore file path
-        :param password: password string
+        :param password: password string. not needed if key agent has the key
         :return: IconJsonrpc object
         """
-        return IconJsonrpc(IcxSigner(key_from_key_store(keystore, password)))
+        signer = AgentSigner.from_agent(keystore)
+        if signer is None:
+            if password is None:
+                raise KeyStoreException(f'Password of {keystore} is required')
+            signer = IcxSigner(key_from_key_store(keystore, password))
+        return IconJsonrpc(signer)
 
     @staticmethod
     def from_private_key(private_key: Optional[PrivateKey] = None) -> 'IconJsonrpc':
@@ -326,11 +348,10 @@ class IconJsonrpc:
         if to:
             params['to'] = to
 
-        msg_phrase = generate_origin_for_icx_send_tx_hash(params)
-        msg_hash = hashlib.sha3_256(msg_phrase.encode()).digest().hex()
+        msg_hash = generate_hash_for_icx_send_tx(params)
 
-        self.put_signature(params)
-        params["tx_hash"] = msg_hash
+        self.put_signature(params, msg_hash)
+        params["tx_hash"] = msg_hash.hex()
 
         return {
             "jsonrpc": "2.0",
@@ -389,12 +410,12 @@ class IconJsonrpc:
         }
 
     @staticmethod
-    def gen_deploy_data(content: str,
+    def gen_deploy_data(content: Union[str, 'HexContent'],
                         content_type: str = "application/zip",
                         params: dict = {}) -> dict:
         """Generate data dictionary of icx_sendTransaction which dataType is 'deploy'
 
-        :param content: SCORE data
+        :param content: SCORE data. hex string or HexContent
         :param content_type: type of contenst. {'application/zip'|'application/tbears'}
         :param params: parameter for on_install() or on_update() of SCORE
         :return: data dictionary
@@ -406,43 +427,147 @@ class IconJsonrpc:
         }
 
     @staticmethod
-    def gen_deploy_data_content(path: str) -> str:
+    def gen_deploy_data_content(path: str, cache: 'ZipCache' = None, options: 'ZipOptions' = None) -> str:
         """Generate zip data (hex string) of SCORE.
 
         :param path: The path of the directory to be zipped.
+        :param cache: ZipCache to reuse zip data of unchanged project directory
+        :param options: ZipOptions for zipping project directory
+        """
+        return str(IconJsonrpc.gen_deploy_hex_content(path, cache, options))
+
+    @staticmethod
+    def gen_deploy_hex_content(path: str, cache: 'ZipCache' = None, options: 'ZipOptions' = None) -> 'HexContent':
+        """Generate zip data of SCORE as HexContent. Zip data isn't copied and its hex string is made in chunks
+        while signing and sending the request, so memory used for deploy stays close to the zip size.
+
+        :param path: The path of the directory to be zipped.
+        :param cache: ZipCache to reuse zip data of unchanged project directory
+        :param options: ZipOptions for zipping project directory
+        :return: content of deploy data
         """
         if os.path.isdir(path) is False and os.path.isfile(path) is False:
             raise ValueError(f"Invalid path {path}")
         try:
-            memory_zip = InMemoryZip()
-            memory_zip.zip_in_memory(path)
+            if cache is not None and os.path.isdir(path):
+                data = cache.zip(path, options)
+            else:
+                memory_zip = InMemoryZip()
+                memory_zip.zip_in_memory(path, options)
+                data = memory_zip.buffer
         except ZipException as e:
             raise DeployPayloadException(f"Failed to generate zipped SCORE contents. {e}")
         else:
-            return f'0x{memory_zip.data.hex()}'
+            return HexContent(data)
 
-    def put_signature(self, params: dict) -> None:
+    def put_signature(self, params: dict, msg_hash: bytes = None) -> None:
         """Make signature and put to params of icx_sendTransaction request.
 
         :param params: params of icx_sendTransaction request.
+        :param msg_hash: hash of params if already made
         """
         if self.__signer:
             # generate phrase which is used for making signature.
             # if transaction data is changed, signature will be invalid as phrase also changed
-            put_signature_to_params(self.__signer, params)
+            put_signature_to_params(self.__signer, params, msg_hash)
         else:
             # in a local environment, doesn't need actual signature as doesn't validate tx
             # so just assign string data
-            params['signature'] = 'sig'
+            params['signature'] = LOCAL_SIGNATURE
+
+
+class IconJsonrpcBatch(object):
+    """Collect JSON-RPC requests and send them as batch requests
+
+    batch = IconJsonrpcBatch()
+    for address in addresses:
+        batch.add(IconJsonrpc.getBalance(address))
+    responses = batch.send(icon_client)
+    """
+
+    def __init__(self):
+        self.__requests = []
+
+    def __len__(self) -> int:
+        return len(self.__requests)
+
+    @property
+    def requests(self) -> list:
+        return self.__requests
+
+    def add(self, request: dict) -> int:
+        """Add JSON-RPC request made by IconJsonrpc
+
+        :param request: JSON-RPC request
+        :return: index of the response in the result of send()
+        """
+        self.__requests.append(request)
+        return len(self.__requests) - 1
+
+    def send(self, client: 'IconClient') -> List[dict]:
+        """Send requests
+
+        :param client: IconClient object
+        :return: responses in the order of requests
+        """
+        return client.send_batch(self.__requests)
+
+
+# number of keep-alive connections kept in pool of IconClient
+DEFAULT_POOL_SIZE = 10
+# connect and read timeouts in seconds. read timeout covers waiting block confirmation in instant seal mode
+DEFAULT_TIMEOUT = (5, 60)
+# batch requests larger than these are split
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_MAX_BATCH_BYTES = 512 * 1024
+# polling intervals(seconds) and timeout of waiting transaction results
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_MAX_POLL_INTERVAL = 2
+DEFAULT_WAIT_RESULT_TIMEOUT = 60
+# error code and message of icx_getTransactionResult for transactions not committed yet
+JSON_RPC_INVALID_PARAMS = -32602
+PENDING_TX_MESSAGE = responseCodeMap[Response.fail_tx_not_invoked][1]
 
 
 class IconClient(object):
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, pool_size: int = DEFAULT_POOL_SIZE, timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
         """Constructor
 
         :param uri: URI of destination
+        :param pool_size: maximum number of keep-alive connections
+        :param timeout: connect and read timeouts in seconds
         """
         self.__uri = uri
+        self.__timeout = timeout
+        # set False when server rejects batch request
+        self.__batch_supported = True
+
+        # reuse connections. requests.post makes new TCP connection for each request
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+        self.__session.headers['Content-Type'] = 'application/json'
+
+    @property
+    def uri(self) -> str:
+        return self.__uri
+
+    def close(self):
+        """Close pooled connections"""
+        self.__session.close()
+
+    def __enter__(self) -> 'IconClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _post(self, request) -> 'requests.Response':
+        try:
+            return self.__session.post(url=self.__uri, data=make_request_body(request), timeout=self.__timeout)
+        except requests.exceptions.Timeout as e:
+            raise IconClientException(f"Request timeout. {e}")
 
     def send(self, request) -> dict:
         """Send request to URI
@@ -453,20 +578,111 @@ class IconClient(object):
         Logger.info(f"Send request to {self.__uri}. Request body: {request}", TBEARS_CLI_TAG)
 
         # if query doesn't change any state of iconservice or loopchain, use 'send' method
-        response = requests.post(url=self.__uri, json=request)
+        response = self._post(request)
         try:
-            response_json = response.json()
+            response_json = loads(response.content)
         except ValueError:
             if not response.ok:
                 raise IconClientException(f"Got error response. Response status_code: [{response.status_code}]")
         else:
             return response_json
 
-    def send_transaction(self, request) -> dict:
+    def send_batch(self, requests: List[dict], max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                   max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> List[dict]:
+        """Send JSON-RPC requests as batch requests. Large batches are split by the number of requests and size
+
+        :param requests: JSON-RPC requests. Each request must have unique id
+        :param max_batch_size: maximum number of requests in a batch request
+        :param max_batch_bytes: maximum size of a batch request. A request larger than it is sent alone
+        :return: responses in the order of requests
+        """
+        ids = [request.get('id') for request in requests]
+        if None in ids or len(set(ids)) != len(ids):
+            raise ValueError('Requests in a batch must have unique id')
+
+        responses = {}
+        for batch in _split_batch(requests, max_batch_size, max_batch_bytes):
+            Logger.info(f"Send batch request of {len(batch)} requests to {self.__uri}", TBEARS_CLI_TAG)
+
+            response = self._post(batch)
+            try:
+                response_json = loads(response.content)
+            except ValueError:
+                raise IconClientException(f"Got error response. Response status_code: [{response.status_code}]")
+
+            if not isinstance(response_json, list):
+                # whole batch is rejected. e.g. server doesn't support batch request
+                raise IconClientException(f"Got error response for batch request. {response_json}")
+
+            for item in response_json:
+                responses[item.get('id')] = item
+
+        return [responses.get(id_) or _make_no_response_error(id_) for id_ in ids]
+
+    def wait_for_result(self, tx_hashes: Iterable[str], timeout: float = DEFAULT_WAIT_RESULT_TIMEOUT,
+                        interval: float = DEFAULT_POLL_INTERVAL,
+                        max_interval: float = DEFAULT_MAX_POLL_INTERVAL) -> Dict[str, dict]:
+        """Poll icx_getTransactionResult until transactions are committed. Polling interval grows exponentially
+        with jitter. Results of pending transactions are requested in one batch request each round and
+        committed transactions are not polled any more.
+
+        :param tx_hashes: transaction hashes
+        :param timeout: timeout in seconds. None waits without limit
+        :param interval: first polling interval in seconds
+        :param max_interval: maximum polling interval in seconds
+        :return: transaction hash -> response of icx_getTransactionResult. Transactions not committed in timeout
+                 have 'Pending transaction' error response
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = list(dict.fromkeys(tx_hashes))
+        results = {}
+
+        while pending:
+            responses = self.get_transaction_results(pending)
+            for tx_hash, response in zip(pending, responses):
+                results[tx_hash] = response
+            pending = [tx_hash for tx_hash in pending if is_pending_result(results[tx_hash])]
+            if not pending:
+                break
+
+            delay = interval * random.uniform(0.8, 1.2)
+            if deadline is not None:
+                remain = deadline - time.monotonic()
+                if remain <= 0:
+                    break
+                delay = min(delay, remain)
+            time.sleep(delay)
+            interval = min(interval * 2, max_interval)
+
+        return results
+
+    def get_transaction_results(self, tx_hashes: List[str]) -> List[dict]:
+        """Request icx_getTransactionResult of transactions in one batch request. Send single requests if server
+        rejects batch request
+
+        :param tx_hashes: transaction hashes
+        :return: responses in the order of tx_hashes
+        """
+        requests_ = [IconJsonrpc.getTransactionResult(tx_hash=tx_hash) for tx_hash in tx_hashes]
+        if len(requests_) > 1 and self.__batch_supported:
+            try:
+                return self.send_batch(requests_)
+            except IconClientException as e:
+                Logger.debug(f"Batch request is not supported. {e}", TBEARS_CLI_TAG)
+                self.__batch_supported = False
+
+        return [self.send(request) for request in requests_]
+
+    def send_transaction(self, request, waiter: 'CommitWaiter' = None, timeout: float = None,
+                         wait_result: bool = False) -> dict:
         """Send request icx_sendTransaction to URI. If get success response, send icx_getTransactionResult request
         and return response
 
         :param request: JSON-RPC request
+        :param waiter: connected CommitWaiter. If set, wait commit notification before icx_getTransactionResult
+        :param timeout: timeout in seconds for waiting the result. default is DEFAULT_WAIT_RESULT_TIMEOUT
+        :param wait_result: If True, poll icx_getTransactionResult until the transaction is committed when
+                            commit notification is not available
         :return: response dictionary of request.
         """
         # check method
@@ -479,13 +695,137 @@ class IconClient(object):
         if 'error' in response:
             return response
 
+        tx_hash = response['result']
+        timeout = DEFAULT_WAIT_RESULT_TIMEOUT if timeout is None else timeout
+
+        if waiter is not None:
+            try:
+                waiter.wait(tx_hash, timeout=timeout)
+            except TimeoutError as e:
+                Logger.debug(f"Can't get commit notification of {tx_hash}. {e}", TBEARS_CLI_TAG)
+                return self.send(IconJsonrpc.getTransactionResult(tx_hash=tx_hash))
+            except ConnectionError as e:
+                Logger.debug(f"Can't get commit notification of {tx_hash}. {e}", TBEARS_CLI_TAG)
+            else:
+                return self.send(IconJsonrpc.getTransactionResult(tx_hash=tx_hash))
+
+        if wait_result:
+            return self.wait_for_result([tx_hash], timeout=timeout)[tx_hash]
+
         # getTransactionResult
-        return requests.post(url=self.__uri,
-                             json=IconJsonrpc.getTransactionResult(tx_hash=response['result'])).json()
+        return self.send(IconJsonrpc.getTransactionResult(tx_hash=tx_hash))
+
+
+def is_pending_result(response: dict) -> bool:
+    """Check the response of icx_getTransactionResult is for the transaction not committed yet
+
+    :param response: response of icx_getTransactionResult
+    :return: True if the transaction is pending
+    """
+    error = response.get('error') if isinstance(response, dict) else None
+    if error is None:
+        return False
+
+    code = error.get('code')
+    # iconrpcserver maps the channel response code to JSON-RPC invalid params error, which is also used for
+    # unknown transaction hash. tell them apart with the message of the channel response code
+    return code == Response.fail_tx_not_invoked or \
+        (code == JSON_RPC_INVALID_PARAMS and error.get('message') == PENDING_TX_MESSAGE)
+
+
+def _split_batch(requests: List[dict], max_batch_size: int, max_batch_bytes: int) -> Iterator[List[dict]]:
+    batch = []
+    batch_bytes = 0
+    for request in requests:
+        request_bytes = len(dumps(request))
+        if batch and (len(batch) >= max_batch_size or batch_bytes + request_bytes > max_batch_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(request)
+        batch_bytes += request_bytes
+
+    if batch:
+        yield batch
+
+
+def _make_no_response_error(id_) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "error": {
+            "code": -32603,
+            "message": "No response for the request in batch"
+        },
+        "id": id_
+    }
+
+
+def make_request_body(request: Union[dict, list]) -> Union[bytes, 'HexContentBody']:
+    """Make HTTP body of JSON-RPC request. Deploy request with HexContent is streamed
+
+    :param request: JSON-RPC request or batch
+    :return: JSON bytes or HexContentBody
+    """
+    data = request.get('params', {}).get('data') if isinstance(request, dict) else None
+    if isinstance(data, dict) and isinstance(data.get('content'), HexContent):
+        return HexContentBody(request)
+    return dumps(request)
+
+
+class HexContentBody(object):
+    """HTTP body of deploy request encoding HexContent in chunks while it's sent.
+
+    Parts of JSON around the content are encoded once with a placeholder, so the body has Content-Length and
+    can be iterated again when the request is resent.
+    """
+    # random string which doesn't collide with strings of requests
+    _PLACEHOLDER = uuid.uuid4().hex
+
+    def __init__(self, request: dict, chunk_size: int = HEX_CHUNK_SIZE):
+        """Constructor
+
+        :param request: icx_sendTransaction request of which params.data.content is HexContent
+        :param chunk_size: size of zip data encoded at once
+        """
+        params = request['params']
+        data = params['data']
+        self._content: 'HexContent' = data['content']
+        self._chunk_size = chunk_size
+
+        placeholder_request = {**request, 'params': {**params, 'data': {**data, 'content': self._PLACEHOLDER}}}
+        prefix, suffix = dumps(placeholder_request).split(dumps(self._PLACEHOLDER))
+        self._prefix = prefix + b'"'
+        self._suffix = b'"' + suffix
+
+    def __len__(self) -> int:
+        return len(self._prefix) + len(self._content) + len(self._suffix)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._prefix
+        yield from self._content.iter_bytes(self._chunk_size)
+        yield self._suffix
+
+
+_icon_clients = {}
+_icon_clients_lock = threading.Lock()
+
+
+def get_icon_client(uri: str) -> 'IconClient':
+    """Get IconClient of URI shared in process. Commands and console reuse its pooled connections
+
+    :param uri: URI of destination
+    :return: IconClient object
+    """
+    with _icon_clients_lock:
+        client = _icon_clients.get(uri)
+        if client is None:
+            client = _icon_clients[uri] = IconClient(uri)
+        return client
 
 
-def put_signature_to_params(signer: 'IcxSigner', params: dict) -> None:
-    phrase = generate_origin_for_icx_send_tx_hash(params)
-    msg_hash = hashlib.sha3_256(phrase.encode()).digest()
+def put_signature_to_params(signer: 'IcxSigner', params: dict, msg_hash: bytes = None) -> None:
+    # origin is hashed in chunks. large deploy content is not copied
+    if msg_hash is None:
+        msg_hash = generate_hash_for_icx_send_tx(params)
     signature = signer.sign(msg_hash)
     params['signature'] = signature.decode()
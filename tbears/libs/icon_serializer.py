@@ -12,8 +12,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import copy
 import hashlib
+from typing import Callable, Container, Optional
+
+from tbears.libs.hex_content import HexContent
+
+# size of string chunks fed to hash. memory used for hashing doesn't grow with the size of data
+HASH_CHUNK_SIZE = 64 * 1024
 
 translator = str.maketrans({
     "\\": "\\\\",
@@ -25,41 +30,100 @@ translator = str.maketrans({
 })
 
 
-def generate_origin_for_hash(json_data: dict):
-
-    def encode(data):
-        if isinstance(data, dict):
-            return encode_dict(data)
-        elif isinstance(data, list):
-            return encode_list(data)
+def generate_origin_for_hash(json_data: dict, exclude: Container = ()) -> str:
+    """Serialize data for hash. Keys of dictionaries are sorted and values are escaped.
+
+    Nested data is walked with an explicit stack and parts are joined once at the end. Strings without characters
+    to escape, like hex strings of deploy content, are used as they are.
+
+    :param json_data: data to serialize
+    :param exclude: keys of json_data not serialized
+    :return: serialized string
+    """
+    parts = []
+    _serialize(json_data, exclude, parts.append)
+    return "".join(parts)
+
+
+def _serialize(json_data: dict, exclude: Container, append: Callable[[str], None], chunk_size: Optional[int] = None):
+
+    # (dictionary or None for list, iterator of keys or items, closing bracket)
+    stack = [(json_data, iter(sorted(key for key in json_data if key not in exclude)), "")]
+    need_separator = False
+
+    while stack:
+        container, iterator, closing = stack[-1]
+        for item in iterator:
+            if need_separator:
+                append(".")
+            if container is None:
+                value = item
+            else:
+                append(item)
+                append(".")
+                value = container[item]
+
+            if isinstance(value, dict):
+                append("{")
+                stack.append((value, iter(sorted(value.keys())), "}"))
+                need_separator = False
+                break
+            elif isinstance(value, list):
+                append("[")
+                stack.append((None, iter(value), "]"))
+                need_separator = False
+                break
+            elif value is None:
+                append("\\0")
+            elif isinstance(value, HexContent):
+                # hex string has no characters to escape
+                if chunk_size is None:
+                    append(str(value))
+                else:
+                    for part in value.iter_hex(chunk_size // 2):
+                        append(part)
+            elif isinstance(value, str):
+                if chunk_size is None or len(value) <= chunk_size:
+                    append(_escape_string(value))
+                else:
+                    # escaping is per character. slices are escaped independently
+                    for start in range(0, len(value), chunk_size):
+                        append(_escape_string(value[start:start + chunk_size]))
+            else:
+                append(str(value).translate(translator))
+            need_separator = True
         else:
-            return escape(data)
+            stack.pop()
+            append(closing)
+            need_separator = True
 
-    def encode_dict(data: dict):
-        result = ".".join(_encode_dict(data))
-        return "{" + result + "}"
 
-    def _encode_dict(data: dict):
-        for key in sorted(data.keys()):
-            yield key
-            yield encode(data[key])
+def _escape_string(value: str) -> str:
+    # searching characters is much faster than translating large strings like deploy content
+    if "." in value or "\\" in value or "{" in value or "}" in value or "[" in value or "]" in value:
+        return value.translate(translator)
+    return value
 
-    def encode_list(data: list):
-        result = ".".join(_encode_list(data))
-        return f"[" + result + "]"
 
-    def _encode_list(data: list):
-        for item in data:
-            yield encode(item)
+class _HashWriter(object):
+    """Buffer small parts and feed them to sha3_256 in chunks"""
 
-    def escape(data):
-        if data is None:
-            return "\\0"
+    def __init__(self, chunk_size: int):
+        self.hash = hashlib.sha3_256()
+        self._chunk_size = chunk_size
+        self._parts = []
+        self._size = 0
 
-        data = str(data)
-        return data.translate(translator)
+    def append(self, part: str):
+        self._parts.append(part)
+        self._size += len(part)
+        if self._size >= self._chunk_size:
+            self.flush()
 
-    return ".".join(_encode_dict(json_data))
+    def flush(self):
+        self.hash.update("".join(self._parts).encode())
+        self._parts.clear()
+        self._size = 0
 
 
 def get_tx_hash_key(icx_origin_data):
@@ -77,21 +141,28 @@ def get_tx_version(icx_origin_data):
 
 
 def generate_origin_for_icx_send_tx_hash(icx_origin_data):
-    copy_tx = copy.deepcopy(icx_origin_data)
-
     # return hash_key string data in accordance with API version
     tx_hash_key = get_tx_hash_key(icx_origin_data)
 
-    # delete tx_hash_key, method, signature as not be included when makes signature massage hash
-    if tx_hash_key in copy_tx:
-        del copy_tx[tx_hash_key]
+    # tx_hash_key, method, signature are not included when makes signature massage hash
+    # join once with the prefix. origin of deploy transaction is as large as its content
+    parts = ["icx_sendTransaction."]
+    _serialize(icx_origin_data, (tx_hash_key, 'method', 'signature'), parts.append)
+    return "".join(parts)
 
-    if 'method' in copy_tx:
-        del copy_tx['method']
 
-    if 'signature' in copy_tx:
-        del copy_tx['signature']
+def generate_hash_for_icx_send_tx(icx_origin_data, chunk_size: int = HASH_CHUNK_SIZE) -> bytes:
+    """Make sha3_256 hash of the origin of icx_sendTransaction without building the whole origin string.
+    The origin is fed to hash in chunks, so memory doesn't grow with the size of deploy content.
 
-    origin = generate_origin_for_hash(copy_tx)
-    return f"icx_sendTransaction.{origin}"
+    :param icx_origin_data: params of icx_sendTransaction
+    :param chunk_size: size of string chunks fed to hash
+    :return: hash. same as sha3_256(generate_origin_for_icx_send_tx_hash(icx_origin_data).encode()).digest()
+    """
+    tx_hash_key = get_tx_hash_key(icx_origin_data)
 
+    writer = _HashWriter(chunk_size)
+    writer.append("icx_sendTransaction.")
+    _serialize(icx_origin_data, (tx_hash_key, 'method', 'signature'), writer.append, chunk_size)
+    writer.flush()
+    return writer.hash.digest()
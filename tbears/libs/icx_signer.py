@@ -14,8 +14,9 @@
 # limitations under the License.
 import base64
 import hashlib
+import json
 
-from eth_keyfile import extract_key_from_keyfile
+from eth_keyfile import decode_keyfile_json
 from secp256k1 import PrivateKey
 
 from tbears.tbears_exception import KeyStoreException
@@ -23,6 +24,7 @@ from tbears.tbears_exception import KeyStoreException
 
 def key_from_key_store(file_path: str, password: (bytes, str)) -> bytes:
     """Get private key from keystore file.
+    Unencrypted key file made by 'tbears keystore --unencrypted' is read without password.
 
     :param file_path: keystore file path.
     :param password: password of keystore file.
@@ -31,7 +33,10 @@ def key_from_key_store(file_path: str, password: (bytes, str)) -> bytes:
     """
     try:
         with open(file_path, 'rb') as file:
-            private_key = extract_key_from_keyfile(file, password)
+            key_store_content = json.load(file)
+        if 'crypto' not in key_store_content and 'privateKey' in key_store_content:
+            return bytes.fromhex(key_store_content['privateKey'])
+        private_key = decode_keyfile_json(key_store_content, password)
     except ValueError:
         raise KeyStoreException('Invalid password.')
     except Exception as e:
@@ -72,6 +77,10 @@ class IcxSigner:
         recoverable_sig = bytes(bytearray(signature) + recovery_id.to_bytes(1, 'big'))
         return base64.b64encode(recoverable_sig)
 
+    @property
+    def private_key(self) -> bytes:
+        return self._private_key
+
     @property
     def public_key(self) -> bytes:
         return self._private_key_object.pubkey.serialize(compressed=False)
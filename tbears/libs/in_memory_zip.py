@@ -14,10 +14,33 @@
 # limitations under the License.
 import io
 import os
+import sys
 import zipfile
+from fnmatch import fnmatchcase
+from typing import Iterator, NamedTuple, Optional, Tuple, Union
 
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import TBEARS_CLI_TAG
 from tbears.tbears_exception import ZipException
 
+# date_time of entries in reproducible zip. the earliest time zip can have
+REPRODUCIBLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# unix regular file with permission rw-r--r--
+REPRODUCIBLE_EXTERNAL_ATTR = 0o100644 << 16
+# compresslevel of zipfile is supported since python 3.7
+_SUPPORTS_COMPRESS_LEVEL = sys.version_info >= (3, 7)
+
+
+class ZipOptions(NamedTuple):
+    """Options for zipping SCORE project directory"""
+    # sort entries and fix timestamps and permissions. same tree makes same bytes on any machine
+    reproducible: bool = False
+    # 0(no compression) ~ 9. None for the default level of zlib
+    compress_level: Optional[int] = None
+    # patterns of relative paths or names to exclude in addition to hidden files, '__pycache__' and 'tests'
+    exclude: Tuple[str, ...] = ()
+
 
 class InMemoryZip:
     """Class for compressing data in memory using zip and BytesIO."""
@@ -34,11 +57,21 @@ class InMemoryZip:
         self._in_memory.seek(0)
         return self._in_memory.read()
 
-    def zip_in_memory(self, path):
+    @property
+    def buffer(self) -> memoryview:
+        """Returns zip data without copying it. Nothing can be zipped more while the view is alive
+
+        :return: view of zip data
+        """
+        return self._in_memory.getbuffer()
+
+    def zip_in_memory(self, path, options: 'ZipOptions' = None):
         """Compress zip data (bytes) in memory.
 
         :param path: The path of the directory to be zipped.
+        :param options: ZipOptions. Zip file is used as it is
         """
+        options = options or ZipOptions()
         try:
             if os.path.isfile(path):
                 zf = zipfile.ZipFile(path, 'r', zipfile.ZIP_DEFLATED, False)
@@ -48,20 +81,137 @@ class InMemoryZip:
                     self._in_memory.seek(0)
                     self._in_memory.write(fp.read())
             else:
-                with zipfile.ZipFile(self._in_memory, 'a', zipfile.ZIP_DEFLATED, False) as zf:
-                    if os.path.isfile(path):
-                        zf.write(path)
+                compression = zipfile.ZIP_STORED if options.compress_level == 0 else zipfile.ZIP_DEFLATED
+                kwargs = _get_compress_level_kwargs(options.compress_level)
+                with zipfile.ZipFile(self._in_memory, 'a', compression, False, **kwargs) as zf:
+                    if options.reproducible:
+                        _write_reproducible(zf, path, options.exclude, kwargs)
                     else:
-                        for root, folders, files in os.walk(path):
-                            if root.find('/.') != -1:
-                                continue
-                            folder = os.path.basename(os.path.normpath(root))
-                            if folder == '__pycache__' or folder == 'tests':
-                                continue
-                            for file in files:
-                                if file.startswith('.'):
-                                    continue
-                                full_path = os.path.join(root, file)
-                                zf.write(full_path)
+                        for full_path in iter_project_files(path, options.exclude):
+                            zf.write(full_path)
         except Exception as e:
             raise ZipException({e})
+
+
+def iter_project_files(path: str, exclude: Tuple[str, ...] = ()) -> Iterator[str]:
+    """Walk the SCORE project directory and yield paths of files to be zipped.
+    Hidden files and directories, '__pycache__' and 'tests' directories are skipped.
+
+    :param path: The path of the project directory
+    :param exclude: patterns of relative paths or names of files and directories to skip more
+    :return: file paths in the order of zip entries
+    """
+    for root, folders, files in os.walk(path):
+        if root.find('/.') != -1:
+            continue
+        folder = os.path.basename(os.path.normpath(root))
+        if folder == '__pycache__' or folder == 'tests':
+            continue
+        if exclude:
+            relative_root = os.path.relpath(root, path)
+            folders[:] = [name for name in folders if not is_excluded(os.path.join(relative_root, name), exclude)]
+        for file in files:
+            if file.startswith('.'):
+                continue
+            full_path = os.path.join(root, file)
+            if exclude and is_excluded(os.path.relpath(full_path, path), exclude):
+                continue
+            yield full_path
+
+
+def is_excluded(relative_path: str, patterns: Tuple[str, ...]) -> bool:
+    """Check the path matches one of exclusion patterns. Pattern with '/' is matched with the relative path
+    and others with the name. e.g. 'docs', '*.md', 'lib/fixtures/*'
+
+    :param relative_path: path relative to project directory
+    :param patterns: fnmatch patterns
+    :return: True if excluded
+    """
+    relative_path = os.path.normpath(relative_path).replace(os.sep, '/')
+    name = relative_path.rsplit('/', 1)[-1]
+    for pattern in patterns:
+        if fnmatchcase(relative_path if '/' in pattern else name, pattern.rstrip('/')):
+            return True
+    return False
+
+
+def _write_reproducible(zf: 'zipfile.ZipFile', path: str, exclude: Tuple[str, ...], compress_level_kwargs: dict):
+    # entry names are relative to the parent of project directory and don't depend on the given path
+    base = os.path.basename(os.path.abspath(path))
+    entries = []
+    for full_path in iter_project_files(path, exclude):
+        relative_path = os.path.relpath(full_path, path).replace(os.sep, '/')
+        entries.append((f'{base}/{relative_path}', full_path))
+
+    for name, full_path in sorted(entries):
+        info = zipfile.ZipInfo(name, REPRODUCIBLE_DATE_TIME)
+        info.compress_type = zf.compression
+        info.create_system = 3
+        info.external_attr = REPRODUCIBLE_EXTERNAL_ATTR
+        with open(full_path, mode='rb') as file:
+            # level of ZipFile is not applied to ZipInfo given
+            zf.writestr(info, file.read(), **compress_level_kwargs)
+
+
+def _get_compress_level_kwargs(compress_level: Optional[int]) -> dict:
+    if compress_level is None or compress_level == 0:
+        return {}
+    if _SUPPORTS_COMPRESS_LEVEL:
+        return {'compresslevel': compress_level}
+    Logger.warning(f"Compression level is supported since python 3.7. Default level is used", TBEARS_CLI_TAG)
+    return {}
+
+
+def get_zip_report(data: Union[bytes, memoryview], top: int = 5) -> dict:
+    """Make size report of zip data. Only the central directory is read
+
+    :param data: zip data
+    :param top: number of the largest entries in report
+    :return: report dictionary
+    """
+    with zipfile.ZipFile(_BufferReader(data)) as zf:
+        infos = zf.infolist()
+
+    largest = sorted(infos, key=lambda info: info.compress_size, reverse=True)[:top]
+    return {
+        'files': len(infos),
+        'size': sum(info.file_size for info in infos),
+        'compressedSize': sum(info.compress_size for info in infos),
+        'zipSize': len(data),
+        # '0x' prefixed hex string in deploy transaction
+        'payloadSize': 2 + 2 * len(data),
+        'largest': [{'name': info.filename, 'size': info.file_size, 'compressedSize': info.compress_size}
+                    for info in largest]
+    }
+
+
+class _BufferReader(io.RawIOBase):
+    """Read-only file over bytes or memoryview. BytesIO copies memoryview"""
+
+    def __init__(self, data: Union[bytes, memoryview]):
+        super().__init__()
+        self._view = memoryview(data).cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import json
+import os
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from socketserver import ThreadingMixIn, UnixStreamServer, StreamRequestHandler
+from typing import Optional
+
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import TBEARS_CLI_TAG
+from tbears.libs.icx_signer import IcxSigner, key_from_key_store
+from tbears.tbears_exception import TBearsBaseException, KeyStoreException
+
+KEY_AGENT_MODULE_NAME = 'tbears.libs.key_agent'
+# environment variable of unix socket path of key agent
+KEY_AGENT_PATH_ENV = 'TBEARS_KEY_AGENT_SOCK'
+# seconds decrypted keys are kept in key agent
+DEFAULT_KEY_TTL = 900
+# seconds waiting key agent to start. key agent without keys exits after this
+KEY_AGENT_START_TIMEOUT = 5
+
+
+def get_key_agent_path() -> str:
+    """Get unix socket path of key agent. Each user has own key agent
+
+    :return: unix socket path
+    """
+    return os.environ.get(KEY_AGENT_PATH_ENV) or os.path.join(tempfile.gettempdir(), f'.tbears.agent.{os.getuid()}')
+
+
+def get_keystore_id(keystore: str) -> str:
+    return os.path.realpath(keystore)
+
+
+def has_agent_key(keystore: str) -> bool:
+    """Check key agent has the key of keystore. Commands don't ask password if it has
+
+    :param keystore: keystore file path
+    :return: True if key agent has the key
+    """
+    try:
+        return AgentSigner.from_agent(keystore) is not None
+    except KeyStoreException:
+        return False
+
+
+def get_keystore_address(keystore: str) -> str:
+    """Get address written in keystore file without decryption
+
+    :param keystore: keystore file path
+    :return: address string
+    """
+    try:
+        with open(keystore, 'rb') as file:
+            return json.load(file)['address']
+    except (OSError, ValueError, KeyError) as e:
+        raise KeyStoreException(f'keystore file error.{e}')
+
+
+class KeyAgent(object):
+    """Keep decrypted keys of keystore files for a while and sign message hashes with them.
+
+    Private keys never leave the agent. The unix socket is accessible only by the owner and connections of other
+    users are refused by peer credentials where the platform supports it. Keys expire after their TTL and the agent
+    exits when it holds no key.
+    """
+
+    def __init__(self, path: str = None):
+        """Constructor
+
+        :param path: unix socket path. If not set, use get_key_agent_path()
+        """
+        self._path = path or get_key_agent_path()
+        # keystore id -> {'signer', 'address', 'expire'}
+        self._keys = {}
+        self._lock = threading.Lock()
+        self._server: Optional['_KeyAgentServer'] = None
+        self._stopped = threading.Event()
+        # stop after the response of the request is written
+        self._stop_requested = False
+        self._last_added = time.monotonic()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def serve_forever(self):
+        """Serve requests until stopped or all keys expire"""
+        if KeyAgentClient(self._path).ping():
+            raise KeyStoreException(f'Key agent is already running on {self._path}')
+        if os.path.exists(self._path):
+            # stale socket of dead agent
+            os.remove(self._path)
+
+        # socket file must not be accessible to others even for a moment
+        umask = os.umask(0o177)
+        try:
+            self._server = _KeyAgentServer(self._path, _KeyAgentHandler, agent=self)
+        finally:
+            os.umask(umask)
+
+        threading.Thread(target=self._expire, name='KeyAgentExpire', daemon=True).start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self._path):
+                os.remove(self._path)
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_requested
+
+    def stop(self):
+        self._stopped.set()
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def handle(self, request: dict) -> dict:
+        """Handle a request
+
+        :param request: {'method': method, 'params': params}
+        :return: {'result': result} or {'error': message}
+        """
+        method = request.get('method')
+        params = request.get('params', {})
+        try:
+            if method == 'add':
+                result = self._add(**params)
+            elif method == 'sign':
+                result = self._sign(**params)
+            elif method == 'list':
+                result = self._list()
+            elif method == 'remove':
+                result = self._remove(**params)
+            elif method == 'ping':
+                result = True
+            elif method == 'stop':
+                self._stop_requested = True
+                result = True
+            else:
+                return {'error': f'Invalid method {method}'}
+        except TBearsBaseException as e:
+            return {'error': e.message}
+        except (TypeError, ValueError) as e:
+            return {'error': f'Invalid request. {e}'}
+        return {'result': result}
+
+    def _add(self, keystore: str, password: str, ttl: float = DEFAULT_KEY_TTL) -> str:
+        signer = IcxSigner(key_from_key_store(keystore, password))
+        address = f'hx{signer.address.hex()}'
+        with self._lock:
+            self._last_added = time.monotonic()
+            self._keys[get_keystore_id(keystore)] = {'signer': signer, 'address': address,
+                                                     'expire': self._last_added + ttl}
+        return address
+
+    def _sign(self, keystore: str, address: str, msg_hash: str) -> str:
+        with self._lock:
+            key = self._keys.get(get_keystore_id(keystore))
+        if key is None or key['expire'] <= time.monotonic():
+            raise KeyStoreException(f'Key of {keystore} is not in key agent')
+        if key['address'] != address:
+            # keystore file is replaced after the key was added
+            raise KeyStoreException(f'Address of {keystore} is changed')
+
+        return key['signer'].sign(bytes.fromhex(msg_hash)).decode()
+
+    def _list(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [{'keystore': keystore, 'address': key['address'], 'ttl': int(key['expire'] - now)}
+                    for keystore, key in self._keys.items() if key['expire'] > now]
+
+    def _remove(self, keystore: str = None) -> int:
+        with self._lock:
+            if keystore is None:
+                count = len(self._keys)
+                self._keys.clear()
+            else:
+                count = 1 if self._keys.pop(get_keystore_id(keystore), None) else 0
+            empty = not self._keys
+
+        if empty:
+            self._stop_requested = True
+        return count
+
+    def _expire(self):
+        while not self._stopped.wait(1):
+            now = time.monotonic()
+            with self._lock:
+                for keystore in [keystore for keystore, key in self._keys.items() if key['expire'] <= now]:
+                    del self._keys[keystore]
+                empty = not self._keys and now - self._last_added >= KEY_AGENT_START_TIMEOUT
+            if empty:
+                self.stop()
+
+
+class _KeyAgentServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, handler, agent: 'KeyAgent'):
+        self.agent = agent
+        super().__init__(path, handler)
+
+    def verify_request(self, request, client_address) -> bool:
+        return is_same_user(request)
+
+
+class _KeyAgentHandler(StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as e:
+            response = {'error': f'Invalid request. {e}'}
+        else:
+            response = self.server.agent.handle(request)
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+        self.wfile.flush()
+        if self.server.agent.stop_requested:
+            self.server.agent.stop()
+
+
+def is_same_user(sock: 'socket.socket') -> bool:
+    """Check the peer of unix socket is the same user. Platforms without SO_PEERCRED rely on socket permission
+
+    :param sock: connected unix socket
+    :return: True if the peer is the same user
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', credentials)
+    return uid == os.getuid()
+
+
+class KeyAgentClient(object):
+    """Client of key agent"""
+
+    def __init__(self, path: str = None, timeout: float = 5):
+        """Constructor
+
+        :param path: unix socket path of key agent. If not set, use get_key_agent_path()
+        :param timeout: timeout in seconds of a request
+        """
+        self._path = path or get_key_agent_path()
+        self._timeout = timeout
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def is_trusted(self) -> bool:
+        """Check the socket of key agent is owned by current user and not accessible to others.
+        Passwords are never sent to the socket of other users
+
+        :return: True if the socket is trusted
+        """
+        try:
+            stat_result = os.stat(self._path)
+        except OSError:
+            return False
+        return (stat.S_ISSOCK(stat_result.st_mode) and stat_result.st_uid == os.getuid()
+                and stat_result.st_mode & 0o077 == 0)
+
+    def request(self, method: str, **params):
+        """Send request to key agent
+
+        :param method: method name
+        :param params: parameters of method
+        :return: result of request
+        """
+        if not self.is_trusted():
+            raise KeyStoreException(f'Key agent is not running on {self._path}')
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._path)
+            sock.sendall(json.dumps({'method': method, 'params': params}).encode() + b'\n')
+            with sock.makefile('rb') as stream:
+                response = json.loads(stream.readline())
+        except (OSError, ValueError) as e:
+            raise KeyStoreException(f"Can't request to key agent. {e}")
+        finally:
+            sock.close()
+
+        if 'error' in response:
+            raise KeyStoreException(response['error'])
+        return response['result']
+
+    def ping(self) -> bool:
+        try:
+            return self.request('ping')
+        except KeyStoreException:
+            return False
+
+    def add(self, keystore: str, password: str, ttl: float = DEFAULT_KEY_TTL) -> str:
+        """Decrypt keystore in key agent
+
+        :param keystore: keystore file path
+        :param password: password of keystore
+        :param ttl: seconds the key is kept
+        :return: address of the key
+        """
+        return self.request('add', keystore=os.path.abspath(keystore), password=password, ttl=ttl)
+
+    def sign(self, keystore: str, address: str, msg_hash: bytes) -> bytes:
+        """Sign with the key of keystore
+
+        :param keystore: keystore file path
+        :param address: address of keystore
+        :param msg_hash: hash to sign
+        :return: base64-encoded recoverable signature
+        """
+        return self.request('sign', keystore=os.path.abspath(keystore), address=address,
+                            msg_hash=msg_hash.hex()).encode()
+
+    def list(self) -> list:
+        return self.request('list')
+
+    def remove(self, keystore: str = None) -> int:
+        return self.request('remove', keystore=keystore and os.path.abspath(keystore))
+
+    def stop(self):
+        self.request('stop')
+
+
+class AgentSigner(IcxSigner):
+    """IcxSigner signing with the key kept in key agent. It has no private key"""
+
+    def __init__(self, keystore: str, address: str, client: 'KeyAgentClient'):
+        self._keystore = keystore
+        self._address = address
+        self._client = client
+        self._private_key = None
+
+    @staticmethod
+    def from_agent(keystore: str, client: 'KeyAgentClient' = None) -> Optional['AgentSigner']:
+        """Make AgentSigner if key agent has the key of keystore
+
+        :param keystore: keystore file path
+        :param client: client of key agent
+        :return: AgentSigner or None if key agent is not running or doesn't have the key
+        """
+        client = client or KeyAgentClient()
+        if not client.is_trusted():
+            return None
+
+        keystore_id = get_keystore_id(keystore)
+        try:
+            keys = client.list()
+        except KeyStoreException as e:
+            Logger.debug(f"Can't use key agent. {e}", TBEARS_CLI_TAG)
+            return None
+
+        address = get_keystore_address(keystore)
+        for key in keys:
+            if key['keystore'] == keystore_id and key['address'] == address:
+                return AgentSigner(keystore, address, client)
+        return None
+
+    def sign_recoverable(self, msg_hash):
+        raise NotImplementedError('AgentSigner makes base64-encoded signature only')
+
+    def sign(self, msg_hash) -> bytes:
+        return self._client.sign(self._keystore, self._address, msg_hash)
+
+    @property
+    def public_key(self) -> bytes:
+        raise NotImplementedError('AgentSigner has no public key')
+
+    @property
+    def address(self) -> bytes:
+        return bytes.fromhex(self._address[2:])
+
+
+def start_key_agent(path: str = None) -> 'KeyAgentClient':
+    """Start key agent process if not running
+
+    :param path: unix socket path of key agent
+    :return: client of key agent
+    """
+    client = KeyAgentClient(path)
+    if client.ping():
+        return client
+
+    subprocess.Popen([sys.executable, '-m', KEY_AGENT_MODULE_NAME, client.path], close_fds=True,
+                     start_new_session=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + KEY_AGENT_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if client.ping():
+            return client
+        time.sleep(0.05)
+    raise KeyStoreException(f"Can't start key agent on {client.path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='tbears_key_agent', description='tbears key agent')
+    parser.add_argument('path', nargs='?', help='unix socket path')
+    args = parser.parse_args()
+
+    KeyAgent(args.path).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, TimeoutError, wait
+from typing import Callable, Optional, List, Tuple, TYPE_CHECKING
+
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import TBEARS_CLI_TAG
+from tbears.libs.icon_jsonrpc import is_pending_result
+
+if TYPE_CHECKING:
+    from tbears.libs.commit_waiter import CommitWaiter
+    from tbears.libs.icon_jsonrpc import IconClient
+
+# polling interval(seconds) of transaction results. It's the resolution of commit latency without commit waiter
+DEFAULT_RESULT_POLL_INTERVAL = 0.05
+# percentiles of latencies in report
+REPORT_PERCENTILES = (50, 90, 95, 99)
+
+
+class RateLimiter(object):
+    """Schedule events at fixed rate. Events delayed are not bursted later to keep the rate."""
+
+    def __init__(self, rate: float):
+        """Constructor
+
+        :param rate: events per second
+        """
+        self._interval = 1 / rate
+        self._next = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until next event time"""
+        with self._lock:
+            now = time.monotonic()
+            if self._next is None or self._next < now:
+                self._next = now
+            scheduled = self._next
+            self._next += self._interval
+
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CommitTracker(object):
+    """Resolve futures of transaction hashes with (result, commit time) when transactions are committed.
+
+    Commit events of connected CommitWaiter are used if given. Otherwise results of pending transactions are polled
+    in one batch request each round.
+    """
+
+    def __init__(self, client: 'IconClient', waiter: 'CommitWaiter' = None,
+                 poll_interval: float = DEFAULT_RESULT_POLL_INTERVAL):
+        """Constructor
+
+        :param client: IconClient used for polling transaction results
+        :param waiter: connected CommitWaiter
+        :param poll_interval: polling interval in seconds
+        """
+        self._client = client
+        self._waiter = waiter if waiter is not None and waiter.connected else None
+        self._poll_interval = poll_interval
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._poll, name='CommitTracker', daemon=True)
+        self._thread.start()
+
+    def track(self, tx_hash: str) -> 'Future':
+        """Start tracking the transaction
+
+        :param tx_hash: transaction hash
+        :return: future resolved with (result, time.monotonic() of commit)
+        """
+        future = Future()
+        if self._waiter is None:
+            self._add_pending(tx_hash, future)
+            return future
+
+        def _on_commit(commit: 'Future'):
+            if commit.exception() is None:
+                future.set_result((commit.result(), time.monotonic()))
+            else:
+                # connection to commit notifier is lost
+                self._add_pending(tx_hash, future)
+
+        self._waiter.future(tx_hash).add_done_callback(_on_commit)
+        return future
+
+    def close(self):
+        """Stop polling. Futures not resolved yet are left as they are"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _add_pending(self, tx_hash: str, future: 'Future'):
+        with self._condition:
+            self._pending[tx_hash] = future
+            self._condition.notify()
+
+    def _poll(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                pending = list(self._pending.items())
+
+            try:
+                responses = self._client.get_transaction_results([tx_hash for tx_hash, _ in pending])
+            except Exception as e:
+                Logger.debug(f"Failed to get transaction results. {e}", TBEARS_CLI_TAG)
+                responses = []
+
+            now = time.monotonic()
+            with self._condition:
+                for (tx_hash, future), response in zip(pending, responses):
+                    if not is_pending_result(response):
+                        del self._pending[tx_hash]
+                        future.set_result((response.get('result', response), now))
+
+            time.sleep(self._poll_interval)
+
+
+class LoadGenerator(object):
+    """Send transactions at target rate or with fixed number of workers and measure commit latencies.
+
+    With target rate, workers send transactions without waiting their commit and the number of workers bounds
+    requests in flight. Without target rate, each worker waits commit of its transaction before sending next one.
+    """
+
+    def __init__(self, client: 'IconClient', make_request: Callable[[int], dict], workers: int = 1,
+                 rate: float = None, duration: float = None, count: int = None, timeout: float = 60,
+                 waiter: 'CommitWaiter' = None):
+        """Constructor
+
+        :param client: IconClient to send requests
+        :param make_request: function making icx_sendTransaction request with sequence number
+        :param workers: number of threads sending requests
+        :param rate: target transactions per second. If not set, workers send transactions one by one
+        :param duration: time in seconds to send transactions
+        :param count: number of transactions to send
+        :param timeout: timeout in seconds for waiting commits after sending
+        :param waiter: connected CommitWaiter. If set, commit events are used instead of polling
+        """
+        if duration is None and count is None:
+            raise ValueError('duration or count must be set')
+
+        self._client = client
+        self._make_request = make_request
+        self._workers = workers
+        self._rate = rate
+        self._duration = duration
+        self._count = count
+        self._timeout = timeout
+        self._waiter = waiter
+
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._deadline = None
+        self._limiter: Optional[RateLimiter] = None
+        self._tracker: Optional[CommitTracker] = None
+        self._sent: List[Tuple[float, 'Future']] = []
+        self._send_latencies: List[float] = []
+        self._errors = Counter()
+
+    def run(self) -> dict:
+        """Run workload and make report
+
+        :return: report dictionary
+        """
+        self._limiter = RateLimiter(self._rate) if self._rate else None
+        self._tracker = CommitTracker(self._client, self._waiter)
+        start = time.monotonic()
+        self._deadline = None if self._duration is None else start + self._duration
+
+        threads = [threading.Thread(target=self._work, name=f'LoadGenerator-{i}', daemon=True)
+                   for i in range(self._workers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            send_end = time.monotonic()
+
+            _, not_done = wait([future for _, future in self._sent], timeout=self._timeout)
+        finally:
+            self._tracker.close()
+
+        return self._make_report(start, send_end, len(not_done))
+
+    def _next_sequence(self) -> Optional[int]:
+        with self._lock:
+            if self._count is not None and self._sequence >= self._count:
+                return None
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                return None
+            self._sequence += 1
+            return self._sequence
+
+    def _work(self):
+        while True:
+            if self._limiter is not None:
+                self._limiter.acquire()
+            sequence = self._next_sequence()
+            if sequence is None:
+                return
+
+            start = time.monotonic()
+            try:
+                response = self._client.send(self._make_request(sequence))
+            except Exception as e:
+                self._add_error(f'{type(e).__name__}: {e}')
+                continue
+
+            send_latency = time.monotonic() - start
+            if response is None or 'error' in response:
+                error = (response or {}).get('error', {})
+                self._add_error(error.get('message', 'Invalid response'))
+                continue
+
+            future = self._tracker.track(response['result'])
+            with self._lock:
+                self._sent.append((start, future))
+                self._send_latencies.append(send_latency)
+
+            if self._limiter is None:
+                # closed loop. wait commit before sending next transaction
+                try:
+                    future.result(timeout=self._timeout)
+                except TimeoutError:
+                    pass
+
+    def _add_error(self, message: str):
+        with self._lock:
+            self._errors[message] += 1
+
+    def _make_report(self, start: float, send_end: float, timeouts: int) -> dict:
+        latencies = []
+        failed = 0
+        end = send_end
+        for sent, future in self._sent:
+            if not future.done():
+                continue
+            result, committed = future.result()
+            latencies.append(committed - sent)
+            end = max(end, committed)
+            if result.get('status') != '0x1':
+                failed += 1
+
+        if timeouts:
+            self._errors['Commit timeout'] += timeouts
+        errors = sum(self._errors.values())
+        requested = len(self._sent) + errors - timeouts
+        elapsed = end - start
+
+        return {
+            'mode': 'rate' if self._rate else 'workers',
+            'rate': self._rate,
+            'workers': self._workers,
+            'elapsed': round(elapsed, 3),
+            'sent': requested,
+            'accepted': len(self._sent),
+            'committed': len(latencies),
+            'failed': failed,
+            'errors': errors,
+            'errorRate': round(errors / requested, 4) if requested else 0,
+            'sendRate': round(len(self._sent) / (send_end - start), 2) if send_end > start else 0,
+            'tps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0,
+            'latencyMs': summarize_latencies(latencies),
+            'sendLatencyMs': summarize_latencies(self._send_latencies),
+            'errorMessages': dict(self._errors)
+        }
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Get percentile with nearest-rank method
+
+    :param sorted_values: values sorted in ascending order
+    :param percent: percent in 0 ~ 100
+    :return: percentile
+    """
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies: List[float]) -> dict:
+    """Summarize latencies in milliseconds
+
+    :param latencies: latencies in seconds
+    :return: min, mean, max and percentiles in milliseconds
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    summary = {
+        'min': round(values[0], 3) if values else 0,
+        'mean': round(sum(values) / len(values), 3) if values else 0,
+    }
+    for percent in REPORT_PERCENTILES:
+        summary[f'p{percent}'] = round(percentile(values, percent), 3)
+    summary['max'] = round(values[-1], 3) if values else 0
+    return summary
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Set, TYPE_CHECKING
+
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import TBEARS_CLI_TAG
+from tbears.libs.icon_jsonrpc import IconJsonrpc, is_pending_result, DEFAULT_WAIT_RESULT_TIMEOUT
+from tbears.tbears_exception import TBearsBaseException
+
+if TYPE_CHECKING:
+    from tbears.libs.icon_jsonrpc import IconClient
+    from tbears.libs.in_memory_zip import ZipOptions
+    from tbears.libs.zip_cache import ZipCache
+
+# reference to SCORE address of other project in params. e.g. "${token}"
+REFERENCE_PATTERN = re.compile(r'\$\{([^{}]+)\}')
+# number of threads zipping projects and sending transactions
+DEFAULT_DEPLOY_WORKERS = 4
+
+
+def find_references(value: Any) -> Set[str]:
+    """Find names of projects referred in params
+
+    :param value: params of project
+    :return: names of projects
+    """
+    if isinstance(value, str):
+        return set(REFERENCE_PATTERN.findall(value))
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return set()
+    references = set()
+    for item in value:
+        references |= find_references(item)
+    return references
+
+
+def resolve_references(value: Any, addresses: Dict[str, str]) -> Any:
+    """Replace references in params with SCORE addresses
+
+    :param value: params of project
+    :param addresses: project name -> SCORE address
+    :return: params with SCORE addresses
+    """
+    if isinstance(value, str):
+        return REFERENCE_PATTERN.sub(lambda match: addresses[match.group(1)], value)
+    if isinstance(value, dict):
+        return {key: resolve_references(item, addresses) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, addresses) for item in value]
+    return value
+
+
+def get_deploy_waves(projects: List[dict]) -> List[List[dict]]:
+    """Group projects into waves. Projects of a wave refer only to projects of earlier waves
+
+    :param projects: projects of manifest
+    :return: waves in the order of deploy
+    """
+    names = {project['name'] for project in projects}
+    remaining = []
+    for project in projects:
+        references = find_references(project['params'])
+        unknown = references - names
+        if unknown:
+            raise ValueError(f"'{project['name']}' refers to unknown projects: {', '.join(sorted(unknown))}")
+        remaining.append((project, references))
+
+    waves = []
+    done = set()
+    while remaining:
+        wave = [project for project, references in remaining if references <= done]
+        if not wave:
+            cycle = ', '.join(project['name'] for project, _ in remaining)
+            raise ValueError(f'Projects refer to each other: {cycle}')
+        waves.append(wave)
+        done |= {project['name'] for project in wave}
+        remaining = [(project, references) for project, references in remaining if project['name'] not in done]
+    return waves
+
+
+class ManifestDeployer(object):
+    """Deploy SCOREs of manifest and wait their results.
+
+    Zips of all projects are built in parallel first. Projects are deployed in waves. Transactions of a wave are
+    signed and sent concurrently, and their results are polled in batch requests. References to projects of
+    earlier waves in params are replaced with their SCORE addresses.
+    """
+
+    def __init__(self, client: 'IconClient', sender: 'IconJsonrpc', nid: str, step_limit: str,
+                 workers: int = DEFAULT_DEPLOY_WORKERS, timeout: float = DEFAULT_WAIT_RESULT_TIMEOUT,
+                 cache: 'ZipCache' = None, options: 'ZipOptions' = None):
+        """Constructor
+
+        :param client: IconClient to send requests
+        :param sender: IconJsonrpc object of deployer
+        :param nid: network ID
+        :param step_limit: step limit of projects which don't have their own
+        :param workers: number of threads zipping projects and sending transactions
+        :param timeout: timeout in seconds for waiting results of a wave
+        :param cache: ZipCache to reuse zip data of unchanged project directory
+        :param options: ZipOptions for zipping project directory
+        """
+        self._client = client
+        self._sender = sender
+        self._nid = nid
+        self._step_limit = step_limit
+        self._workers = workers
+        self._timeout = timeout
+        self._cache = cache
+        self._options = options
+
+    def run(self, projects: List[dict]) -> dict:
+        """Deploy projects
+
+        :param projects: projects of manifest. name, project, params, mode, to and stepLimit
+        :return: report dictionary
+        """
+        start = time.monotonic()
+        waves = get_deploy_waves(projects)
+        addresses = {}
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            contents = {project['name']: executor.submit(IconJsonrpc.gen_deploy_hex_content, project['project'],
+                                                         self._cache, self._options)
+                        for project in projects}
+            sequence = 0
+            for wave in waves:
+                sent = {}
+                for project in wave:
+                    missing = find_references(project['params']) - addresses.keys()
+                    if missing:
+                        results[project['name']] = _make_result(
+                            project, 'skipped', message=f"Not deployed: {', '.join(sorted(missing))}")
+                        continue
+                    sequence += 1
+                    sent[project['name']] = executor.submit(self._send, project, contents[project['name']],
+                                                            resolve_references(project['params'], addresses),
+                                                            sequence)
+
+                tx_hashes = self._collect_tx_hashes(wave, sent, results)
+                self._wait_results(wave, tx_hashes, addresses, results)
+
+        return {
+            'elapsed': round(time.monotonic() - start, 3),
+            'deployed': len(addresses),
+            'failed': len(projects) - len(addresses),
+            'scoreAddresses': addresses,
+            # in the order of manifest
+            'results': {project['name']: results[project['name']] for project in projects}
+        }
+
+    def _send(self, project: dict, content: 'Future', params: dict, sequence: int) -> dict:
+        # nonce makes hashes differ when the same project is deployed with the same params
+        request = self._sender.sendTransaction(to=project['to'] if project['mode'] == 'update' else f'cx{"0" * 40}',
+                                               nid=self._nid, nonce=hex(sequence),
+                                               step_limit=project.get('stepLimit', None) or self._step_limit,
+                                               data_type='deploy',
+                                               data=IconJsonrpc.gen_deploy_data(content=content.result(),
+                                                                                params=params))
+        return self._client.send(request)
+
+    @staticmethod
+    def _collect_tx_hashes(wave: List[dict], sent: Dict[str, 'Future'], results: dict) -> Dict[str, str]:
+        tx_hashes = {}
+        for project in wave:
+            future = sent.get(project['name'])
+            if future is None:
+                continue
+            try:
+                response = future.result()
+            except TBearsBaseException as e:
+                # failed to zip project or to send request
+                results[project['name']] = _make_result(project, 'error', message=e.message)
+                continue
+            except Exception as e:
+                Logger.debug(f"Failed to deploy {project['name']}. {e}", TBEARS_CLI_TAG)
+                results[project['name']] = _make_result(project, 'error', message=f'{type(e).__name__}: {e}')
+                continue
+
+            if response is None or 'error' in response:
+                error = (response or {}).get('error', {})
+                results[project['name']] = _make_result(project, 'error',
+                                                        message=error.get('message', 'Invalid response'))
+            else:
+                tx_hashes[project['name']] = response['result']
+        return tx_hashes
+
+    def _wait_results(self, wave: List[dict], tx_hashes: Dict[str, str], addresses: dict, results: dict):
+        if not tx_hashes:
+            return
+        responses = self._client.wait_for_result(tx_hashes.values(), timeout=self._timeout)
+
+        for project in wave:
+            name = project['name']
+            if name not in tx_hashes:
+                continue
+            tx_hash = tx_hashes[name]
+            response = responses[tx_hash]
+            if is_pending_result(response):
+                results[name] = _make_result(project, 'timeout', tx_hash, message='Not committed in timeout')
+            elif 'error' in response:
+                results[name] = _make_result(project, 'error', tx_hash, message=response['error'].get('message'))
+            elif response['result'].get('status') != '0x1':
+                failure = response['result'].get('failure', {})
+                results[name] = _make_result(project, 'failure', tx_hash, message=failure.get('message'))
+            else:
+                addresses[name] = response['result']['scoreAddress']
+                results[name] = _make_result(project, 'success', tx_hash, addresses[name])
+
+
+def _make_result(project: dict, status: str, tx_hash: str = None, score_address: str = None,
+                 message: str = None) -> dict:
+    return {
+        'project': project['project'],
+        'mode': project['mode'],
+        'status': status,
+        'txHash': tx_hash,
+        'scoreAddress': score_address,
+        'message': message
+    }
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import base64
+import binascii
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from secp256k1 import PublicKey
+
+from tbears.libs.icon_jsonrpc import LOCAL_SIGNATURE
+from tbears.libs.icon_serializer import generate_hash_for_icx_send_tx
+from tbears.util.json_codec import loads
+from tbears.util.keystore_manager import address_from_public_key
+
+# number of transactions verified by a task of worker process
+DEFAULT_CHUNK_SIZE = 512
+# chunks submitted to workers ahead of the consumer, per worker
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+# invalid transactions kept in report
+MAX_INVALID_IN_REPORT = 1000
+
+# secp256k1 context of process. making context is much slower than recovering a public key
+_recover_key: Optional[PublicKey] = None
+
+
+def recover_address(msg_hash: bytes, signature: bytes) -> str:
+    """Recover address of signer from recoverable signature
+
+    :param msg_hash: signed hash
+    :param signature: 64 bytes signature and 1 byte recovery id
+    :return: address string
+    """
+    global _recover_key
+    if _recover_key is None:
+        _recover_key = PublicKey()
+
+    recoverable_signature = _recover_key.ecdsa_recoverable_deserialize(signature[:64], signature[64])
+    # reuse the context to serialize recovered public key
+    _recover_key.public_key = _recover_key.ecdsa_recover(msg_hash, recoverable_signature, raw=True)
+    serialized = _recover_key.serialize(compressed=False)
+    return f'hx{address_from_public_key(serialized).hex()}'
+
+
+def verify_transaction(tx: dict) -> Optional[str]:
+    """Verify that signature of transaction recovers to its 'from' address
+
+    :param tx: params of icx_sendTransaction as stored in tbears DB. 'txHash' added by tbears is removed
+    :return: None if valid, otherwise the reason
+    """
+    # tbears adds its own hash. it's not a part of the signed origin
+    tx.pop('txHash', None)
+
+    from_ = tx.get('from')
+    if not isinstance(from_, str) or not from_.startswith('hx'):
+        return f"Invalid from address {from_}"
+
+    try:
+        signature = base64.b64decode(tx['signature'], validate=True)
+    except (binascii.Error, TypeError, ValueError) as e:
+        return f'Invalid signature encoding. {e}'
+    if len(signature) != 65:
+        return f'Invalid signature length {len(signature)}'
+
+    try:
+        address = recover_address(generate_hash_for_icx_send_tx(tx), signature)
+    except Exception as e:
+        return f'Invalid signature. {e}'
+
+    if address != from_:
+        return f'Signature recovers to {address}'
+    return None
+
+
+def verify_transactions(rows: Iterable[Tuple[bytes, bytes]], workers: int = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Verify signatures of stored transactions in worker processes.
+    Rows are consumed lazily and only a few chunks per worker are in flight, so memory doesn't grow with the number
+    of transactions.
+
+    :param rows: (transaction hash, stored value) of transactions
+    :param workers: number of worker processes. default is the number of CPUs. 1 verifies in the calling process
+    :param chunk_size: number of transactions verified by a task of worker process
+    :return: report dictionary
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.monotonic()
+    chunks = _make_chunks(rows, chunk_size)
+
+    total = valid = unsigned = 0
+    invalid = []
+    invalid_count = 0
+    for chunk_result in _verify_chunks(chunks, workers):
+        chunk_total, chunk_valid, chunk_unsigned, chunk_invalid = chunk_result
+        total += chunk_total
+        valid += chunk_valid
+        unsigned += chunk_unsigned
+        invalid_count += len(chunk_invalid)
+        invalid.extend(chunk_invalid[:MAX_INVALID_IN_REPORT - len(invalid)])
+
+    elapsed = time.monotonic() - start
+    return {
+        'workers': workers,
+        'total': total,
+        'valid': valid,
+        'unsigned': unsigned,
+        'invalid': invalid_count,
+        'elapsed': round(elapsed, 3),
+        'txPerSec': round(total / elapsed, 2) if elapsed > 0 else 0,
+        'invalidTransactions': invalid
+    }
+
+
+def _make_chunks(rows: Iterable[Tuple[bytes, bytes]], chunk_size: int) -> Iterator[List[Tuple[bytes, bytes]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _verify_chunks(chunks: Iterator[list], workers: int) -> Iterator[tuple]:
+    if workers == 1:
+        for chunk in chunks:
+            yield _verify_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque(executor.submit(_verify_chunk, chunk)
+                          for chunk in islice(chunks, workers * CHUNKS_IN_FLIGHT_PER_WORKER))
+        while in_flight:
+            future = in_flight.popleft()
+            for chunk in islice(chunks, 1):
+                in_flight.append(executor.submit(_verify_chunk, chunk))
+            yield future.result()
+
+
+def _verify_chunk(chunk: List[Tuple[bytes, bytes]]) -> Tuple[int, int, int, List[dict]]:
+    """Verify chunk in worker process. Stored values are parsed in the worker too
+
+    :param chunk: (transaction hash, stored value) of transactions
+    :return: number of transactions, valid ones, unsigned ones and invalid transactions
+    """
+    valid = unsigned = 0
+    invalid = []
+    for tx_hash, value in chunk:
+        try:
+            stored = loads(value)
+            tx = stored['transaction']
+        except (ValueError, KeyError, TypeError) as e:
+            invalid.append({'txHash': f'0x{tx_hash.hex()}', 'error': f'Invalid stored transaction. {e}'})
+            continue
+
+        if tx.get('signature') in (None, '', LOCAL_SIGNATURE):
+            # transactions of local environment are not signed
+            unsigned += 1
+            continue
+
+        error = verify_transaction(tx)
+        if error is None:
+            valid += 1
+        else:
+            invalid.append({'txHash': f'0x{tx_hash.hex()}', 'blockHeight': stored.get('block_height'), 'error': error})
+
+    return len(chunk), valid, unsigned, invalid
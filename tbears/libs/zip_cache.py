@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import os
+import tempfile
+import time
+from typing import Optional, Union
+
+from iconcommons.logger.logger import Logger
+
+from tbears.config.tbears_config import TBEARS_CLI_TAG
+from tbears.libs.in_memory_zip import InMemoryZip, ZipOptions, iter_project_files
+
+# environment variable to set cache directory
+ZIP_CACHE_DIR_ENV = 'TBEARS_ZIP_CACHE_DIR'
+# number of zip files kept in cache directory. least recently used ones are removed
+DEFAULT_MAX_ENTRIES = 32
+# content of files modified within this time(seconds) is hashed, as next modification may not change the mtime
+MTIME_GRANULARITY = 2
+# bump on changes of zip layout to invalidate zip files made by older versions
+FINGERPRINT_VERSION = b'1'
+
+
+def get_zip_cache_dir() -> str:
+    """Get the directory of zip cache. $TBEARS_ZIP_CACHE_DIR, or 'tbears/zip' in the user cache directory
+
+    :return: cache directory path
+    """
+    directory = os.environ.get(ZIP_CACHE_DIR_ENV)
+    if directory:
+        return directory
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'tbears', 'zip')
+
+
+class ZipCache(object):
+    """Cache of zipped SCORE projects keyed on the fingerprint of project tree.
+
+    Fingerprint is made of paths, sizes, modes and mtimes of the files to be zipped, so only the tree is walked
+    on a hit. Files modified just before are hashed also, as a change within the mtime granularity keeps the mtime.
+    """
+
+    def __init__(self, directory: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Constructor
+
+        :param directory: cache directory. default is get_zip_cache_dir()
+        :param max_entries: number of zip files kept in cache directory
+        """
+        self._directory = directory or get_zip_cache_dir()
+        self._max_entries = max_entries
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def zip(self, path: str, options: 'ZipOptions' = None) -> Union[bytes, memoryview]:
+        """Get zip data of SCORE project from cache, or zip it and put in cache
+
+        :param path: The path of the directory to be zipped.
+        :param options: ZipOptions
+        :return: zip data
+        """
+        key = self.fingerprint(path, options)
+        data = self.get(key)
+        if data is None:
+            memory_zip = InMemoryZip()
+            memory_zip.zip_in_memory(path, options)
+            data = memory_zip.buffer
+            self.put(key, data)
+        return data
+
+    @staticmethod
+    def fingerprint(path: str, options: 'ZipOptions' = None) -> str:
+        """Make fingerprint of SCORE project tree
+
+        :param path: The path of the project directory
+        :param options: ZipOptions. Zips made with different options have different fingerprints
+        :return: fingerprint in hexadecimal string
+        """
+        options = options or ZipOptions()
+        hash_ = hashlib.sha3_256(FINGERPRINT_VERSION)
+        hash_.update(repr(tuple(options)).encode())
+        # names of zip entries are made of the path as given
+        hash_.update(os.fsencode(path))
+        recent = time.time() - MTIME_GRANULARITY
+        for full_path in iter_project_files(path, options.exclude):
+            stat = os.stat(full_path)
+            hash_.update(b'\0%b\0%d\0%o\0%d' % (os.fsencode(full_path), stat.st_size, stat.st_mode,
+                                                 stat.st_mtime_ns))
+            if stat.st_mtime >= recent:
+                hash_.update(_hash_file(full_path))
+        return hash_.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get zip data in cache
+
+        :param key: fingerprint of project
+        :return: zip data. None if not in cache
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, mode='rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        try:
+            # mark as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: Union[bytes, memoryview]):
+        """Put zip data in cache and remove least recently used ones over max entries.
+        Failures are ignored as the cache is only for speed.
+
+        :param key: fingerprint of project
+        :param data: zip data
+        """
+        try:
+            os.makedirs(self._directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, mode='wb') as file:
+                    file.write(data)
+                os.replace(tmp_path, self._get_path(key))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            self._evict()
+        except OSError as e:
+            Logger.debug(f"Failed to put zip in cache {self._directory}. {e}", TBEARS_CLI_TAG)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._directory, f'{key}.zip')
+
+    def _list_entries(self) -> list:
+        try:
+            return [entry for entry in os.scandir(self._directory) if entry.name.endswith('.zip')]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        entries = self._list_entries()
+        if len(entries) <= self._max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        for entry in entries[self._max_entries:]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def _hash_file(path: str) -> bytes:
+    hash_ = hashlib.sha3_256()
+    with open(path, mode='rb') as file:
+        for chunk in iter(lambda: file.read(64 * 1024), b''):
+            hash_.update(chunk)
+    return hash_.digest()
@@ -20,7 +20,7 @@ from IPython.core import page
 from IPython.terminal.prompts import Prompts, Token
 
 from tbears.command.command import Command
-from tbears.libs.icon_jsonrpc import IconClient, IconJsonrpc
+from tbears.libs.icon_jsonrpc import IconClient, IconJsonrpc, get_icon_client
 
 ip = get_ipython()
 
@@ -48,9 +48,15 @@ class TbearsCommands(Magics):
             if full_command_list[0] == 'deploy' and not response.get("error", None):
                 args = self.command_ins.parser.parse_args(full_command_list)
                 conf = self.command_ins.cmdScore.get_icon_conf('deploy', args=vars(args))
-                self.score_info.append(f"{next(self.deployed_id)}."
-                                       f"path : {conf['project']}, txhash : {response['result']},"
-                                       f" deployed in : {conf['uri']}")
+                if conf.get('manifest', None):
+                    deployed = [(result['project'], result['txHash']) for result in response['results'].values()
+                                if result['txHash']]
+                else:
+                    deployed = [(conf['project'], response['result'])]
+                for project, tx_hash in deployed:
+                    self.score_info.append(f"{next(self.deployed_id)}."
+                                           f"path : {project}, txhash : {tx_hash},"
+                                           f" deployed in : {conf['uri']}")
             return
 
     @line_magic
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""JSON codec of client, block store and message queue handlers.
+
+orjson is used if installed and the standard library otherwise. Set TBEARS_JSON_CODEC environment variable to 'json'
+to use the standard library always. Bytes that affect hashes are made by dumps_canonical, which is the same with
+any codec.
+"""
+import json
+import os
+from typing import Any, Union
+
+from tbears.libs.hex_content import HexContent
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# environment variable of codec name. 'json' or 'orjson'
+JSON_CODEC_ENV = 'TBEARS_JSON_CODEC'
+# orjson decodes integers within 64 bits. floats out of this bound may be integers in JSON
+_INT64_BOUND = 2 ** 63
+
+
+class JsonCodec(object):
+    """Codec of the standard library"""
+    name = 'json'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec of orjson. Output is compact and not ASCII-escaped. It can be parsed by any codec"""
+    name = 'orjson'
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=_default)
+        except TypeError:
+            # integers out of 64 bits and non-string keys of dictionaries
+            return super().dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        obj = orjson.loads(data)
+        # orjson decodes integers out of 64 bits to float without error. parse again to keep them integers
+        if _has_large_float(obj):
+            return super().loads(data)
+        return obj
+
+
+def _has_large_float(obj: Any) -> bool:
+    # walk containers only. strings like deploy content are not scanned
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            if not -_INT64_BOUND < obj < _INT64_BOUND:
+                return True
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+    return False
+
+
+def _default(obj: Any) -> Any:
+    # IconClient streams deploy content. other paths encode it at once
+    if isinstance(obj, HexContent):
+        return str(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def get_codec(name: str = None) -> 'JsonCodec':
+    """Get codec
+
+    :param name: 'json' or 'orjson'. If not set, orjson if installed
+    :return: codec
+    """
+    if name is None:
+        name = 'orjson' if orjson is not None else 'json'
+
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError('orjson is not installed')
+        return OrjsonCodec()
+    if name == 'json':
+        return JsonCodec()
+    raise ValueError(f'Invalid JSON codec {name}')
+
+
+codec = get_codec(os.environ.get(JSON_CODEC_ENV) or None)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to JSON bytes with the codec
+
+    :param obj: object to encode
+    :return: JSON bytes
+    """
+    return codec.dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON bytes or string with the codec
+
+    :param data: JSON bytes or string
+    :return: decoded object
+    """
+    return codec.loads(data)
+
+
+def dumps_canonical(obj: Any) -> bytes:
+    """Encode to JSON bytes for hash. It's the standard library always, so hashes don't depend on the codec
+
+    :param obj: object to encode
+    :return: JSON bytes
+    """
+    return json.dumps(obj).encode()
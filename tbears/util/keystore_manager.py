@@ -13,11 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import hashlib
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List
 
 from eth_keyfile import create_keyfile_json
 from secp256k1 import PrivateKey
 
+# number of keystores encrypted by a task of worker process
+KEY_STORE_CHUNK_SIZE = 4
+
 
 def make_key_store_content(password):
     """ Make a content of key_store.
@@ -36,6 +43,60 @@ def make_key_store_content(password):
     return key_store_contents
 
 
+def make_unencrypted_key_content() -> dict:
+    """ Make a content of unencrypted key file. It's only for throwaway test accounts as the private key is written
+    as it is. key_from_key_store reads it without password.
+    :return: key_content (dict)
+    """
+    private_key_obj = PrivateKey()
+    public_key = private_key_obj.pubkey.serialize(compressed=False)
+    return {
+        'address': f'hx{address_from_public_key(public_key).hex()}',
+        'privateKey': private_key_obj.private_key.hex(),
+        'coinType': 'icx'
+    }
+
+
+def make_key_store_contents(count: int, password: str = None, workers: int = None) -> Iterator[dict]:
+    """ Make contents of key_store in worker processes. Encryption with scrypt dominates the time,
+    so keystores are encrypted in parallel across CPUs.
+    :param count: number of keystores
+    :param password: password of keystores. If None, make unencrypted key contents
+    :param workers: number of worker processes. default is the number of CPUs. 1 makes in the calling process
+    :return: key_store_contents (dict)
+    """
+    if password is None:
+        for _ in range(count):
+            yield make_unencrypted_key_content()
+        return
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [min(KEY_STORE_CHUNK_SIZE, count - i) for i in range(0, count, KEY_STORE_CHUNK_SIZE)]
+    if workers == 1:
+        for chunk in chunks:
+            yield from _make_key_store_chunk(password, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for contents in executor.map(_make_key_store_chunk, repeat(password), chunks):
+            yield from contents
+
+
+def _make_key_store_chunk(password: str, count: int) -> List[dict]:
+    return [make_key_store_content(password) for _ in range(count)]
+
+
+def make_genesis_accounts(addresses: List[str], balance: str, name_prefix: str = 'account') -> List[dict]:
+    """ Make accounts of genesis in tbears_server_config.
+    :param addresses: addresses of accounts
+    :param balance: balance of each account in loop (hex string)
+    :param name_prefix: prefix of account names. index of account is appended
+    :return: genesis accounts (list)
+    """
+    return [{'name': f'{name_prefix}{i}', 'address': address, 'balance': balance}
+            for i, address in enumerate(addresses)]
+
+
 def get_public_key_from_private_key(private_key_obj) -> bytes:
     return private_key_obj.pubkey.serialize(compressed=False)
 
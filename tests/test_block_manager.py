@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import copy
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from tbears.block_manager import message_code
+from tbears.block_manager.block_manager import BlockManager, BlockManagerHost, ICON_SCORE_QUEUE_NAME_FORMAT
+from tbears.block_manager.channel_service import ChannelInnerTask
+from tbears.config.tbears_config import ConfigKey, tbears_server_config
+
+DIRECTORY_PATH = os.path.abspath((os.path.dirname(__file__)))
+BLOCK_MANAGER_PATH = os.path.join(DIRECTORY_PATH, '.block_manager')
+
+
+class MockChannelService(object):
+    def __init__(self, amqp_target: str, route_key: str, conf: dict, block_manager: 'BlockManager'):
+        pass
+
+    async def connect(self, **kwargs):
+        pass
+
+
+class MockIconTask(object):
+    def __init__(self):
+        self.blocks = []
+
+    async def hello(self):
+        pass
+
+    async def invoke(self, request: dict) -> dict:
+        self.blocks.append(request)
+        tx_results = {}
+        for tx in request['transactions']:
+            tx_hash = tx['params']['txHash']
+            tx_results[tx_hash] = {'status': '0x1', 'txHash': f'0x{tx_hash}'}
+        return {'txResults': tx_results, 'stateRootHash': '0' * 64}
+
+    async def write_precommit_state(self, request: dict) -> dict:
+        return {}
+
+
+class MockIconStub(object):
+    def __init__(self, amqp_target: str, route_key: str, block_manager: 'BlockManager'):
+        self.route_key = route_key
+        self.task = MockIconTask()
+
+    async def connect(self, **kwargs):
+        pass
+
+    def async_task(self):
+        return self.task
+
+
+class MockHost(object):
+    def on_closed(self, block_manager: 'BlockManager'):
+        pass
+
+
+@patch('tbears.block_manager.block_manager.ChannelService', MockChannelService)
+@patch('tbears.block_manager.block_manager.IconStub', MockIconStub)
+class TestBlockManager(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.conf = copy.deepcopy(tbears_server_config)
+        self.conf['stateDbRootPath'] = os.path.join(BLOCK_MANAGER_PATH, '.statedb')
+        self.conf['scoreRootPath'] = os.path.join(BLOCK_MANAGER_PATH, '.score')
+        self.conf[ConfigKey.COMMIT_NOTIFY_PATH] = ''
+        # blocks are confirmed by tests
+        self.conf[ConfigKey.BLOCK_CONFIRM_INTERVAL] = 100
+        self.conf[ConfigKey.BLOCK_CONFIRM_EMPTY] = False
+        self.block_managers = []
+
+    def tearDown(self):
+        for block_manager in self.block_managers:
+            self.loop.run_until_complete(block_manager.shutdown())
+        self.loop.close()
+        shutil.rmtree(BLOCK_MANAGER_PATH, ignore_errors=True)
+
+    def start(self, block_manager: 'BlockManager' = None) -> 'BlockManager':
+        if block_manager is None:
+            block_manager = BlockManager(conf=self.conf, host=MockHost())
+        self.block_managers.append(block_manager)
+        self.loop.run_until_complete(block_manager.start())
+        return block_manager
+
+    def create_icx_tx(self, block_manager: 'BlockManager', tx: dict):
+        task = ChannelInnerTask(conf=self.conf, block_manager=block_manager)
+        return self.loop.run_until_complete(task.create_icx_tx(tx))
+
+    def test_reject_tx_not_logged(self):
+        block_manager = self.start()
+
+        with patch.object(block_manager.tx_log, '_write', side_effect=OSError('disk full')):
+            code, tx_hash = self.create_icx_tx(block_manager, {'nonce': '0x1'})
+        self.assertEqual(message_code.Response.fail, code)
+        self.assertIsNone(tx_hash)
+        self.assertEqual([], block_manager.tx_queue)
+        self.assertEqual(0, len(block_manager.tx_status))
+
+        # rejected transaction is not sealed
+        code, tx_hash = self.create_icx_tx(block_manager, {'nonce': '0x2'})
+        self.assertEqual(message_code.Response.success, code)
+        self.loop.run_until_complete(block_manager.process_block_data())
+        transactions = block_manager.icon_stub.async_task().blocks[-1]['transactions']
+        self.assertEqual([tx_hash[2:]], [tx['params']['txHash'] for tx in transactions])
+
+    def test_seal_logged_tx_only(self):
+        block_manager = self.start()
+
+        async def _run():
+            block_manager.add_tx(tx_hash='a', tx={'nonce': '0x1'})
+            # transaction being written to transaction log is left in queue
+            tx_list = block_manager.clear_tx()
+            await block_manager.tx_log.sync()
+            return tx_list
+
+        self.assertEqual([], self.loop.run_until_complete(_run()))
+        self.assertEqual(['a'], [tx['txHash'] for tx in block_manager.clear_tx()])
+        self.assertEqual([], block_manager.tx_queue)
+
+    def test_instant_seal(self):
+        self.conf[ConfigKey.BLOCK_INSTANT_SEAL] = True
+        block_manager = self.start()
+        blocks = block_manager.icon_stub.async_task().blocks
+        # genesis block
+        self.assertEqual(1, len(blocks))
+
+        # block including the transaction is confirmed before response
+        code, tx_hash = self.create_icx_tx(block_manager, {'nonce': '0x1'})
+        self.assertEqual(message_code.Response.success, code)
+        self.assertEqual(2, len(blocks))
+        self.assertEqual([tx_hash[2:]], [tx['params']['txHash'] for tx in blocks[-1]['transactions']])
+        self.assertEqual([], block_manager.tx_queue)
+
+        # transactions arriving together are sealed in one block
+        async def _run():
+            task = ChannelInnerTask(conf=self.conf, block_manager=block_manager)
+            return await asyncio.gather(*[task.create_icx_tx({'nonce': hex(i)}) for i in range(2, 5)])
+
+        responses = self.loop.run_until_complete(_run())
+        self.assertEqual([message_code.Response.success] * 3, [code for code, _ in responses])
+        self.assertEqual(3, len(blocks))
+        self.assertEqual(sorted(tx_hash[2:] for _, tx_hash in responses),
+                         sorted(tx['params']['txHash'] for tx in blocks[-1]['transactions']))
+
+    def test_channels_isolated(self):
+        self.conf[ConfigKey.CHANNELS] = ['test1']
+        host = BlockManagerHost(conf=self.conf)
+        default, test1 = [self.start(block_manager) for block_manager in host.block_managers.values()]
+
+        # each channel is invoked by iconservice of the channel
+        amqp_key = self.conf[ConfigKey.AMQP_KEY]
+        self.assertEqual(ICON_SCORE_QUEUE_NAME_FORMAT.format(channel_name='loopchain_default', amqp_key=amqp_key),
+                         default.icon_stub.route_key)
+        self.assertEqual(ICON_SCORE_QUEUE_NAME_FORMAT.format(channel_name='test1', amqp_key=amqp_key),
+                         test1.icon_stub.route_key)
+
+        _, tx_hash = self.create_icx_tx(default, {'nonce': '0x1'})
+        _, tx_hash1 = self.create_icx_tx(test1, {'nonce': '0x2'})
+        # the same transaction is not duplicated in other channel
+        code, tx_hash2 = self.create_icx_tx(test1, {'nonce': '0x1'})
+        self.assertEqual(message_code.Response.success, code)
+        self.assertEqual(tx_hash, tx_hash2)
+
+        self.loop.run_until_complete(default.process_block_data())
+        self.loop.run_until_complete(test1.process_block_data())
+
+        blocks = default.icon_stub.async_task().blocks
+        self.assertEqual([tx_hash[2:]], [tx['params']['txHash'] for tx in blocks[-1]['transactions']])
+        blocks = test1.icon_stub.async_task().blocks
+        self.assertEqual(sorted([tx_hash1[2:], tx_hash2[2:]]),
+                         sorted(tx['params']['txHash'] for tx in blocks[-1]['transactions']))
+
+        # block DBs of channels are separated
+        self.assertEqual(1, default.block.block_height)
+        self.assertEqual(1, test1.block.block_height)
+        self.assertIsNotNone(test1.block.get_txresult(tx_hash1[2:]))
+        self.assertIsNone(default.block.get_txresult(tx_hash1[2:]))
+        self.assertTrue(os.path.exists(os.path.join(BLOCK_MANAGER_PATH, '.statedb_test1', 'tbears')))
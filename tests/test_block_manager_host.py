@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import unittest
+
+from tbears.block_manager.block_manager import get_channels, make_channel_conf
+from tbears.config.tbears_config import ConfigKey, tbears_server_config
+
+
+class TestBlockManagerHost(unittest.TestCase):
+    def setUp(self):
+        self.conf = copy.deepcopy(tbears_server_config)
+
+    def test_get_channels(self):
+        self.assertEqual(['loopchain_default'], get_channels(self.conf))
+
+        self.conf[ConfigKey.CHANNELS] = ['test1', 'loopchain_default', 'test2', 'test1']
+        self.assertEqual(['loopchain_default', 'test1', 'test2'], get_channels(self.conf))
+
+        # embedded engines of channels would share class level state of iconservice
+        self.conf[ConfigKey.EMBEDDED_ENGINE] = True
+        self.assertRaises(ValueError, get_channels, self.conf)
+        self.conf[ConfigKey.CHANNELS] = ['loopchain_default']
+        self.assertEqual(['loopchain_default'], get_channels(self.conf))
+
+        # channel names are used for message queue names and directories
+        self.conf[ConfigKey.EMBEDDED_ENGINE] = False
+        for channel in ['../test1', 'test/1', '', 'test 1', 1]:
+            self.conf[ConfigKey.CHANNELS] = [channel]
+            self.assertRaises(ValueError, get_channels, self.conf)
+
+    def test_make_channel_conf(self):
+        # default channel keeps the paths of single channel mode
+        conf = make_channel_conf(self.conf, 'loopchain_default')
+        self.assertEqual(self.conf, conf)
+        self.assertIsNot(self.conf, conf)
+
+        conf = make_channel_conf(self.conf, 'test1')
+        self.assertEqual('test1', conf[ConfigKey.CHANNEL])
+        self.assertEqual('.statedb_test1', conf['stateDbRootPath'])
+        self.assertEqual('.score_test1', conf['scoreRootPath'])
+        self.assertEqual('.commit.sock.test1', conf[ConfigKey.COMMIT_NOTIFY_PATH])
+        self.assertEqual(self.conf[ConfigKey.AMQP_KEY], conf[ConfigKey.AMQP_KEY])
+        self.assertEqual('loopchain_default', self.conf[ConfigKey.CHANNEL])
+
+        # commit notifier disabled
+        self.conf[ConfigKey.COMMIT_NOTIFY_PATH] = ''
+        conf = make_channel_conf(self.conf, 'test1')
+        self.assertEqual('', conf[ConfigKey.COMMIT_NOTIFY_PATH])
+
+        # channel named after a DB of the default channel doesn't collide with it
+        conf = make_channel_conf(self.conf, 'tbears')
+        self.assertEqual('.statedb_tbears', conf['stateDbRootPath'])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from secp256k1 import PrivateKey
+
+from tbears.libs.bulk_signer import sign_transactions
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.icx_signer import IcxSigner
+
+
+def make_params(count: int):
+    for i in range(count):
+        yield {
+            "version": "0x3",
+            "to": "hx0000000000000000000000000000000000000001",
+            "value": hex(i),
+            "stepLimit": "0x3000000",
+            "timestamp": "0x5733b5c4ebb40",
+            "nid": "0x3",
+            "nonce": hex(i)
+        }
+
+
+class TestBulkSigner(unittest.TestCase):
+    def setUp(self):
+        self.signer = IcxSigner(PrivateKey().private_key)
+        self.sender = IconJsonrpc(self.signer)
+
+    def test_sign_transactions(self):
+        # signatures are the same as the ones made one by one
+        expected = [self.sender.sendTransaction(**{'to': params['to'], 'value': params['value'],
+                                                   'timestamp': params['timestamp'], 'nonce': params['nonce']})
+                    for params in make_params(10)]
+
+        for workers in (1, 2):
+            requests = list(sign_transactions(self.signer, make_params(10), workers=workers, chunk_size=3))
+
+            self.assertEqual(10, len(requests))
+            for request, expected_request in zip(requests, expected):
+                self.assertEqual('icx_sendTransaction', request['method'])
+                self.assertEqual(self.sender.address, request['params']['from'])
+                self.assertEqual(expected_request['params'], request['params'])
+
+            # request ids are increasing in the order of params
+            ids = [request['id'] for request in requests]
+            self.assertEqual(sorted(ids), ids)
+
+    def test_stream(self):
+        consumed = []
+
+        def _params():
+            for params in make_params(100):
+                consumed.append(params)
+                yield params
+
+        requests = sign_transactions(self.signer, _params(), workers=2, chunk_size=10)
+        next(requests)
+        # params are consumed lazily. only chunks in flight are read
+        self.assertLess(len(consumed), 100)
+        self.assertEqual(99, len(list(requests)))
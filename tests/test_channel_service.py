@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from tbears.block_manager import message_code
+from tbears.block_manager.channel_service import ChannelInnerTask
+from tbears.block_manager.mq_metrics import MqMetrics
+from tbears.block_manager.tx_status import TxStatusTracker
+
+
+class MockBlock(object):
+    def __init__(self):
+        self.transactions = {}
+        self.txresults = {}
+
+    def get_transaction(self, tx_hash: str):
+        return self.transactions.get(tx_hash)
+
+    def get_txresult(self, tx_hash: str):
+        return self.txresults.get(tx_hash)
+
+
+class MockBlockManager(object):
+    def __init__(self):
+        self.block = MockBlock()
+        self.tx_status = TxStatusTracker()
+        self.metrics = MqMetrics()
+
+
+class TestChannelInnerTask(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.block_manager = MockBlockManager()
+        self.task = ChannelInnerTask(conf={}, block_manager=self.block_manager)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def get_invoke_result(self, tx_hash: str):
+        return self.loop.run_until_complete(self.task.get_invoke_result(tx_hash))
+
+    def get_tx_info(self, tx_hash: str):
+        return self.loop.run_until_complete(self.task.get_tx_info(tx_hash))
+
+    def test_get_invoke_result(self):
+        # pending transaction
+        self.block_manager.tx_status.enqueue('a')
+        code, status = self.get_invoke_result('a')
+        self.assertEqual(message_code.Response.fail_tx_not_invoked, code)
+        self.assertEqual('pending', status['status'])
+
+        # committed transaction is answered from DB
+        self.block_manager.tx_status.seal(['a'])
+        self.block_manager.tx_status.commit(['a'], block_height=1)
+        self.block_manager.block.txresults['a'] = {'txHash': 'a', 'status': '0x1'}
+        code, result = self.get_invoke_result('a')
+        self.assertEqual(message_code.Response.success, code)
+        self.assertEqual('a', result['txHash'])
+
+        # unknown transaction must be an error for iconrpcserver
+        code, result = self.get_invoke_result('unknown')
+        self.assertEqual(message_code.Response.fail_invalid_key_error, code)
+        self.assertEqual({}, result)
+
+    def test_get_tx_info(self):
+        tx_status = self.block_manager.tx_status
+
+        # transactions not written to DB are answered from memory with lifecycle state
+        tx_status.enqueue('a', {'nonce': '0x1', 'txHash': 'a'})
+        code, tx_info = self.get_tx_info('a')
+        self.assertEqual(message_code.Response.success, code)
+        self.assertEqual('0x1', tx_info['transaction']['nonce'])
+        self.assertEqual('pending', tx_info['transaction']['txStatus']['status'])
+        self.assertIsNone(tx_info['block_height'])
+
+        tx_status.seal(['a'])
+        code, tx_info = self.get_tx_info('a')
+        self.assertEqual('invoking', tx_info['transaction']['txStatus']['status'])
+        self.assertIn('sealed', tx_info['transaction']['txStatus'])
+
+        # committed transaction is answered from DB
+        tx_status.commit(['a'], block_height=1)
+        self.block_manager.block.transactions['a'] = {'transaction': {'nonce': '0x1', 'txHash': 'a'},
+                                                      'tx_index': '0x0', 'block_height': '0x1', 'block_hash': '0xb'}
+        code, tx_info = self.get_tx_info('a')
+        self.assertEqual(message_code.Response.success, code)
+        self.assertEqual('0x1', tx_info['block_height'])
+        self.assertEqual('committed', tx_info['transaction']['txStatus']['status'])
+        self.assertIn('committed', tx_info['transaction']['txStatus'])
+
+        # DB answers after the state is forgotten
+        tx_status.remove(['a'])
+        code, tx_info = self.get_tx_info('a')
+        self.assertEqual({'status': 'committed', 'blockHeight': '0x1'}, tx_info['transaction']['txStatus'])
+
+        # unknown transaction must be an error for iconrpcserver
+        code, tx_info = self.get_tx_info('unknown')
+        self.assertEqual(message_code.Response.fail_invalid_key_error, code)
+
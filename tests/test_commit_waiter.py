@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+import socket
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError
+
+from tbears.block_manager.commit_notifier import CommitNotifier, resolve_commit_notify_path
+from tbears.libs.commit_waiter import CommitWaiter
+
+DIRECTORY_PATH = os.path.abspath((os.path.dirname(__file__)))
+SOCKET_PATH = os.path.join(DIRECTORY_PATH, '.commit_waiter.sock')
+
+
+class TestCommitWaiter(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.notifier = CommitNotifier(path=SOCKET_PATH)
+        self.loop.run_until_complete(self.notifier.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.notifier.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def publish(self, height: int, tx_results: dict):
+        event = CommitNotifier.make_event(block_height=height, block_hash='ab' * 32, timestamp=0,
+                                          tx_results=tx_results)
+        self.loop.call_soon_threadsafe(self.notifier.publish, event)
+
+    def wait_subscribers(self, count: int):
+        while self.notifier.subscriber_count != count:
+            time.sleep(0.01)
+
+    def test_wait(self):
+        with CommitWaiter(path=SOCKET_PATH) as waiter:
+            self.assertTrue(waiter.connected)
+            self.wait_subscribers(1)
+
+            future = waiter.future('0x' + '1' * 64)
+            self.publish(1, {'1' * 64: {'status': '0x1', 'scoreAddress': 'cx' + '0' * 40, 'txHash': '0x'}})
+            result = future.result(timeout=5)
+            self.assertEqual('0x1', result['status'])
+            self.assertEqual('cx' + '0' * 40, result['scoreAddress'])
+            self.assertEqual(1, result['blockHeight'])
+
+            # result committed before registration is remembered
+            self.publish(2, {'2' * 64: {'status': '0x0', 'failure': {'message': 'fail'}}})
+            while waiter.last_block_height != 2:
+                time.sleep(0.01)
+            result = waiter.wait('2' * 64, timeout=5)
+            self.assertEqual('0x0', result['status'])
+
+            results = waiter.wait_all(['1' * 64, '0x' + '2' * 64], timeout=5)
+            self.assertEqual(2, len(results))
+
+            self.assertRaises(TimeoutError, waiter.wait, '3' * 64, 0.1)
+
+    def test_not_connected(self):
+        waiter = CommitWaiter(path=SOCKET_PATH + '.invalid')
+        self.assertFalse(waiter.connect())
+        self.assertRaises(ConnectionError, waiter.wait, '1' * 64, 1)
+
+    def test_cancelled_future(self):
+        with CommitWaiter(path=SOCKET_PATH) as waiter:
+            self.wait_subscribers(1)
+
+            cancelled = waiter.future('1' * 64)
+            self.assertTrue(cancelled.cancel())
+            future = waiter.future('2' * 64)
+
+            # cancelled future doesn't stop receiving events for others
+            self.publish(1, {'1' * 64: {'status': '0x1'}, '2' * 64: {'status': '0x1'}})
+            self.assertEqual(1, future.result(timeout=5)['blockHeight'])
+            self.assertTrue(waiter.connected)
+            self.assertTrue(cancelled.cancelled())
+
+            # new future is made for the hash of cancelled one
+            self.assertEqual('0x1', waiter.wait('1' * 64, timeout=5)['status'])
+
+    def test_socket_in_use(self):
+        # socket of running notifier is not removed by another one
+        loop = asyncio.new_event_loop()
+        notifier = CommitNotifier(path=SOCKET_PATH)
+        self.assertRaises(FileExistsError, loop.run_until_complete, notifier.start())
+        loop.close()
+        self.assertTrue(os.path.exists(SOCKET_PATH))
+
+    def test_resolve_commit_notify_path(self):
+        conf = {'stateDbRootPath': './.statedb', 'commitNotifyPath': '.commit.sock'}
+        self.assertEqual(os.path.abspath('./.statedb/.commit.sock'), resolve_commit_notify_path(conf))
+
+        conf['commitNotifyPath'] = '/tmp/commit.sock'
+        self.assertEqual('/tmp/commit.sock', resolve_commit_notify_path(conf))
+
+        conf['commitNotifyPath'] = ''
+        self.assertIsNone(resolve_commit_notify_path(conf))
+
+
+class TestCommitNotifier(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+
+    def test_remove_stale_socket(self):
+        # socket file left by killed service
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(SOCKET_PATH)
+        sock.close()
+
+        notifier = CommitNotifier(path=SOCKET_PATH)
+        self.loop.run_until_complete(notifier.start())
+        notifier.close()
+        self.assertFalse(os.path.exists(SOCKET_PATH))
+
+    def test_not_socket(self):
+        with open(SOCKET_PATH, 'w') as f:
+            f.write('data')
+
+        notifier = CommitNotifier(path=SOCKET_PATH)
+        self.assertRaises(FileExistsError, self.loop.run_until_complete, notifier.start())
+        with open(SOCKET_PATH) as f:
+            self.assertEqual('data', f.read())
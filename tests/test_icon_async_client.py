@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest.mock import patch
+
+from tbears.libs.icon_async_client import AsyncIconClient, aiohttp
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.tbears_exception import IconClientException
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    @classmethod
+    def count_in_flight(cls):
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.in_flight -= 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if request['method'] == 'slow':
+            time.sleep(1)
+        else:
+            self.count_in_flight()
+        body = json.dumps({'jsonrpc': '2.0', 'result': request['method'], 'id': request['id']}).encode()
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class _StandInWaiter(object):
+    def __init__(self):
+        self.futures = {}
+
+    def future(self, tx_hash: str) -> 'Future':
+        return self.futures.setdefault(tx_hash, Future())
+
+
+class _StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncIconClient(unittest.TestCase):
+    def setUp(self):
+        _StandInHandler.max_in_flight = 0
+        self.server = _StandInServer(('127.0.0.1', 0), _StandInHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.uri = f'http://127.0.0.1:{self.server.server_address[1]}/api/v3'
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_concurrency(self):
+        async def _run():
+            async with AsyncIconClient(self.uri, max_concurrency=4) as client:
+                requests = [IconJsonrpc.getTotalSupply() for _ in range(20)]
+                return requests, await asyncio.gather(*[client.send(request) for request in requests])
+
+        requests, responses = self.loop.run_until_complete(_run())
+        self.assertEqual([request['id'] for request in requests], [response['id'] for response in responses])
+        self.assertEqual(4, _StandInHandler.max_in_flight)
+
+    def test_cancel(self):
+        async def _run():
+            async with AsyncIconClient(self.uri, max_concurrency=1, timeout=(1, 5)) as client:
+                task = asyncio.ensure_future(client.send({'jsonrpc': '2.0', 'method': 'slow', 'id': 1}))
+                await asyncio.sleep(0.1)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+                # cancelled request released the semaphore
+                return await asyncio.wait_for(client.send(IconJsonrpc.getTotalSupply()), timeout=0.5)
+
+        response = self.loop.run_until_complete(_run())
+        self.assertEqual('icx_getTotalSupply', response['result'])
+
+    def test_timeout(self):
+        async def _run():
+            async with AsyncIconClient(self.uri, timeout=(1, 0.1)) as client:
+                await client.send({'jsonrpc': '2.0', 'method': 'slow', 'id': 1})
+
+        self.assertRaises(IconClientException, self.loop.run_until_complete, _run())
+
+    def test_send_transaction_wait_timeout(self):
+        waiter = _StandInWaiter()
+
+        async def _run():
+            async with AsyncIconClient(self.uri) as client:
+                request = {'jsonrpc': '2.0', 'method': 'icx_sendTransaction', 'id': 1}
+                return await client.send_transaction(request, waiter=waiter, timeout=0.1)
+
+        response = self.loop.run_until_complete(_run())
+        self.assertEqual('icx_getTransactionResult', response['result'])
+
+        # timeout doesn't cancel the future shared with other waiters of the transaction
+        future = waiter.futures['icx_sendTransaction']
+        self.assertFalse(future.cancelled())
+        future.set_result({'status': '0x1'})
+
+    @patch('tbears.libs.icon_async_client.DEFAULT_WAIT_RESULT_TIMEOUT', 0.1)
+    def test_send_transaction_default_timeout(self):
+        waiter = _StandInWaiter()
+
+        async def _run():
+            async with AsyncIconClient(self.uri) as client:
+                request = {'jsonrpc': '2.0', 'method': 'icx_sendTransaction', 'id': 1}
+                return await client.send_transaction(request, waiter=waiter)
+
+        # doesn't wait forever for commit notification which never comes
+        response = self.loop.run_until_complete(asyncio.wait_for(_run(), timeout=5))
+        self.assertEqual('icx_getTransactionResult', response['result'])
@@ -12,17 +12,25 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
 import shutil
+import threading
+import time
 import unittest
 import os
 import socket
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
 
 from iconcommons.icon_config import IconConfig
 
 from tbears.command.command import Command
-from tbears.libs.icon_jsonrpc import IconClient
+from tbears.libs.hex_content import HexContent
+from tbears.libs.icon_jsonrpc import IconClient, IconJsonrpc, IconJsonrpcBatch, get_icon_client, is_pending_result, \
+    make_request_body
 from tbears.config.tbears_config import tbears_server_config
 from tbears.tbears_exception import IconClientException
+from tbears.util.json_codec import dumps
 from tests.test_util import TEST_UTIL_DIRECTORY
 
 
@@ -102,3 +110,167 @@ class TestIconClient(unittest.TestCase):
         self.assertRaises(Exception, client.send, payload)
 
         self.cmd.cmdScore.clear(self.conf)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    connections = set()
+    batch_sizes = []
+    polls = {}
+    bodies = []
+
+    @classmethod
+    def make_response(cls, request: dict) -> dict:
+        if request['method'] == 'slow':
+            time.sleep(0.5)
+        if request['method'] == 'icx_getTransactionResult':
+            # transaction '0x<n>' is committed at n-th poll
+            tx_hash = request['params']['txHash']
+            cls.polls[tx_hash] = cls.polls.get(tx_hash, 0) + 1
+            if cls.polls[tx_hash] < int(tx_hash, 16):
+                return {'jsonrpc': '2.0', 'error': {'code': -32602, 'message': 'Pending transaction'},
+                        'id': request['id']}
+            return {'jsonrpc': '2.0', 'result': {'txHash': tx_hash, 'status': '0x1'}, 'id': request['id']}
+        return {'jsonrpc': '2.0', 'result': request.get('params', {}).get('address', '0x1'), 'id': request['id']}
+
+    def do_POST(self):
+        self.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.bodies.append(body)
+        request = json.loads(body)
+        if isinstance(request, list):
+            self.batch_sizes.append(len(request))
+            # responses of batch request may be in any order. no response for 'drop'
+            response = [self.make_response(item) for item in reversed(request) if item['method'] != 'drop']
+        else:
+            response = self.make_response(request)
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TestIconClientPool(unittest.TestCase):
+    def setUp(self):
+        _StandInHandler.connections.clear()
+        _StandInHandler.batch_sizes.clear()
+        _StandInHandler.polls.clear()
+        _StandInHandler.bodies.clear()
+        self.server = _StandInServer(('127.0.0.1', 0), _StandInHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.uri = f'http://127.0.0.1:{self.server.server_address[1]}/api/v3'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive(self):
+        with IconClient(self.uri) as client:
+            for i in range(5):
+                response = client.send({"jsonrpc": "2.0", "method": "icx_getTotalSupply", "id": i})
+                self.assertEqual(i, response['id'])
+
+        # all requests are sent through one connection
+        self.assertEqual(1, len(_StandInHandler.connections))
+
+    def test_timeout(self):
+        with IconClient(self.uri, timeout=(1, 0.1)) as client:
+            self.assertRaises(IconClientException, client.send, {"jsonrpc": "2.0", "method": "slow", "id": 1})
+
+    def test_send_hex_content(self):
+        data = os.urandom(300 * 1024)
+        request = IconJsonrpc.from_string('hx' + '1' * 40).sendTransaction(
+            to=f'cx{"0" * 40}', timestamp='0x1', data_type='deploy',
+            data=IconJsonrpc.gen_deploy_data(content=HexContent(memoryview(data)), params={'name': 'test'}))
+        expected = {**request, 'params': {**request['params'], 'data': {**request['params']['data'],
+                                                                           'content': f'0x{data.hex()}'}}}
+
+        body = make_request_body(request)
+        self.assertEqual(len(dumps(expected)), len(body))
+        self.assertEqual(expected, json.loads(b''.join(body)))
+        # body can be sent again
+        self.assertEqual(expected, json.loads(b''.join(body)))
+
+        with IconClient(self.uri) as client:
+            response = client.send(request)
+            self.assertEqual(request['id'], response['id'])
+            # streamed with Content-Length
+            self.assertEqual(expected, json.loads(_StandInHandler.bodies[-1]))
+
+            # batch request encodes content at once
+            client.send_batch([request])
+            self.assertEqual([expected], json.loads(_StandInHandler.bodies[-1]))
+
+    def test_shared_client(self):
+        client = get_icon_client(self.uri)
+        self.assertIs(client, get_icon_client(self.uri))
+        self.assertIsNot(client, get_icon_client('http://127.0.0.1:9000/api/v3'))
+
+    def test_send_batch(self):
+        addresses = [f'hx{i:040x}' for i in range(250)]
+        batch = IconJsonrpcBatch()
+        for address in addresses:
+            batch.add(IconJsonrpc.getBalance(address))
+        drop_index = batch.add({"jsonrpc": "2.0", "method": "drop", "id": "drop"})
+
+        with IconClient(self.uri) as client:
+            responses = batch.send(client)
+
+            # responses are matched by id
+            self.assertEqual(addresses, [response['result'] for response in responses[:drop_index]])
+            self.assertEqual(-32603, responses[drop_index]['error']['code'])
+            self.assertEqual([100, 100, 51], _StandInHandler.batch_sizes)
+
+            # split by size
+            _StandInHandler.batch_sizes.clear()
+            client.send_batch(batch.requests[:10], max_batch_bytes=300)
+            self.assertTrue(all(size <= 3 for size in _StandInHandler.batch_sizes))
+            self.assertEqual(10, sum(_StandInHandler.batch_sizes))
+
+            duplicated = [{"jsonrpc": "2.0", "method": "icx_getTotalSupply", "id": 1}] * 2
+            self.assertRaises(ValueError, client.send_batch, duplicated)
+
+    def test_wait_for_result(self):
+        with IconClient(self.uri) as client:
+            results = client.wait_for_result(['0x1', '0x3', '0x4', '0x3'], interval=0.01)
+            self.assertEqual(['0x1', '0x3', '0x4'], list(results))
+            self.assertTrue(all(result['result']['status'] == '0x1' for result in results.values()))
+
+            # committed transactions are not polled any more
+            self.assertEqual({'0x1': 1, '0x3': 3, '0x4': 4}, _StandInHandler.polls)
+            # pending transactions are polled in one batch request. the last one is polled alone
+            self.assertEqual([3, 2, 2], _StandInHandler.batch_sizes)
+
+            # timeout
+            results = client.wait_for_result(['0x2', '0x64'], timeout=0.1, interval=0.01)
+            self.assertEqual('0x1', results['0x2']['result']['status'])
+            self.assertTrue(is_pending_result(results['0x64']))
+
+    def test_send_transaction(self):
+        # stand-in server returns 'address' param as transaction hash
+        request = {'jsonrpc': '2.0', 'method': 'icx_sendTransaction', 'id': 1, 'params': {'address': '0x3'}}
+        with IconClient(self.uri) as client:
+            # does not wait by default
+            response = client.send_transaction(request)
+            self.assertTrue(is_pending_result(response))
+            self.assertEqual(1, _StandInHandler.polls['0x3'])
+
+            response = client.send_transaction(request, wait_result=True)
+            self.assertEqual('0x1', response['result']['status'])
+            self.assertEqual(3, _StandInHandler.polls['0x3'])
+
+    def test_is_pending_result(self):
+        self.assertTrue(is_pending_result({'error': {'code': -111, 'message': 'Pending transaction'}}))
+        self.assertTrue(is_pending_result({'error': {'code': -32602, 'message': 'Pending transaction'}}))
+        self.assertFalse(is_pending_result({'error': {'code': -32602, 'message': 'Invalid params txHash'}}))
+        self.assertFalse(is_pending_result({'error': {'code': -32000, 'message': 'Pending transaction'}}))
+        self.assertFalse(is_pending_result({'result': {'status': '0x1'}}))
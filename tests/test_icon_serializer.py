@@ -15,10 +15,55 @@
 import copy
 import hashlib
 import json
+import random
+import tracemalloc
 import unittest
 
 import tbears.libs.icon_serializer
-from tbears.libs.icon_serializer import generate_origin_for_icx_send_tx_hash
+from tbears.libs.hex_content import HexContent
+from tbears.libs.icon_serializer import generate_origin_for_icx_send_tx_hash, generate_hash_for_icx_send_tx, translator
+
+
+def legacy_generate_origin_for_icx_send_tx_hash(icx_origin_data):
+    # previous implementation using deepcopy and recursive generators. new one must have same results
+    def encode(data):
+        if isinstance(data, dict):
+            return "{" + ".".join(encode_dict(data)) + "}"
+        elif isinstance(data, list):
+            return "[" + ".".join(encode(item) for item in data) + "]"
+        elif data is None:
+            return "\\0"
+        return str(data).translate(translator)
+
+    def encode_dict(data: dict):
+        for key in sorted(data.keys()):
+            yield key
+            yield encode(data[key])
+
+    copy_tx = copy.deepcopy(icx_origin_data)
+    tx_hash_key = "txHash" if copy_tx.get('version') == hex(3) else "tx_hash"
+    for key in (tx_hash_key, 'method', 'signature'):
+        if key in copy_tx:
+            del copy_tx[key]
+
+    return f"icx_sendTransaction.{'.'.join(encode_dict(copy_tx))}"
+
+
+def make_random_data(depth: int = 0):
+    kind = random.randrange(8 if depth < 4 else 5)
+    if kind == 0:
+        return None
+    elif kind == 1:
+        return hex(random.getrandbits(64))
+    elif kind == 2:
+        return ''.join(random.choice('ab.{}[]\\01 가') for _ in range(random.randrange(6)))
+    elif kind == 3:
+        return random.choice([0, -1, 12345, True, False, 1.5])
+    elif kind == 4:
+        return random.choice(['', 'call', '0x', '2.21'])
+    elif kind == 5:
+        return [make_random_data(depth + 1) for _ in range(random.randrange(4))]
+    return {f'k{random.randrange(10)}.{i}': make_random_data(depth + 1) for i in range(random.randrange(4))}
 
 
 class TestTXPhrase(unittest.TestCase):
@@ -260,3 +305,79 @@ class TestTXPhrase(unittest.TestCase):
         result_new_hash = hashlib.sha3_256(origin.encode()).hexdigest()
         result_old_hash = generate_icx_hash(question, "tx_hash")
         self.assertEqual(result_new_hash, result_old_hash)
+
+    def test_serialize_same_as_legacy(self):
+        random.seed(20181019)
+        for _ in range(500):
+            question = {
+                "version": random.choice(["0x3", "0x2"]),
+                "from": "hxbe258ceb872e08851f1f59694dac2558708ece11",
+                "txHash": "0x1234",
+                "tx_hash": "0x5678",
+                "method": "icx_sendTransaction",
+                "signature": "VAia7YZ2Ji6igKWzjR2YsGa2m53nKPrfK7uXYW78QLE+ATehAVZPC40szvAiA6NEU5gCYB4c4qaQzqDh2ugcHgA=",
+                "data": make_random_data()
+            }
+            original = copy.deepcopy(question)
+
+            self.assertEqual(legacy_generate_origin_for_icx_send_tx_hash(question),
+                             generate_origin_for_icx_send_tx_hash(question))
+            # params are not changed
+            self.assertEqual(original, question)
+
+        # deploy content
+        question = {"version": "0x3", "dataType": "deploy",
+                    "data": {"contentType": "application/zip", "content": f"0x{bytes(range(256)).hex() * 100}",
+                             "params": {}}}
+        self.assertEqual(legacy_generate_origin_for_icx_send_tx_hash(question),
+                         generate_origin_for_icx_send_tx_hash(question))
+
+    def test_hash_same_as_origin_hash(self):
+        random.seed(20181020)
+        for _ in range(200):
+            question = {"version": "0x3", "signature": "sig", "data": make_random_data()}
+            expected = hashlib.sha3_256(generate_origin_for_icx_send_tx_hash(question).encode()).digest()
+            # small chunk size splits strings and escape sequences
+            self.assertEqual(expected, generate_hash_for_icx_send_tx(question, chunk_size=3))
+            self.assertEqual(expected, generate_hash_for_icx_send_tx(question))
+
+        # large content with characters to escape and multi-byte characters
+        question = {"version": "0x3", "data": {"content": "0x.{}가" * 100000}}
+        expected = hashlib.sha3_256(generate_origin_for_icx_send_tx_hash(question).encode()).digest()
+        self.assertEqual(expected, generate_hash_for_icx_send_tx(question))
+
+    def test_hash_memory(self):
+        # 8MB deploy content. memory for hashing doesn't depend on content size
+        question = {"version": "0x3", "dataType": "deploy",
+                    "data": {"contentType": "application/zip", "content": f"0x{'ab' * 4 * 1024 * 1024}"}}
+
+        tracemalloc.start()
+        try:
+            generate_hash_for_icx_send_tx(question)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_hash_hex_content(self):
+        data = bytes(range(256)) * 1000
+        question = {"version": "0x3", "dataType": "deploy",
+                    "data": {"contentType": "application/zip", "content": f"0x{data.hex()}", "params": {}}}
+        expected = generate_hash_for_icx_send_tx(question)
+
+        question['data']['content'] = HexContent(memoryview(data))
+        self.assertEqual(expected, generate_hash_for_icx_send_tx(question))
+        self.assertEqual(expected, generate_hash_for_icx_send_tx(question, chunk_size=100))
+        self.assertEqual(expected, hashlib.sha3_256(generate_origin_for_icx_send_tx_hash(question).encode()).digest())
+
+        # hex string of content isn't made at once
+        question['data']['content'] = HexContent(bytes(8 * 1024 * 1024))
+        tracemalloc.start()
+        try:
+            generate_hash_for_icx_send_tx(question)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 1024 * 1024)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from earlgrey import MessageQueueService
+from iconservice.icon_inner_service import IconScoreInnerTask
+
+from tbears.block_manager.icon_service import EmbeddedIconStub
+from tbears.config.tbears_config import ConfigKey
+
+DIRECTORY_PATH = os.path.abspath((os.path.dirname(__file__)))
+EMBEDDED_PATH = os.path.join(DIRECTORY_PATH, '.embedded')
+
+
+class TestEmbeddedIconStub(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        conf = {
+            'scoreRootPath': os.path.join(EMBEDDED_PATH, '.score'),
+            'stateDbRootPath': os.path.join(EMBEDDED_PATH, '.statedb'),
+            ConfigKey.QUERY_CACHE_SIZE: 2
+        }
+        self.stub = EmbeddedIconStub(amqp_target='127.0.0.1', route_key='test_embedded', conf=conf)
+        self.requests = []
+
+    def tearDown(self):
+        self.stub.close()
+        self.loop.close()
+        shutil.rmtree(EMBEDDED_PATH, ignore_errors=True)
+
+    def test_query_cache(self):
+        # queries from iconrpcserver are answered through query proxy of embedded engine
+        requests = self.requests
+
+        async def _query(task, request: dict):
+            requests.append(request)
+            return hex(len(requests))
+
+        with patch.object(IconScoreInnerTask, 'query', _query):
+            task = self.stub.async_task()
+            request = {'method': 'icx_getTotalSupply'}
+            first = self.loop.run_until_complete(task.query(request))
+            self.assertEqual(first, self.loop.run_until_complete(task.query(request)))
+            self.assertEqual(1, len(self.requests))
+
+            # new block invalidates cache
+            self.stub.query_proxy.invalidate(block_height=1)
+            self.assertNotEqual(first, self.loop.run_until_complete(task.query(request)))
+            self.assertEqual(2, len(self.requests))
+
+    def test_close(self):
+        task = self.stub.async_task()
+        with patch.object(MessageQueueService.loop, 'stop') as stop:
+            self.stub.close()
+            # 'close' message doesn't stop the event loop either
+            self.loop.run_until_complete(task.close())
+
+        # event loop is shared with block manager and other channels
+        stop.assert_not_called()
+        self.assertIsNone(task._icon_service_engine)
@@ -15,10 +15,12 @@
 import hashlib
 import os
 import shutil
+import tempfile
+import time
 import unittest
 import zipfile
 
-from tbears.libs.in_memory_zip import InMemoryZip
+from tbears.libs.in_memory_zip import InMemoryZip, ZipOptions, get_zip_report, is_excluded
 from tests.test_util import IN_MEMORY_ZIP_TEST_DIRECTORY
 
 
@@ -71,3 +73,69 @@ class TestInMemoryZip(unittest.TestCase):
 
         if os.path.exists('testt.zip'):
             os.remove('testt.zip')
+
+    def test_reproducible(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            # same files made in different order with different timestamps and permissions
+            projects = [os.path.join(tmp_dir, 'a', 'project'), os.path.join(tmp_dir, 'b', 'project')]
+            names = ['z.py', 'a.py', os.path.join('lib', 'm.py'), os.path.join('lib', 'b.py')]
+            for i, project in enumerate(projects):
+                os.makedirs(os.path.join(project, 'lib'))
+                for name in (names if i == 0 else reversed(names)):
+                    path = os.path.join(project, name)
+                    with open(path, mode='w') as file:
+                        file.write(name * 100)
+                    os.chmod(path, 0o600 if i == 0 else 0o755)
+                    os.utime(path, (time.time() - i * 3600, time.time() - i * 3600))
+
+            options = ZipOptions(reproducible=True)
+            zips = []
+            for project in projects:
+                mz = InMemoryZip()
+                mz.zip_in_memory(project, options)
+                zips.append(mz.data)
+            self.assertEqual(zips[0], zips[1])
+
+            # relative path makes the same zip
+            mz = InMemoryZip()
+            current = os.getcwd()
+            os.chdir(os.path.join(tmp_dir, 'a'))
+            try:
+                mz.zip_in_memory('project', options)
+            finally:
+                os.chdir(current)
+            self.assertEqual(zips[0], mz.data)
+
+            with zipfile.ZipFile(mz._in_memory) as zf:
+                infos = zf.infolist()
+            self.assertEqual(['project/a.py', 'project/lib/b.py', 'project/lib/m.py', 'project/z.py'],
+                             [info.filename for info in infos])
+            self.assertTrue(all(info.date_time == (1980, 1, 1, 0, 0, 0) for info in infos))
+
+            # compression level
+            mz = InMemoryZip()
+            mz.zip_in_memory(projects[0], ZipOptions(reproducible=True, compress_level=0, exclude=('lib',)))
+            with zipfile.ZipFile(mz._in_memory) as zf:
+                infos = zf.infolist()
+            self.assertEqual(['project/a.py', 'project/z.py'], [info.filename for info in infos])
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in infos))
+
+            report = get_zip_report(mz.buffer, top=1)
+            self.assertEqual(2, report['files'])
+            self.assertEqual(len(mz.data), report['zipSize'])
+            self.assertEqual(2 + 2 * len(mz.data), report['payloadSize'])
+            self.assertEqual(['project/a.py'], [entry['name'] for entry in report['largest']])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_exclude(self):
+        self.assertTrue(is_excluded('docs', ('docs',)))
+        self.assertTrue(is_excluded(os.path.join('lib', 'README.md'), ('*.md',)))
+        self.assertTrue(is_excluded(os.path.join('lib', 'fixtures', 'a.json'), ('lib/fixtures/*',)))
+        self.assertFalse(is_excluded(os.path.join('other', 'fixtures', 'a.json'), ('lib/fixtures/*',)))
+        self.assertFalse(is_excluded('main.py', ('*.md', 'docs')))
+
+        mz = InMemoryZip()
+        mz.zip_in_memory(IN_MEMORY_ZIP_TEST_DIRECTORY, ZipOptions(exclude=('test_a',)))
+        self.assertEqual([os.path.join(IN_MEMORY_ZIP_TEST_DIRECTORY, 'test_b')], zip_file_name_list(mz))
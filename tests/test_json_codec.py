@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import unittest
+
+from tbears.util import json_codec
+from tbears.util.json_codec import JsonCodec, get_codec, dumps_canonical
+
+TX = {
+    "version": "0x3",
+    "from": "hxe7af5fcfd8dfc67530a01a0e403882687528dfcb",
+    "to": "cx0000000000000000000000000000000000000000",
+    "stepLimit": "0x10000000",
+    "timestamp": "0x5733b5c4ebb40",
+    "nid": "0x3",
+    "signature": "VAia7YZ2Ji6igKWzjR2YsGa2m53nKPrfK7uXYW78QLE+ATehAVZPC40szvAiA6NEU5gCYB4c4qaQzqDh2ugcHgA=",
+    "dataType": "call",
+    "data": {"method": "transfer", "params": {"to": "hx1", "value": "0x1", "memo": "éé☃", "list": [1, 2.5]}}
+}
+
+
+class TestJsonCodec(unittest.TestCase):
+    def test_codecs(self):
+        names = ['json'] + (['orjson'] if json_codec.orjson is not None else [])
+        for name in names:
+            codec = get_codec(name)
+            self.assertEqual(codec.name, name)
+
+            data = codec.dumps(TX)
+            self.assertIsInstance(data, bytes)
+            # output of any codec can be parsed by the others
+            self.assertEqual(json.loads(data), TX)
+            self.assertEqual(codec.loads(data), TX)
+            self.assertEqual(codec.loads(data.decode()), TX)
+            self.assertEqual(codec.loads(JsonCodec().dumps(TX)), TX)
+
+            # integers out of 64 bits and non-string keys
+            self.assertEqual(codec.loads(codec.dumps({'value': 2 ** 100})), {'value': 2 ** 100})
+            self.assertEqual(codec.loads(codec.dumps([[-2 ** 64, 2 ** 64 - 1]])), [[-2 ** 64, 2 ** 64 - 1]])
+            self.assertEqual(codec.loads(b'{"a": [123456789012345678901234567890, 1e30]}'),
+                             {'a': [123456789012345678901234567890, 1e30]})
+            self.assertEqual(json.loads(codec.dumps({1: 'a'})), {'1': 'a'})
+
+            self.assertRaises(ValueError, codec.loads, b'{"broken')
+
+        self.assertRaises(ValueError, get_codec, 'pickle')
+
+    def test_dumps_canonical(self):
+        # bytes of hash are the same as before regardless of codec
+        self.assertEqual(dumps_canonical(TX), json.dumps(TX).encode())
+
+
+if __name__ == '__main__':
+    unittest.main()
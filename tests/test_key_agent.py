@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from tbears.libs import icon_jsonrpc
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.icx_signer import IcxSigner, key_from_key_store
+from tbears.libs.key_agent import KeyAgent, KeyAgentClient, AgentSigner, KEY_AGENT_PATH_ENV, has_agent_key
+from tbears.tbears_exception import KeyStoreException
+from tests.test_util import TEST_UTIL_DIRECTORY
+
+
+class TestKeyAgent(unittest.TestCase):
+    def setUp(self):
+        self.keystore = os.path.join(TEST_UTIL_DIRECTORY, 'test_keystore')
+        self.password = 'qwer1234%'
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'agent.sock')
+
+        self.agent = KeyAgent(self.path)
+        self.thread = threading.Thread(target=self.agent.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = KeyAgentClient(self.path)
+        while not self.client.ping():
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.agent.stop()
+        self.thread.join(5)
+        shutil.rmtree(self.directory)
+
+    def test_socket_permission(self):
+        mode = os.stat(self.path).st_mode
+        self.assertTrue(stat.S_ISSOCK(mode))
+        self.assertEqual(stat.S_IMODE(mode), 0o600)
+        self.assertTrue(self.client.is_trusted())
+
+        # passwords are not sent to the socket accessible to others
+        os.chmod(self.path, 0o666)
+        self.assertFalse(self.client.is_trusted())
+        self.assertRaises(KeyStoreException, self.client.add, self.keystore, self.password)
+
+    def test_sign(self):
+        signer = IcxSigner(key_from_key_store(self.keystore, self.password))
+        address = self.client.add(self.keystore, self.password)
+        self.assertEqual(address, f'hx{signer.address.hex()}')
+        self.assertEqual(self.client.list()[0]['address'], address)
+
+        agent_signer = AgentSigner.from_agent(self.keystore, self.client)
+        self.assertIsNotNone(agent_signer)
+        self.assertIsNone(agent_signer.private_key)
+        self.assertEqual(agent_signer.address, signer.address)
+
+        # requests signed by key agent are the same as the ones signed with decrypted key
+        params = {'to': 'hx0000000000000000000000000000000000000001', 'value': '0x1', 'timestamp': '0x5733b5c4ebb40'}
+        expected = IconJsonrpc(signer).sendTransaction(**params)
+        request = IconJsonrpc(agent_signer).sendTransaction(**params)
+        self.assertEqual(request['params'], expected['params'])
+
+        # keystore of other address is refused
+        self.assertRaises(KeyStoreException, self.client.sign, self.keystore, f'hx{"0" * 40}', b'\x00' * 32)
+
+        # wrong password
+        self.assertRaises(KeyStoreException, self.client.add, self.keystore, 'wrong password')
+
+    def test_ttl(self):
+        self.client.add(self.keystore, self.password, ttl=0.1)
+        time.sleep(0.2)
+        self.assertEqual(self.client.list(), [])
+        self.assertIsNone(AgentSigner.from_agent(self.keystore, self.client))
+        self.assertRaises(KeyStoreException, self.client.sign, self.keystore, 'hx', b'\x00' * 32)
+
+    def test_from_key_store(self):
+        with patch.dict(os.environ, {KEY_AGENT_PATH_ENV: self.path}):
+            self.assertFalse(has_agent_key(self.keystore))
+            self.assertRaises(KeyStoreException, IconJsonrpc.from_key_store, self.keystore)
+
+            self.client.add(self.keystore, self.password)
+            self.assertTrue(has_agent_key(self.keystore))
+
+            # keystore is not decrypted again
+            with patch.object(icon_jsonrpc, 'key_from_key_store') as decrypt:
+                sender = IconJsonrpc.from_key_store(self.keystore)
+                decrypt.assert_not_called()
+            self.assertEqual(sender.address, self.client.list()[0]['address'])
+
+    def test_remove(self):
+        self.client.add(self.keystore, self.password)
+        self.assertEqual(self.client.remove(self.keystore), 1)
+
+        # key agent without keys exits
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(self.client.ping())
+
+
+if __name__ == '__main__':
+    unittest.main()
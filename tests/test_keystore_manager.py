@@ -14,11 +14,12 @@
 # limitations under the License.
 
 import os
+import shutil
 import unittest
 import json
 
-from tbears.util.keystore_manager import make_key_store_content
-from tbears.libs.icx_signer import key_from_key_store
+from tbears.util.keystore_manager import make_key_store_content, make_key_store_contents, make_genesis_accounts
+from tbears.libs.icx_signer import key_from_key_store, IcxSigner
 from tbears.command.command_wallet import CommandWallet
 from tbears.tbears_exception import TBearsCommandException
 from tbears.command.command import Command
@@ -30,10 +31,13 @@ class TestKeyStoreManager(unittest.TestCase):
         self.parser = self.cmd.parser
         self.keystore_path = 'unit_test_keystore'
         self.keystore_password = 'qwer1234%'
+        self.keystore_dir = 'unit_test_keystores'
 
     def tearDown(self):
         if os.path.isfile(self.keystore_path):
             os.remove(self.keystore_path)
+        if os.path.isdir(self.keystore_dir):
+            shutil.rmtree(self.keystore_dir)
 
     def test_make_key_store_content(self):
         # make keystore file
@@ -47,6 +51,54 @@ class TestKeyStoreManager(unittest.TestCase):
 
         os.remove(self.keystore_path)
 
+    def test_make_key_store_contents(self):
+        for workers in (1, 2):
+            contents = list(make_key_store_contents(5, self.keystore_password, workers=workers))
+            self.assertEqual(len(contents), 5)
+            self.assertEqual(len(set(content['address'] for content in contents)), 5)
+
+            content = contents[-1]
+            with open(self.keystore_path, mode='wb') as ks:
+                ks.write(json.dumps(content).encode())
+            private_key = key_from_key_store(file_path=self.keystore_path, password=self.keystore_password)
+            self.assertEqual(f'hx{IcxSigner(private_key).address.hex()}', content['address'])
+            os.remove(self.keystore_path)
+
+        # unencrypted key file is read without password
+        content = next(make_key_store_contents(1))
+        self.assertNotIn('crypto', content)
+        with open(self.keystore_path, mode='wb') as ks:
+            ks.write(json.dumps(content).encode())
+        private_key = key_from_key_store(file_path=self.keystore_path, password=None)
+        self.assertEqual(f'hx{IcxSigner(private_key).address.hex()}', content['address'])
+
+        accounts = make_genesis_accounts([content['address']], '0x1')
+        self.assertEqual(accounts, [{'name': 'account0', 'address': content['address'], 'balance': '0x1'}])
+
+    def test_make_keystores(self):
+        cmd = f'keystore --out-dir {self.keystore_dir} --count 3 --unencrypted --balance 0x10'
+        conf = self.cmd.cmdWallet.get_icon_conf('keystore', vars(self.parser.parse_args(cmd.split())))
+        addresses = self.cmd.cmdWallet.keystore(conf)
+        self.assertEqual(len(addresses), 3)
+
+        for i, address in enumerate(addresses):
+            path = os.path.join(self.keystore_dir, f'keystore_{i}')
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            private_key = key_from_key_store(file_path=path, password=None)
+            self.assertEqual(f'hx{IcxSigner(private_key).address.hex()}', address)
+
+        with open(os.path.join(self.keystore_dir, 'genesis_accounts.json')) as file:
+            accounts = json.load(file)['accounts']
+        self.assertEqual([account['address'] for account in accounts], addresses)
+        self.assertEqual({account['balance'] for account in accounts}, {'0x10'})
+
+        # existing keystore files are not overwritten
+        self.assertRaises(TBearsCommandException, self.cmd.cmdWallet.keystore, conf)
+
+        # both of path and out directory
+        cmd = f'keystore {self.keystore_path} --out-dir {self.keystore_dir}'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
     def test_validate_password(self):
         # Invalid password (password length is more than 8)
         invalid_password = 'qwe123!'
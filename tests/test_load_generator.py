@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+import unittest
+
+from tbears.libs.load_generator import LoadGenerator, RateLimiter, percentile, summarize_latencies
+
+
+class MockClient(object):
+    """Accept transactions and commit them after commit_delay. Transactions of 'error' method are rejected"""
+    def __init__(self, commit_delay: float = 0.05):
+        self.commit_delay = commit_delay
+        self.sent = {}
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def send(self, request: dict) -> dict:
+        if request['method'] == 'error':
+            return {'jsonrpc': '2.0', 'error': {'code': -32600, 'message': 'Out of balance'}, 'id': request['id']}
+
+        tx_hash = f"0x{request['params']['nonce'][2:]:0>64}"
+        with self.lock:
+            self.sent[tx_hash] = time.monotonic()
+        return {'jsonrpc': '2.0', 'result': tx_hash, 'id': request['id']}
+
+    def get_transaction_results(self, tx_hashes: list) -> list:
+        self.batch_sizes.append(len(tx_hashes))
+        now = time.monotonic()
+        return [{'result': {'status': '0x1'}} if now - self.sent[tx_hash] >= self.commit_delay
+                else {'error': {'code': -32602, 'message': 'Pending transaction'}}
+                for tx_hash in tx_hashes]
+
+
+def make_request(sequence: int) -> dict:
+    return {'method': 'icx_sendTransaction' if sequence % 5 else 'error', 'params': {'nonce': hex(sequence)},
+            'id': sequence}
+
+
+class TestLoadGenerator(unittest.TestCase):
+    def test_workers(self):
+        client = MockClient()
+        report = LoadGenerator(client, make_request, workers=4, count=40).run()
+
+        self.assertEqual('workers', report['mode'])
+        self.assertEqual(40, report['sent'])
+        self.assertEqual(32, report['accepted'])
+        self.assertEqual(32, report['committed'])
+        self.assertEqual(0, report['failed'])
+        self.assertEqual({'Out of balance': 8}, report['errorMessages'])
+        self.assertEqual(0.2, report['errorRate'])
+        self.assertGreaterEqual(report['latencyMs']['min'], 50)
+        # each worker waits commit of its transaction. at most 4 transactions are pending
+        self.assertLessEqual(max(client.batch_sizes), 4)
+
+    def test_rate(self):
+        client = MockClient(commit_delay=0.2)
+        report = LoadGenerator(client, make_request, workers=2, rate=100, duration=0.5).run()
+
+        self.assertEqual('rate', report['mode'])
+        self.assertAlmostEqual(50, report['sent'], delta=5)
+        self.assertEqual(report['accepted'], report['committed'])
+        # workers don't wait commits. pending transactions are polled in a batch
+        self.assertGreater(max(client.batch_sizes), 2)
+
+    def test_commit_timeout(self):
+        client = MockClient(commit_delay=10)
+        report = LoadGenerator(client, make_request, workers=1, rate=100, count=4, timeout=0.2).run()
+
+        self.assertEqual(0, report['committed'])
+        self.assertEqual({'Commit timeout': 4}, report['errorMessages'])
+        self.assertEqual(1, report['errorRate'])
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(10):
+            limiter.acquire()
+        self.assertAlmostEqual(0.18, time.monotonic() - start, delta=0.05)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(1, percentile(values, 0))
+        self.assertEqual(0, percentile([], 50))
+
+        summary = summarize_latencies([0.001, 0.002, 0.003, 0.004])
+        self.assertEqual({'min': 1, 'mean': 2.5, 'p50': 2, 'p90': 4, 'p95': 4, 'p99': 4, 'max': 4}, summary)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.manifest_deployer import ManifestDeployer, find_references, get_deploy_waves, resolve_references
+
+
+class MockClient(object):
+    """Accept deploy transactions and commit them. SCOREs with param 'fail' fail"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = []
+        self.committed = set()
+        self.waits = []
+
+    def send(self, request: dict) -> dict:
+        params = request['params']
+        with self.lock:
+            self.sent.append(params)
+            tx_hash = f'0x{len(self.sent):064x}'
+        if params['data']['params'].get('reject'):
+            return {'jsonrpc': '2.0', 'error': {'code': -32600, 'message': 'Out of balance'}, 'id': request['id']}
+        return {'jsonrpc': '2.0', 'result': tx_hash, 'id': request['id']}
+
+    def wait_for_result(self, tx_hashes, timeout: float = None) -> dict:
+        tx_hashes = list(tx_hashes)
+        self.waits.append(len(tx_hashes))
+        results = {}
+        for tx_hash in tx_hashes:
+            params = self.sent[int(tx_hash, 16) - 1]
+            self.committed.add(tx_hash)
+            if params['data']['params'].get('fail'):
+                result = {'status': '0x0', 'failure': {'code': '0x7d64', 'message': 'Invalid params'}}
+            elif params['data']['params'].get('pending'):
+                results[tx_hash] = {'error': {'code': -32602, 'message': 'Pending transaction'}}
+                continue
+            else:
+                address = params['to'] if params['to'] != f'cx{"0" * 40}' else f'cx{int(tx_hash, 16):040x}'
+                result = {'status': '0x1', 'scoreAddress': address}
+            results[tx_hash] = {'jsonrpc': '2.0', 'result': {'txHash': tx_hash, **result}, 'id': 1}
+        return results
+
+
+class TestManifestDeployer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _make_project(self, name: str, params: dict = None, **kwargs) -> dict:
+        path = os.path.join(self.tmp_dir, name)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, f'{name}.py'), mode='w') as file:
+            file.write(f'# {name}')
+        return {'name': name, 'project': path, 'params': params or {}, 'mode': 'install', 'to': None,
+                'stepLimit': None, **kwargs}
+
+    def test_references(self):
+        params = {'token': '${token}', 'pair': ['${a}', {'b': 'cx:${b}'}], 'amount': 10, 'plain': '$token'}
+        self.assertEqual({'token', 'a', 'b'}, find_references(params))
+
+        addresses = {'token': 'cx1', 'a': 'cx2', 'b': 'cx3'}
+        self.assertEqual({'token': 'cx1', 'pair': ['cx2', {'b': 'cx:cx3'}], 'amount': 10, 'plain': '$token'},
+                         resolve_references(params, addresses))
+
+    def test_waves(self):
+        projects = [{'name': 'c', 'params': {'a': '${a}', 'b': '${b}'}}, {'name': 'a', 'params': {}},
+                    {'name': 'b', 'params': {'a': '${a}'}}, {'name': 'd', 'params': {}}]
+        waves = get_deploy_waves(projects)
+        self.assertEqual([['a', 'd'], ['b'], ['c']], [[project['name'] for project in wave] for wave in waves])
+
+        projects.append({'name': 'e', 'params': {'x': '${unknown}'}})
+        self.assertRaises(ValueError, get_deploy_waves, projects)
+
+        cycle = [{'name': 'a', 'params': {'b': '${b}'}}, {'name': 'b', 'params': {'a': '${a}'}}]
+        self.assertRaises(ValueError, get_deploy_waves, cycle)
+
+    def test_run(self):
+        update_address = f'cx{"1" * 40}'
+        projects = [
+            self._make_project('token', {'supply': '0x10'}),
+            self._make_project('sale', {'token': '${token}'}),
+            self._make_project('other'),
+            self._make_project('updated', mode='update', to=update_address, stepLimit='0x1'),
+            self._make_project('failed', {'fail': True}),
+            self._make_project('rejected', {'reject': True}),
+            self._make_project('dependent', {'failed': '${failed}'}),
+            self._make_project('pending', {'pending': True}),
+        ]
+        projects.append({**self._make_project('missing'), 'project': os.path.join(self.tmp_dir, 'no_project')})
+
+        client = MockClient()
+        deployer = ManifestDeployer(client, IconJsonrpc.from_string(f'hx{"a" * 40}'), nid='0x3',
+                                    step_limit='0x100', workers=4)
+        report = deployer.run(projects)
+
+        results = report['results']
+        self.assertEqual([project['name'] for project in projects], list(results))
+        self.assertEqual({name: results[name]['status'] for name in results},
+                         {'token': 'success', 'sale': 'success', 'other': 'success', 'updated': 'success',
+                          'failed': 'failure', 'rejected': 'error', 'dependent': 'skipped', 'pending': 'timeout',
+                          'missing': 'error'})
+        self.assertEqual({'token', 'sale', 'other', 'updated'}, set(report['scoreAddresses']))
+        self.assertEqual(update_address, report['scoreAddresses']['updated'])
+        self.assertEqual(4, report['deployed'])
+        self.assertEqual(5, report['failed'])
+        self.assertEqual('Invalid params', results['failed']['message'])
+        self.assertEqual('Out of balance', results['rejected']['message'])
+
+        # reference is replaced with SCORE address of the project deployed in the earlier wave
+        sale = [params for params in client.sent if 'token' in params['data']['params']][0]
+        self.assertEqual(report['scoreAddresses']['token'], sale['data']['params']['token'])
+        # results of a wave are waited at once
+        self.assertEqual([5, 1], client.waits)
+        updated = [params for params in client.sent if params['to'] == update_address][0]
+        self.assertEqual('0x1', updated['stepLimit'])
+        self.assertEqual(len(client.sent), len({params['nonce'] for params in client.sent}))
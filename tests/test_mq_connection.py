@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from tbears.block_manager.mq_connection import Backoff, close_connection, is_current_connection
+
+
+class MockConnection(object):
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class MockService(object):
+    def __init__(self):
+        self._connection = MockConnection()
+
+
+class TestMqConnection(unittest.TestCase):
+    def test_backoff(self):
+        backoff = Backoff(initial=1, maximum=10, jitter=0)
+        self.assertEqual([1, 2, 4, 8, 10, 10], [backoff.next() for _ in range(6)])
+
+        backoff.reset()
+        self.assertEqual(1, backoff.next())
+
+        backoff = Backoff(initial=1, maximum=10, jitter=0.1)
+        for _ in range(10):
+            self.assertTrue(0.9 <= backoff.next() <= 11)
+
+    def test_connection(self):
+        service = MockService()
+        old_connection = service._connection
+        self.assertTrue(is_current_connection(service, old_connection))
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(close_connection(service))
+        loop.close()
+        self.assertTrue(old_connection.closed)
+
+        # callback of the connection closed on reconnection is ignored
+        service._connection = MockConnection()
+        self.assertFalse(is_current_connection(service, old_connection))
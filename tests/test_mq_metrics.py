@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from tbears.block_manager.mq_metrics import MqMetrics, InstrumentedStub, measure_task
+
+
+class MockTask(object):
+    async def invoke(self, request: dict):
+        await asyncio.sleep(0.01)
+        return {'txResults': {}}
+
+    async def write_precommit_state(self, request: dict):
+        raise RuntimeError('write_precommit_state failed')
+
+
+class MockStub(object):
+    def __init__(self):
+        self.task = MockTask()
+        self.closed = False
+
+    def async_task(self):
+        return self.task
+
+    def close(self):
+        self.closed = True
+
+
+class MockServiceTask(object):
+    def __init__(self, metrics: 'MqMetrics'):
+        self.metrics = metrics
+
+    @measure_task('Channel')
+    async def get_tx_info(self, tx_hash: str):
+        return 0, {'txHash': tx_hash}
+
+
+class TestMqMetrics(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.metrics = MqMetrics()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_instrumented_stub(self):
+        stub = InstrumentedStub(MockStub(), self.metrics, 'IconStub')
+
+        async def _run():
+            await asyncio.gather(*[stub.async_task().invoke({'block': {}}) for _ in range(3)])
+            with self.assertRaises(RuntimeError):
+                await stub.async_task().write_precommit_state({})
+
+        self.loop.run_until_complete(_run())
+
+        # other attributes are delegated to stub
+        stub.close()
+        self.assertTrue(stub.closed)
+
+        metrics = self.metrics.to_dict()
+        invoke = metrics['IconStub.invoke']
+        self.assertEqual(3, invoke['count'])
+        self.assertEqual(3, invoke['maxInFlight'])
+        self.assertEqual(0, invoke['inFlight'])
+        self.assertEqual(0, invoke['errors'])
+        self.assertGreaterEqual(invoke['maxMs'], 10)
+        self.assertEqual(3, sum(invoke['buckets'].values()))
+        self.assertGreater(invoke['requestBytes'], 0)
+        self.assertGreater(invoke['responseBytes'], 0)
+
+        self.assertEqual(1, metrics['IconStub.write_precommit_state']['errors'])
+
+    def test_measure_task(self):
+        task = MockServiceTask(self.metrics)
+        response = self.loop.run_until_complete(task.get_tx_info('0x01'))
+        self.assertEqual((0, {'txHash': '0x01'}), response)
+        self.assertEqual('get_tx_info', task.get_tx_info.__name__)
+
+        metrics = self.metrics.to_dict()['Channel.get_tx_info']
+        self.assertEqual(1, metrics['count'])
+        # request payload doesn't include the task itself
+        self.assertEqual(len('[["0x01"],{}]'), metrics['requestBytes'])
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from tbears.command.command_bench import CommandBench
+from tbears.tbears_exception import TBearsCommandException
+from tests.test_parsing_command import TestCommand
+
+
+class TestBenchParsing(TestCommand):
+    def setUp(self):
+        super().setUp()
+        self.tear_down_params = []
+
+    def test_bench_args_parsing(self):
+        cmd = 'bench'
+        parsed = self.parser.parse_args(cmd.split())
+        conf = self.cmd.cmdBench.get_icon_conf(parsed.command, args=vars(parsed))
+        self.assertEqual('transfer', conf['workload'])
+        self.assertEqual(4, conf['workers'])
+        self.assertEqual(10, conf['duration'])
+
+        cmd = 'bench -w call -o cx0000000000000000000000000000000000000001 --method hello -r 100 -N 1000 -j'
+        parsed = self.parser.parse_args(cmd.split())
+        conf = self.cmd.cmdBench.get_icon_conf(parsed.command, args=vars(parsed))
+        self.assertEqual('call', conf['workload'])
+        self.assertEqual(100, conf['rate'])
+        self.assertEqual(1000, conf['count'])
+        # count overrides duration
+        self.assertIsNone(conf['duration'])
+        self.assertTrue(conf['json'])
+
+        # invalid workload
+        cmd = 'bench -w query'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
+        # invalid address
+        cmd = 'bench -o hx1234'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
+    def test_bench_check_argument(self):
+        conf = CommandBench.get_icon_conf('bench', args={'workload': 'call'})
+        self.assertRaises(TBearsCommandException, CommandBench._check_bench, conf)
+
+        conf = CommandBench.get_icon_conf('bench', args={'workload': 'deploy'})
+        self.assertRaises(TBearsCommandException, CommandBench._check_bench, conf)
+
+        conf = CommandBench.get_icon_conf('bench', args={'workers': 0})
+        self.assertRaises(TBearsCommandException, CommandBench._check_bench, conf)
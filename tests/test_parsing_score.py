@@ -12,11 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import sys
 import os
 import shutil
+from unittest.mock import patch
 
-from tbears.command.command_score import CommandScore, check_project
+from tbears.command.command_score import CommandScore, check_project, get_zip_options, load_manifest
+from tbears.command.command_server import CommandServer
+from tbears.config.tbears_config import ConfigKey
+from tbears.libs.in_memory_zip import ZipOptions
 from tbears.tbears_exception import TBearsCommandException
 from tests.test_parsing_command import TestCommand
 from tests.test_util import TEST_UTIL_DIRECTORY
@@ -50,6 +55,37 @@ class TestCommandScore(TestCommand):
         self.assertEqual(parsed.to, self.to)
         self.assertEqual(parsed.keyStore, self.keystore)
         self.assertEqual(parsed.config, self.config_path)
+        self.assertIsNone(parsed.noCache)
+
+        cmd = f'deploy {self.project} --no-cache'
+        parsed = self.parser.parse_args(cmd.split())
+        self.assertTrue(parsed.noCache)
+
+        cmd = f'deploy {self.project} --reproducible --compress-level 9 -x *.md --exclude docs'
+        parsed = self.parser.parse_args(cmd.split())
+        self.assertTrue(parsed.reproducible)
+        self.assertEqual(9, parsed.compressLevel)
+        self.assertEqual(['*.md', 'docs'], parsed.exclude)
+        self.assertEqual(ZipOptions(True, 9, ('*.md', 'docs')), get_zip_options(vars(parsed)))
+
+        cmd = f'deploy {self.project} --compress-level 10'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
+        # manifest
+        manifest = os.path.join(self.project, 'manifest.json')
+        with open(manifest, mode='w') as file:
+            file.write('{}')
+        cmd = f'deploy --manifest {manifest} -W 8 --timeout 30 --output addresses.json'
+        parsed = self.parser.parse_args(cmd.split())
+        self.assertIsNone(parsed.project)
+        self.assertEqual(manifest, parsed.manifest)
+        self.assertEqual(8, parsed.workers)
+        self.assertEqual(30, parsed.timeout)
+        self.assertEqual('addresses.json', parsed.output)
+
+        # project and manifest are exclusive
+        cmd = f'deploy {self.project} --manifest {manifest}'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
         shutil.rmtree(self.project)
 
         # No project directory or project zip file
@@ -155,6 +191,40 @@ class TestCommandScore(TestCommand):
         os.rename(f"{project}.py.bak", f"{project}/{project}.py")
         self.assertEqual(check_project(project), 0)
 
+    def test_load_manifest(self):
+        conf = self.cmd.cmdUtil.get_init_args(project=self.project, score_class=self.project_class)
+        self.cmd.cmdUtil.init(conf)
+        manifest = 'manifest_unittest.json'
+        self.tear_down_params.append(manifest)
+
+        def write_manifest(content):
+            with open(manifest, mode='w') as file:
+                json.dump(content, file)
+
+        write_manifest({'projects': [
+            {'name': 'token', 'project': self.project},
+            {'project': self.project, 'params': {'token': '${token}'}, 'mode': 'update', 'to': self.to}]})
+        projects = load_manifest(manifest)
+        # path is relative to manifest and name is the directory name by default
+        self.assertEqual(['token', self.project], [project['name'] for project in projects])
+        self.assertEqual(os.path.abspath(self.project), projects[0]['project'])
+        self.assertEqual(('install', 'update'), (projects[0]['mode'], projects[1]['mode']))
+        self.assertEqual({'token': '${token}'}, projects[1]['params'])
+
+        invalid_manifests = [
+            [],
+            {'projects': []},
+            {'projects': [{'name': 'a'}]},
+            {'projects': [{'project': 'no_project'}]},
+            {'projects': [{'project': self.project, 'mode': 'update'}]},
+            {'projects': [{'project': self.project, 'params': []}]},
+            {'projects': [{'project': self.project}, {'project': self.project}]},
+            {'projects': [{'project': self.project, 'params': {'a': '${unknown}'}}]}
+        ]
+        for content in invalid_manifests:
+            write_manifest(content)
+            self.assertRaises(TBearsCommandException, load_manifest, manifest)
+
     def test_clear_args_parsing(self):
         # Parsing test
         cmd = f'clear'
@@ -165,4 +235,22 @@ class TestCommandScore(TestCommand):
         cmd = f'clear arg1 arg2'
         self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
 
+    @patch.object(CommandServer, '_delete_server_conf')
+    @patch.object(CommandServer, 'is_service_running', return_value=False)
+    def test_clear(self, *_):
+        paths = ['.score_unittest', '.statedb_unittest', '.score_unittest_test1', '.statedb_unittest_test1']
+        self.tear_down_params.extend(paths)
+        for path in paths:
+            os.mkdir(path)
+
+        server_conf = {'scoreRootPath': './.score_unittest', 'stateDbRootPath': './.statedb_unittest',
+                       ConfigKey.CHANNEL: 'loopchain_default', ConfigKey.CHANNELS: ['loopchain_default', 'test1'],
+                       ConfigKey.COMMIT_NOTIFY_PATH: None}
+        with patch.object(CommandServer, 'get_server_conf', return_value=server_conf):
+            CommandScore.clear({})
+
+        # directories of additional channels are removed too
+        for path in paths:
+            self.assertFalse(os.path.exists(path))
+
 
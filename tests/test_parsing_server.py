@@ -14,6 +14,8 @@
 
 import os
 
+from tbears.config.tbears_config import ConfigKey
+
 from tests.test_parsing_command import TestCommand
 from tests.test_util import TEST_UTIL_DIRECTORY
 
@@ -35,6 +37,30 @@ class TestCommandServer(TestCommand):
         self.assertEqual(int(parsed.port), port)
         self.assertEqual(parsed.config, config_path)
 
+        # embedded ICON service engine
+        parsed = self.parser.parse_args('start -e'.split())
+        self.assertTrue(parsed.embeddedEngine)
+        conf = self.cmd.cmdServer.get_icon_conf('start', args=vars(parsed))
+        self.assertTrue(conf[ConfigKey.EMBEDDED_ENGINE])
+        parsed = self.parser.parse_args('start --embedded'.split())
+        self.assertTrue(parsed.embeddedEngine)
+        parsed = self.parser.parse_args('start'.split())
+        self.assertIsNone(parsed.embeddedEngine)
+        conf = self.cmd.cmdServer.get_icon_conf('start', args=vars(parsed))
+        self.assertFalse(conf[ConfigKey.EMBEDDED_ENGINE])
+
+        # instant seal
+        parsed = self.parser.parse_args('start -i'.split())
+        self.assertTrue(parsed.blockInstantSeal)
+        conf = self.cmd.cmdServer.get_icon_conf('start', args=vars(parsed))
+        self.assertTrue(conf[ConfigKey.BLOCK_INSTANT_SEAL])
+        parsed = self.parser.parse_args('start --instant-seal'.split())
+        self.assertTrue(parsed.blockInstantSeal)
+        parsed = self.parser.parse_args('start'.split())
+        self.assertIsNone(parsed.blockInstantSeal)
+        conf = self.cmd.cmdServer.get_icon_conf('start', args=vars(parsed))
+        self.assertFalse(conf[ConfigKey.BLOCK_INSTANT_SEAL])
+
         # Too many arguments (start cli doesn't need argument)
         cmd = f'start wrongArgument'
         self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+from tbears.command.command_verify import CommandVerify
+from tbears.tbears_exception import TBearsCommandException
+from tests.test_parsing_command import TestCommand
+
+
+class TestVerifyParsing(TestCommand):
+    def setUp(self):
+        super().setUp()
+        self.tear_down_params = []
+
+    def test_verify_args_parsing(self):
+        cmd = 'verify -W 2 -C channel2 -j'
+        parsed = self.parser.parse_args(cmd.split())
+        conf = self.cmd.cmdVerify.get_icon_conf(parsed.command, args=vars(parsed))
+        self.assertEqual(2, conf['workers'])
+        self.assertEqual('channel2', conf['targetChannel'])
+        self.assertTrue(conf['json'])
+
+        # DB directory must exist
+        cmd = 'verify -d ./no_exist_directory'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
+    def test_verify_check_argument(self):
+        conf = CommandVerify.get_icon_conf('verify', args={'workers': 0})
+        self.assertRaises(TBearsCommandException, CommandVerify._check_verify, conf)
+
+        # DB of other channel is in the sibling directory of the default channel
+        conf = CommandVerify.get_icon_conf('verify', args={'stateDbRootPath': './no_exist_statedb',
+                                                           'targetChannel': 'channel2'})
+        with self.assertRaises(TBearsCommandException) as context:
+            CommandVerify._check_verify(conf)
+        self.assertIn(os.path.join('no_exist_statedb_channel2', 'tbears'), context.exception.message)
@@ -71,6 +71,42 @@ class TestWalletParsing(TestCommand):
         parsed = self.parser.parse_args(cmd.split())
         self.assertRaises(Exception, self.cmd.cmdWallet.keystore, vars(parsed), self.keystore_password)
 
+    #agent
+    def test_agent_args_parsing(self):
+        keystore = os.path.join(TEST_UTIL_DIRECTORY, 'test_keystore')
+        cmd = f'agent add -k {keystore} -p {self.keystore_password} -t 60'
+        parsed = self.parser.parse_args(cmd.split())
+        self.assertEqual(parsed.command, 'agent')
+        self.assertEqual(parsed.action, 'add')
+        self.assertEqual(parsed.keyStore, keystore)
+        self.assertEqual(parsed.password, self.keystore_password)
+        self.assertEqual(parsed.ttl, 60)
+
+        cmd = f'agent list'
+        parsed = self.parser.parse_args(cmd.split())
+        self.assertEqual(parsed.action, 'list')
+
+        # Invalid action
+        cmd = f'agent start'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
+        # Keystore file does not exist
+        cmd = f'agent add -k ./keystore_not_exist'
+        self.assertRaises(SystemExit, self.parser.parse_args, cmd.split())
+
+    def test_agent_check_argument(self):
+        # add needs keystore
+        conf = CommandWallet.get_icon_conf('agent', {'action': 'add', 'password': self.keystore_password})
+        self.assertRaises(TBearsCommandException, CommandWallet._check_agent, conf, self.keystore_password)
+
+        # invalid TTL
+        keystore = os.path.join(TEST_UTIL_DIRECTORY, 'test_keystore')
+        conf = CommandWallet.get_icon_conf('agent', {'action': 'add', 'keyStore': keystore, 'ttl': 0})
+        self.assertRaises(TBearsCommandException, CommandWallet._check_agent, conf, self.keystore_password)
+
+        conf = CommandWallet.get_icon_conf('agent', {'action': 'add', 'keyStore': keystore, 'ttl': 60})
+        self.assertEqual(CommandWallet._check_agent(conf, self.keystore_password), self.keystore_password)
+
     #lastblock
     def test_lastblock_args_parsing(self):
         node_uri = 'http://localhost:9999/api/v3'
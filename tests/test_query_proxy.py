@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from tbears.block_manager.query_proxy import QueryProxy
+
+
+class MockTask(object):
+    def __init__(self):
+        self.requests = []
+
+    async def query(self, request: dict):
+        self.requests.append(request)
+        await asyncio.sleep(0)
+        if request.get('params', {}).get('to') == 'cx_error':
+            return {'error': {'code': -32601, 'message': 'Method not found'}}
+        return hex(len(self.requests))
+
+
+class TestQueryProxy(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.task = MockTask()
+        self.proxy = QueryProxy(query_func=self.task.query, block_height=0, cache_size=2)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def query(self, request: dict):
+        return self.loop.run_until_complete(self.proxy.query(request))
+
+    def test_cache_hit_and_invalidate(self):
+        request = {'method': 'icx_getBalance', 'params': {'address': f'hx{"0"*40}'}, 'id': 1}
+        first = self.query(request)
+
+        # same request with other JSON-RPC id is answered from cache
+        request['id'] = 2
+        self.assertEqual(first, self.query(request))
+        self.assertEqual(1, len(self.task.requests))
+        self.assertEqual(1, self.proxy.hit_count)
+
+        # new block invalidates cache
+        self.proxy.invalidate(block_height=1)
+        self.assertNotEqual(first, self.query(request))
+        self.assertEqual(2, len(self.task.requests))
+
+    def test_not_cacheable(self):
+        # state changing or unknown methods are not cached
+        request = {'method': 'icx_getTransactionResult', 'params': {}}
+        self.query(request)
+        self.query(request)
+        self.assertEqual(2, len(self.task.requests))
+
+        # error response is not cached
+        request = {'method': 'icx_call', 'params': {'to': 'cx_error'}}
+        self.assertTrue('error' in self.query(request))
+        self.assertTrue('error' in self.query(request))
+        self.assertEqual(4, len(self.task.requests))
+
+    def test_cache_size(self):
+        for i in range(3):
+            self.query({'method': 'icx_getBalance', 'params': {'address': f'hx{i:040}'}})
+        self.assertEqual(2, len(self.proxy._cache))
+
+    def test_concurrent_same_query(self):
+        request = {'method': 'icx_getTotalSupply'}
+
+        async def _run():
+            return await asyncio.gather(*[self.proxy.query(request) for _ in range(5)])
+
+        responses = self.loop.run_until_complete(_run())
+        self.assertEqual(1, len(self.task.requests))
+        self.assertEqual(1, len(set(responses)))
+
+    def test_normalize_request(self):
+        a = {'method': 'icx_call', 'params': {'to': 'cx', 'from': 'hx'}, 'id': 1}
+        b = {'id': 3, 'params': {'from': 'hx', 'to': 'cx'}, 'method': 'icx_call'}
+        self.assertEqual(QueryProxy.normalize_request(a), QueryProxy.normalize_request(b))
@@ -74,3 +74,12 @@ class TestTBearsDB(unittest.TestCase):
             self.assertEqual(expected_value, actual_value)
             i += 1
 
+    def test_iterator_prefix(self):
+        self.TBEARS_DB.put(b'tx|1', b'value1')
+        self.TBEARS_DB.put(b'tx|2', b'value2')
+        self.TBEARS_DB.put(b'txResult|1', b'result1')
+        self.TBEARS_DB.put(b'block|1', b'block1')
+
+        rows = list(self.TBEARS_DB.iterator(prefix=b'tx|'))
+        self.assertEqual(rows, [(b'tx|1', b'value1'), (b'tx|2', b'value2')])
+
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from tbears.block_manager.tx_log import TxWriteAheadLog
+
+DIRECTORY_PATH = os.path.abspath((os.path.dirname(__file__)))
+TX_LOG_PATH = os.path.join(DIRECTORY_PATH, '.tx_queue.log')
+
+
+class TestTxWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.tx_log = TxWriteAheadLog(TX_LOG_PATH)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.tx_log.close())
+        self.loop.close()
+        for path in (TX_LOG_PATH, f'{TX_LOG_PATH}.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_group_commit_and_replay(self):
+        self.tx_log.open()
+
+        async def _run():
+            for i in range(10):
+                self.tx_log.append({'txHash': f'{i}'})
+            await self.tx_log.sync()
+            self.tx_log.append({'txHash': '10'})
+            await self.tx_log.sync()
+
+        self.loop.run_until_complete(_run())
+        self.loop.run_until_complete(self.tx_log.close())
+
+        tx_list = TxWriteAheadLog(TX_LOG_PATH).replay()
+        self.assertEqual([f'{i}' for i in range(11)], [tx['txHash'] for tx in tx_list])
+
+    def test_rewrite(self):
+        self.tx_log.open([{'txHash': 'a'}, {'txHash': 'b'}])
+
+        async def _run():
+            self.tx_log.append({'txHash': 'c'})
+            # 'a' and 'b' are committed. 'c' is left in queue
+            await self.tx_log.rewrite([{'txHash': 'c'}])
+            await self.tx_log.sync()
+            self.tx_log.append({'txHash': 'd'})
+            await self.tx_log.sync()
+
+        self.loop.run_until_complete(_run())
+
+        tx_list = self.tx_log.replay()
+        self.assertEqual(['c', 'd'], [tx['txHash'] for tx in tx_list])
+
+    def test_close_while_writing(self):
+        self.tx_log.open()
+        write = TxWriteAheadLog._write
+
+        def _slow_write(fd: int, data: bytes):
+            time.sleep(0.1)
+            write(fd, data)
+
+        async def _run(side_effect):
+            with patch.object(TxWriteAheadLog, '_write', side_effect=side_effect):
+                group = self.tx_log.append({'txHash': 'a'})
+                # flush task starts writing
+                await asyncio.sleep(0)
+                await self.tx_log.close()
+            return group
+
+        # file is closed after the record is written
+        group = self.loop.run_until_complete(_run(_slow_write))
+        self.assertIsNone(group.result())
+        self.assertEqual(['a'], [tx['txHash'] for tx in self.tx_log.replay()])
+
+        # failed record is not reported as written
+        self.tx_log.open()
+        group = self.loop.run_until_complete(_run(OSError('disk full')))
+        self.assertIsInstance(group.exception(), OSError)
+
+    def test_broken_record(self):
+        with open(TX_LOG_PATH, 'wb') as f:
+            f.write(b'{"txHash": "a"}\n{"txHash": "b"}\n{"txHa')
+
+        tx_list = self.tx_log.replay()
+        self.assertEqual(['a', 'b'], [tx['txHash'] for tx in tx_list])
+
+        # log doesn't exist
+        os.remove(TX_LOG_PATH)
+        self.assertEqual([], self.tx_log.replay())
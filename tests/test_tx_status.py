@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from tbears.block_manager.tx_status import TxStatusTracker, TxState
+
+
+class TestTxStatusTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = TxStatusTracker()
+
+    def test_lifecycle(self):
+        self.assertIsNone(self.tracker.get('a'))
+
+        self.tracker.enqueue('a')
+        self.tracker.enqueue('b')
+        status = self.tracker.get('a')
+        self.assertEqual(TxState.PENDING, status.state)
+        self.assertIsNone(status.sealed)
+        self.assertEqual({'status': 'pending', 'enqueued': hex(status.enqueued)}, status.to_dict())
+
+        self.tracker.seal(['a'])
+        self.assertEqual(TxState.INVOKING, status.state)
+        self.assertIsNotNone(status.sealed)
+        self.assertEqual(TxState.PENDING, self.tracker.get('b').state)
+
+        self.tracker.commit(['a'], block_height=3)
+        self.assertEqual(TxState.COMMITTED, status.state)
+        self.assertEqual(hex(3), status.to_dict()['blockHeight'])
+
+        # committed transaction is forgotten when next block is committed
+        self.tracker.seal(['b'])
+        self.tracker.commit(['b'], block_height=4)
+        self.assertIsNone(self.tracker.get('a'))
+        self.assertEqual(TxState.COMMITTED, self.tracker.get('b').state)
+        self.tracker.commit([], block_height=5)
+        self.assertEqual(0, len(self.tracker))
+
+    def test_remove(self):
+        self.tracker.enqueue('a')
+        self.tracker.seal(['a'])
+        self.tracker.remove(['a', 'unknown'])
+        self.assertIsNone(self.tracker.get('a'))
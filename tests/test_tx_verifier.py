@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from secp256k1 import PrivateKey
+
+from tbears.block_manager.block import Block
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.icx_signer import IcxSigner
+from tbears.libs.tx_verifier import verify_transactions, recover_address
+
+
+class TestTxVerifier(unittest.TestCase):
+    def setUp(self):
+        self.signer = IcxSigner(PrivateKey().private_key)
+        self.sender = IconJsonrpc(self.signer)
+
+    def make_row(self, index: int, tx: dict):
+        tx_hash = f'{index:064x}'
+        # tbears adds its own transaction hash before storing
+        key, value = Block._get_tx_value(index, tx_hash, dict(tx, txHash=tx_hash), 'ff' * 32, 1)
+        return bytes.fromhex(tx_hash), value
+
+    def make_tx(self, index: int) -> dict:
+        return self.sender.sendTransaction(to='hx0000000000000000000000000000000000000001', value=hex(index),
+                                           nonce=hex(index))['params']
+
+    def test_recover_address(self):
+        msg_hash = bytes(range(32))
+        signature = self.signer.sign_recoverable(msg_hash)
+        signature = bytes(signature[0]) + signature[1].to_bytes(1, 'big')
+        self.assertEqual(recover_address(msg_hash, signature), self.sender.address)
+
+    def test_verify_transactions(self):
+        rows = [self.make_row(i, self.make_tx(i)) for i in range(10)]
+
+        # value is changed after signing
+        tampered = self.make_tx(10)
+        tampered['value'] = '0x100'
+        rows.append(self.make_row(10, tampered))
+
+        # signed by other key
+        other = self.make_tx(11)
+        other['from'] = 'hx0000000000000000000000000000000000000002'
+        rows.append(self.make_row(11, other))
+
+        # invalid signature encoding
+        broken = self.make_tx(12)
+        broken['signature'] = 'not base64'
+        rows.append(self.make_row(12, broken))
+
+        # local environment doesn't sign
+        rows.append(self.make_row(13, IconJsonrpc.from_string(self.sender.address).sendTransaction()['params']))
+
+        for workers in (1, 2):
+            report = verify_transactions(rows, workers=workers, chunk_size=3)
+            self.assertEqual(report['total'], 14)
+            self.assertEqual(report['valid'], 10)
+            self.assertEqual(report['unsigned'], 1)
+            self.assertEqual(report['invalid'], 3)
+            self.assertEqual([tx['txHash'] for tx in report['invalidTransactions']],
+                             [f'0x{i:064x}' for i in (10, 11, 12)])
+            self.assertTrue(report['invalidTransactions'][0]['error'].startswith('Signature recovers to'))
+
+        report = verify_transactions([], workers=1)
+        self.assertEqual(report['total'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2018 theloop Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from tbears.libs.icon_jsonrpc import IconJsonrpc
+from tbears.libs.in_memory_zip import InMemoryZip, ZipOptions
+from tbears.libs.zip_cache import ZipCache, ZIP_CACHE_DIR_ENV, get_zip_cache_dir
+
+
+class TestZipCache(unittest.TestCase):
+
+    def setUp(self):
+        self.start = time.time()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.project = os.path.join(self.tmp_dir, 'project')
+        os.makedirs(os.path.join(self.project, 'tests'))
+        os.makedirs(os.path.join(self.project, '__pycache__'))
+        self._write('project.py', 'print("hello")')
+        self._write('package.json', '{}')
+        self._write('.hidden', 'hidden')
+        self._write(os.path.join('tests', 'test_project.py'), 'test')
+        self._write(os.path.join('__pycache__', 'project.pyc'), 'pyc')
+        # make files look old so that fingerprint relies on stat only
+        self._age_files()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name: str, content: str):
+        with open(os.path.join(self.project, name), mode='w') as file:
+            file.write(content)
+
+    def _age_files(self):
+        old = self.start - 60
+        for root, _, files in os.walk(self.project):
+            for file in files:
+                os.utime(os.path.join(root, file), (old, old))
+
+    def test_zip_same_as_in_memory_zip(self):
+        cache = ZipCache(self.cache_dir)
+        memory_zip = InMemoryZip()
+        memory_zip.zip_in_memory(self.project)
+
+        self.assertEqual(memory_zip.data, cache.zip(self.project))
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+        # hit
+        self.assertEqual(memory_zip.data, cache.zip(self.project))
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_fingerprint(self):
+        key = ZipCache.fingerprint(self.project)
+        self.assertEqual(key, ZipCache.fingerprint(self.project))
+
+        # files excluded from zip don't change fingerprint
+        self._write('.hidden', 'changed')
+        self._write(os.path.join('tests', 'test_project.py'), 'changed')
+        self._age_files()
+        self.assertEqual(key, ZipCache.fingerprint(self.project))
+
+        self._write('project.py', 'print("hello world")')
+        self._age_files()
+        changed_key = ZipCache.fingerprint(self.project)
+        self.assertNotEqual(key, changed_key)
+
+        self._write('new.py', '')
+        self._age_files()
+        self.assertNotEqual(changed_key, ZipCache.fingerprint(self.project))
+
+        # options change zip
+        key = ZipCache.fingerprint(self.project)
+        self.assertEqual(key, ZipCache.fingerprint(self.project, ZipOptions()))
+        self.assertNotEqual(key, ZipCache.fingerprint(self.project, ZipOptions(reproducible=True)))
+        self.assertNotEqual(key, ZipCache.fingerprint(self.project, ZipOptions(compress_level=9)))
+        self.assertNotEqual(key, ZipCache.fingerprint(self.project, ZipOptions(exclude=('*.json',))))
+
+    def test_fingerprint_recent_file(self):
+        # change within mtime granularity keeps size and mtime
+        path = os.path.join(self.project, 'project.py')
+        now = time.time()
+        os.utime(path, (now, now))
+        key = ZipCache.fingerprint(self.project)
+
+        self._write('project.py', 'print("HELLO")')
+        os.utime(path, (now, now))
+        self.assertNotEqual(key, ZipCache.fingerprint(self.project))
+
+    def test_evict(self):
+        cache = ZipCache(self.cache_dir, max_entries=3)
+        for i in range(3):
+            cache.put(f'key{i}', b'data')
+            time.sleep(0.01)
+        # least recently used one is removed
+        cache.get('key0')
+        cache.put('key3', b'data')
+
+        self.assertEqual({'key0.zip', 'key2.zip', 'key3.zip'}, set(os.listdir(self.cache_dir)))
+        self.assertIsNone(cache.get('key1'))
+
+    def test_put_failure(self):
+        path = os.path.join(self.tmp_dir, 'file')
+        with open(path, mode='w') as file:
+            file.write('not a directory')
+        cache = ZipCache(path)
+        # cache is only for speed
+        cache.put('key', b'data')
+        self.assertIsNone(cache.get('key'))
+
+    def test_gen_deploy_data_content(self):
+        cache = ZipCache(self.cache_dir)
+        content = IconJsonrpc.gen_deploy_data_content(self.project)
+        self.assertEqual(content, IconJsonrpc.gen_deploy_data_content(self.project, cache=cache))
+        self.assertEqual(content, IconJsonrpc.gen_deploy_data_content(self.project, cache=cache))
+
+    def test_get_zip_cache_dir(self):
+        backup = os.environ.get(ZIP_CACHE_DIR_ENV)
+        try:
+            os.environ[ZIP_CACHE_DIR_ENV] = self.cache_dir
+            self.assertEqual(self.cache_dir, get_zip_cache_dir())
+            del os.environ[ZIP_CACHE_DIR_ENV]
+            self.assertTrue(get_zip_cache_dir().endswith(os.path.join('tbears', 'zip')))
+        finally:
+            if backup is not None:
+                os.environ[ZIP_CACHE_DIR_ENV] = backup